@@ -1,151 +1,246 @@
+import argparse
+import math
 import pygame
-import sys
 
-pygame.init()
-
-WIDTH, HEIGHT = 1000, 700
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Jogo de Luta com Cenário")
+import assets
+import game_sim
+import nav
+import net
+import particles
+import replay
+import window
+from camera import Camera
+from dirty_render import DirtyRenderer
+from game_sim import (BLACK, BLUE, RED, FPS, HEIGHT, JUMP, LEFT, RAPID_FIRE, RIGHT, SHIELD,
+                      SHOOT, SPEED, SUPER_SHOOT, WIDTH)
+from hud import TextCache
+from level import COLORS, DEFAULT_LEVEL, load_level
+from profiler import FrameProfiler
+from scores import ScoreStore
+from timestep import FixedTimestep, lerp
 
 WHITE = (255, 255, 255)
-BLUE = (0, 0, 255)
-RED = (255, 0, 0)
-BLACK = (0, 0, 0)
 YELLOW = (255, 255, 0)
 
-# Cores para blocos do cenário
-BROWN = (139, 69, 19)
-GREEN = (34, 139, 34)
-GRAY = (100, 100, 100)
-DARK_GRAY = (50, 50, 50)
-
-FPS = 60
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 36)
-
-GRAVITY = 0.5
-JUMP_STRENGTH = -10
-PLAYER_SPEED = 5
-BULLET_SPEED = 10
-SUPER_BULLET_SPEED = 15
-
-class Player:
-    def __init__(self, x, y, color, controls):
-        self.rect = pygame.Rect(x, y, 40, 60)
-        self.color = color
-        self.velocity_y = 0
-        self.on_ground = False
-        self.controls = controls
-        self.health = 100
-        self.bullets = []
-
-    def move(self, keys):
-        # Guardar posição anterior para verificar colisões
-        old_x = self.rect.x
-        
-        if keys[self.controls['left']]:
-            self.rect.x -= PLAYER_SPEED
-            if self.check_collision_horizontal(blocks):
-                self.rect.x = old_x
-                
-        if keys[self.controls['right']]:
-            self.rect.x += PLAYER_SPEED
-            if self.check_collision_horizontal(blocks):
-                self.rect.x = old_x
-
-        # Limitar o player dentro da tela
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > WIDTH:
-            self.rect.right = WIDTH
-
-        if keys[self.controls['jump']] and self.on_ground:
-            self.velocity_y = JUMP_STRENGTH
-            self.on_ground = False
-
-    def apply_gravity(self):
-        # Aplicar gravidade
-        self.velocity_y += GRAVITY
-        
-        # Aplicar movimento vertical
-        self.rect.y += self.velocity_y
-        
-        # Verificar colisões verticais
-        self.check_collision_vertical(blocks)
-        
-        # Verificar se tocou o chão da tela
-        if self.rect.bottom >= HEIGHT:
-            self.rect.bottom = HEIGHT
-            self.velocity_y = 0
-            self.on_ground = True
-
-    def check_collision_horizontal(self, blocks):
-        for block in blocks:
-            if self.rect.colliderect(block['rect']):
-                return True
-        return False
-
-    def check_collision_vertical(self, blocks):
-        for block in blocks:
-            if self.rect.colliderect(block['rect']):
-                # Se está caindo (velocidade positiva)
-                if self.velocity_y > 0:
-                    # Colidir por cima - pousar na plataforma
-                    self.rect.bottom = block['rect'].top
-                    self.velocity_y = 0
-                    self.on_ground = True
-                    return
-                
-                # Se está subindo (velocidade negativa)  
-                elif self.velocity_y < 0:
-                    # Colidir por baixo - bater a cabeça
-                    self.rect.top = block['rect'].bottom
-                    self.velocity_y = 0
-                    return
-        
-        # Se chegou aqui, não está em contato com nenhum bloco
-        if self.velocity_y >= 0 and self.rect.bottom < HEIGHT:
-            self.on_ground = False
-
-    def shoot(self):
-        direction = 1 if self.color == BLUE else -1
-        bullet = pygame.Rect(self.rect.centerx, self.rect.centery, 10, 5)
-        self.bullets.append({'rect': bullet, 'direction': direction, 'speed': BULLET_SPEED, 'damage': 10, 'color': BLACK})
-
-    def super_shoot(self):
-        direction = 1 if self.color == BLUE else -1
-        bullet = pygame.Rect(self.rect.centerx, self.rect.centery, 50, 25)
-        self.bullets.append({'rect': bullet, 'direction': direction, 'speed': SUPER_BULLET_SPEED, 'damage': 45, 'color': RED})
-
-    def draw(self):
-        pygame.draw.rect(SCREEN, self.color, self.rect)
-        for b in self.bullets:
-            pygame.draw.rect(SCREEN, b['color'], b['rect'])
-
-    def update_bullets(self, other_player):
-        new_bullets = []
-        for b in self.bullets:
-            b['rect'].x += b['speed'] * b['direction']
-            
-            # Verificar colisão com o outro jogador
-            if b['rect'].colliderect(other_player.rect):
-                other_player.health -= b['damage']
-                continue  # Remove a bala após acertar
-            
-            # Verificar colisão com blocos do cenário
-            hit_block = False
-            for block in blocks:
-                if b['rect'].colliderect(block['rect']):
-                    hit_block = True
-                    break
-            
-            # Manter bala apenas se não saiu da tela e não acertou nada
-            if not hit_block and 0 <= b['rect'].x <= WIDTH:
-                new_bullets.append(b)
-                
-        self.bullets = new_bullets
-
-def main():
+# Atualiza só as regiões da tela que mudaram (False = tela inteira todo quadro)
+DIRTY_RENDERING = True
+
+# Janela e fontes só existem depois de setup() (chamado por main)
+SCREEN = None
+font = None
+text_cache = None
+
+def setup():
+    global SCREEN, font, text_cache
+    SCREEN = window.open_window((WIDTH, HEIGHT), "Jogo de Luta com Cenário")
+    if font is None:
+        font = window.font(36)
+        text_cache = TextCache(font)
+
+# Sprite de cada coisa desenhada, pela cor que ela tem na simulação
+PLAYER_SPRITES = {BLUE: "jogador_azul", RED: "jogador_vermelho"}
+BULLET_SPRITES = {BLACK: "bala", RED: "super"}
+BLOCK_SPRITES = {color: "bloco_" + name for name, color in COLORS.items()}
+
+# Faíscas de cada tiro que acerta: no jogador seguem o tiro, no bloco voltam
+HIT_PARTICLES = 30
+BLOCK_PARTICLES = 12
+
+# Nome no HUD e letra desenhada em cima do sprite de cada power-up
+POWER_UP_NAMES = {SHIELD: "Escudo", SPEED: "Velocidade", RAPID_FIRE: "Tiro rápido"}
+POWER_UP_LETTERS = {SHIELD: "E", SPEED: "V", RAPID_FIRE: "T"}
+
+def bullet_sprites():
+    sprites = assets.load("luta")
+    return {color: sprites[name] for color, name in BULLET_SPRITES.items()}
+
+def draw_player(player, camera, position=None):
+    # position: (x, y) no mundo onde desenhar (interpolada); padrão = rect atual
+    sprite = assets.load("luta")[PLAYER_SPRITES[player.color]]
+    x, y = position if position is not None else player.rect.topleft
+    area = SCREEN.blit(sprite, (x - camera.rect.x, y - camera.rect.y))
+    if SHIELD in player.buffs:
+        area = pygame.draw.rect(SCREEN, YELLOW, area.inflate(8, 8), 3)
+    return area
+
+def draw_power_ups(world, camera, dirty):
+    sprite = assets.load("luta")["power_up"]
+    for item in world.power_ups:
+        if item.rect.colliderect(camera.rect):
+            area = SCREEN.blit(sprite, item.rect.move(-camera.rect.x, -camera.rect.y))
+            letter = text_cache.render(POWER_UP_LETTERS[item.kind], BLACK)
+            SCREEN.blit(letter, letter.get_rect(center=area.center))
+            dirty.append(area)
+
+def buffs_text(world, player):
+    # Efeitos ativos com o tempo que falta, em décimos de segundo
+    timers = world.timers
+    return " | ".join(f"{POWER_UP_NAMES[kind]} {frames_to_ms(timers.remaining(timer)) // 100 / 10:.1f}s"
+                      for kind, timer in player.buffs.items())
+
+def emit_impacts(world, effects, confirmed=None):
+    # Transforma os acertos em partículas. Na rede só os de quadros até
+    # confirmed: os de quadros previstos podem ser desfeitos (ou repetidos)
+    # por um rollback, então esperam na lista até serem confirmados.
+    impacts = world.bullet_pool.impacts
+    pending = 0
+    for impact in impacts:
+        frame, x, y, velocity, color, on_player = impact
+        if confirmed is not None and frame > confirmed:
+            impacts[pending] = impact
+            pending += 1
+            continue
+        forward = 0.0 if velocity > 0 else math.pi
+        if on_player:
+            effects.emit(x, y, color, HIT_PARTICLES, speed=5.0, life=35, angle=forward, spread=math.pi)
+        else:
+            effects.emit(x, y, color, BLOCK_PARTICLES, speed=3.5, life=20, angle=forward + math.pi, spread=math.pi / 2)
+    del impacts[pending:]
+
+def interpolated_positions(world, previous, alpha):
+    # Posição de cada jogador entre o passo anterior e o atual
+    return [(round(lerp(px, player.rect.x, alpha)), round(lerp(py, player.rect.y, alpha)))
+            for player, (px, py) in zip(world.players, previous)]
+
+def read_buttons(keys, controls):
+    # Teclas seguradas viram bits de input (os tiros vêm dos eventos KEYDOWN)
+    buttons = 0
+    if keys[controls['left']]:
+        buttons |= LEFT
+    if keys[controls['right']]:
+        buttons |= RIGHT
+    if keys[controls['jump']]:
+        buttons |= JUMP
+    return buttons
+
+def frames_to_ms(frames):
+    return frames * 1000 // FPS
+
+def build_background(world, camera, background=None):
+    # Cenário e textos fixos da parte visível da fase. Só é refeito quando a
+    # câmera anda; a grade devolve apenas os blocos dentro da tela.
+    if background is None:
+        background = pygame.Surface((WIDTH, HEIGHT)).convert()
+    background.fill(WHITE)
+    ox, oy = camera.rect.topleft
+    sprites = assets.load("luta")
+    for block in world.block_grid.query(camera.rect):
+        rect = block['rect']
+        name = BLOCK_SPRITES.get(block['color'])
+        if name is None:
+            pygame.draw.rect(background, block['color'], rect.move(-ox, -oy))
+        else:
+            background.blit(sprites.tiled(name, rect.size), rect.move(-ox, -oy))
+
+    controls_text = text_cache.bake("P1: WASD + Q(super) + S(tiro) + E(escudo) | P2: Setas + Shift(super) + Down(tiro) + Ctrl(escudo)", BLACK)
+    background.blit(controls_text, (WIDTH // 2 - controls_text.get_width() // 2, HEIGHT - 30))
+    return background
+
+def draw_world(world, renderer, camera, alpha=1.0, previous=None, effects=None):
+    # previous: posições dos jogadores antes do último passo (para interpolar);
+    # effects: partículas desenhadas por cima das balas
+    player1, player2 = world.players
+    positions = interpolated_positions(world, previous, alpha) if previous is not None else (None, None)
+
+    # Cenário (fundo em cache com blocos e controles)
+    if camera.moved:
+        renderer.set_background(build_background(world, camera, renderer.background))
+        camera.moved = False
+    renderer.begin()
+    dirty = renderer.dirty
+
+    # Desenhar power-ups e jogadores por cima
+    draw_power_ups(world, camera, dirty)
+    dirty.append(draw_player(player1, camera, positions[0]))
+    dirty.append(draw_player(player2, camera, positions[1]))
+    world.bullet_pool.draw(SCREEN, dirty, camera.rect, bullet_sprites(), alpha)
+    if effects is not None:
+        effects.draw(SCREEN, camera.rect.topleft, dirty)
+
+    # Interface
+    health_text_p1 = text_cache.render(f"Vida P1: {player1.health}", BLUE)
+    health_text_p2 = text_cache.render(f"Vida P2: {player2.health}", RED)
+    dirty.append(SCREEN.blit(health_text_p1, (10, 10)))
+    dirty.append(SCREEN.blit(health_text_p2, (WIDTH - health_text_p2.get_width() - 10, 10)))
+
+    # Mostrar cooldowns
+    p1_shot_cd = frames_to_ms(player1.shot_cooldown_left(world.frame))
+    p1_super_cd = frames_to_ms(player1.super_cooldown_left(world.frame))
+    p2_shot_cd = frames_to_ms(player2.shot_cooldown_left(world.frame))
+    p2_super_cd = frames_to_ms(player2.super_cooldown_left(world.frame))
+
+    cd_text_p1 = text_cache.render(f"Tiro: {p1_shot_cd//10}/20 | Super: {p1_super_cd//100}/15", BLUE)
+    cd_text_p2 = text_cache.render(f"Tiro: {p2_shot_cd//10}/20 | Super: {p2_super_cd//100}/15", RED)
+    dirty.append(SCREEN.blit(cd_text_p1, (10, 50)))
+    dirty.append(SCREEN.blit(cd_text_p2, (WIDTH - cd_text_p2.get_width() - 10, 50)))
+
+    # Power-ups ativos e quanto falta de cada um
+    if player1.buffs:
+        dirty.append(SCREEN.blit(text_cache.render(buffs_text(world, player1), BLUE), (10, 90)))
+    if player2.buffs:
+        buffs_p2 = text_cache.render(buffs_text(world, player2), RED)
+        dirty.append(SCREEN.blit(buffs_p2, (WIDTH - buffs_p2.get_width() - 10, 90)))
+
+def draw_net_stats(stats, renderer):
+    # Banda e profundidade de rollback do último segundo
+    text = text_cache.render(f"Rede: {stats.sent_per_second:.0f} B/s enviados, "
+                             f"{stats.received_per_second:.0f} B/s recebidos, "
+                             f"rollback {stats.max_rollback_per_second} quadros", BLACK)
+    renderer.dirty.append(SCREEN.blit(text, (10, HEIGHT - 60)))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Jogo de luta")
+    parser.add_argument("fase", nargs="?", default=DEFAULT_LEVEL, help="arquivo da fase")
+    parser.add_argument("--host", nargs="?", const=net.PORT, type=int, metavar="PORTA",
+                        help="espera o outro jogador pela rede")
+    parser.add_argument("--conectar", metavar="IP[:PORTA]", help="entra na partida de um host")
+    parser.add_argument("--latencia", type=float, default=0, help="RTT extra simulado, em ms")
+    parser.add_argument("--perda", type=float, default=0, help="fração de pacotes descartados")
+    parser.add_argument("--bot", action="store_true", help="jogador 2 controlado pelo computador")
+    args = parser.parse_args(argv)
+    if args.bot and (args.host is not None or args.conectar):
+        parser.error("--bot é só para partidas locais")
+    if args.host is not None:
+        try:
+            net.check_level_name(args.fase)
+        except ValueError as error:
+            parser.error(str(error))
+    return args
+
+def connect(args):
+    # Abre o socket e faz o aperto de mão; devolve (link, jogador local,
+    # semente, fase) ou None se a janela for fechada antes
+    SCREEN.fill(WHITE)
+    waiting_text = font.render("Esperando o outro jogador...", True, BLACK)
+    SCREEN.blit(waiting_text, (WIDTH // 2 - waiting_text.get_width() // 2, HEIGHT // 2))
+    pygame.display.update()
+
+    def idle():
+        return not any(event.type == pygame.QUIT for event in pygame.event.get())
+
+    latency = args.latencia / 2000
+    if args.host is not None:
+        link = net.UdpLink(("0.0.0.0", args.host), latency=latency, loss=args.perda).start()
+        seed = replay.new_seed()
+        if not net.host(link, seed, args.fase, idle):
+            link.close()
+            return None
+        return link, 0, seed, args.fase
+
+    address, _, port = args.conectar.partition(":")
+    link = net.UdpLink(("0.0.0.0", 0), (address, int(port or net.PORT)),
+                       latency=latency, loss=args.perda).start()
+    joined = net.join(link, idle)
+    if joined is None:
+        link.close()
+        return None
+    seed, level_name = joined
+    return link, 1, seed, level_name
+
+def main(argv=None):
+    # Devolve window.QUIT se a janela foi fechada
+    args = parse_args(argv)
+    setup()
     player1_controls = {
         'left': pygame.K_a,
         'right': pygame.K_d,
@@ -161,100 +256,129 @@ def main():
         'super_shoot': pygame.K_RSHIFT
     }
 
-    player1 = Player(50, HEIGHT - 100, BLUE, player1_controls)
-    player2 = Player(WIDTH - 90, HEIGHT - 100, RED, player2_controls)
-
-    shot_cooldown = 200
-    super_shot_cooldown = 1500
-    last_shot_time_p1 = 0
-    last_shot_time_p2 = 0
-    last_super_shot_time_p1 = 0
-    last_super_shot_time_p2 = 0
-
-    global blocks
-    blocks = [
-        {'rect': pygame.Rect(0, HEIGHT - 40, WIDTH, 40), 'color': BROWN},   # chão
-        {'rect': pygame.Rect(150, HEIGHT - 120, 150, 20), 'color': GREEN}, # plataforma
-        {'rect': pygame.Rect(350, HEIGHT - 180, 200, 20), 'color': GRAY},  # plataforma
-        {'rect': pygame.Rect(600, HEIGHT - 240, 150, 20), 'color': DARK_GRAY}, # plataforma
-        {'rect': pygame.Rect(100, HEIGHT - 300, 100, 20), 'color': GREEN}, # plataforma alta esquerda
-        {'rect': pygame.Rect(450, HEIGHT - 350, 120, 20), 'color': GRAY},  # plataforma mais alta centro
-        {'rect': pygame.Rect(800, HEIGHT - 200, 100, 20), 'color': DARK_GRAY}, # plataforma direita
-    ]
+    # Pela rede a semente e a fase vêm do host
+    link = None
+    if args.host is not None or args.conectar:
+        online = connect(args)
+        if online is None:
+            return window.QUIT
+        link, local_player, seed, level_name = online
+    else:
+        seed = replay.new_seed()
+        level_name = args.fase
+
+    # Física, tiros, cooldowns e colisões ficam em game_sim
+    world = game_sim.World(load_level(level_name), seed)
+    player1, player2 = world.players
+
+    # Inputs de cada quadro são gravados para o replay da partida
+    input_log = replay.InputLog(replay.GAME_LUTA, seed, 2, level_name)
+    # Na rede só os quadros confirmados pelos dois lados vão para o replay
+    session = net.RollbackSession(world, local_player, link, input_log) if link else None
+    # Contra o computador o jogador 2 anda pelo grafo de pulos da fase
+    bot = nav.Bot(nav.graph_for(world), 1) if args.bot else None
+    # Faíscas dos tiros (só na tela, fora da simulação)
+    effects = particles.Particles()
+    world.bullet_pool.impacts = []
+
+    camera = Camera(WIDTH, HEIGHT, world.width, world.height)
+    camera.center_on(world.players)
+    renderer = DirtyRenderer(SCREEN, build_background(world, camera), DIRTY_RENDERING)
+    camera.moved = False
+    # F3 mostra o tempo de cada fase do quadro
+    profiler = FrameProfiler.from_env()
+    # Física em passos fixos de 1/FPS, desenho no ritmo da tela
+    timestep = FixedTimestep(FPS)
+    previous = [player.rect.topleft for player in world.players]
 
     running = True
+    closed = False
+    # Tiros apertados ficam guardados até o próximo passo da simulação
+    pressed_p1 = 0
+    pressed_p2 = 0
     while running:
-        clock.tick(FPS)
-        SCREEN.fill(WHITE)
-
-        current_time = pygame.time.get_ticks()
+        steps = timestep.tick()
+        profiler.begin_frame()
 
+        profiler.mark("eventos")
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+                closed = True
+            profiler.handle_event(event)
 
             if event.type == pygame.KEYDOWN:
                 if event.key == player1_controls['shoot']:
-                    if current_time - last_shot_time_p1 > shot_cooldown:
-                        player1.shoot()  # Removido o parâmetro 'keys'
-                        last_shot_time_p1 = current_time
+                    pressed_p1 |= SHOOT
                 if event.key == player1_controls['super_shoot']:
-                    if current_time - last_super_shot_time_p1 > super_shot_cooldown:
-                        player1.super_shoot()  # Removido o parâmetro 'keys'
-                        last_super_shot_time_p1 = current_time
+                    pressed_p1 |= SUPER_SHOOT
 
                 if event.key == player2_controls['shoot']:
-                    if current_time - last_shot_time_p2 > shot_cooldown:
-                        player2.shoot()  # Removido o parâmetro 'keys'
-                        last_shot_time_p2 = current_time
+                    pressed_p2 |= SHOOT
                 if event.key == player2_controls['super_shoot']:
-                    if current_time - last_super_shot_time_p2 > super_shot_cooldown:
-                        player2.super_shoot()  # Removido o parâmetro 'keys'
-                        last_super_shot_time_p2 = current_time
+                    pressed_p2 |= SUPER_SHOOT
 
         keys = pygame.key.get_pressed()
-        player1.move(keys)
-        player2.move(keys)
-
-        player1.apply_gravity()
-        player2.apply_gravity()
-
-        player1.update_bullets(player2)
-        player2.update_bullets(player1)
-
-        # Desenhar cenário primeiro (fundo)
-        for block in blocks:
-            pygame.draw.rect(SCREEN, block['color'], block['rect'])
-
-        # Desenhar jogadores por cima
-        player1.draw()
-        player2.draw()
-
-        # Interface
-        health_text_p1 = font.render(f"Vida P1: {player1.health}", True, BLUE)
-        health_text_p2 = font.render(f"Vida P2: {player2.health}", True, RED)
-        SCREEN.blit(health_text_p1, (10, 10))
-        SCREEN.blit(health_text_p2, (WIDTH - health_text_p2.get_width() - 10, 10))
-
-        # Mostrar cooldowns
-        p1_shot_cd = max(0, shot_cooldown - (current_time - last_shot_time_p1))
-        p1_super_cd = max(0, super_shot_cooldown - (current_time - last_super_shot_time_p1))
-        p2_shot_cd = max(0, shot_cooldown - (current_time - last_shot_time_p2))
-        p2_super_cd = max(0, super_shot_cooldown - (current_time - last_super_shot_time_p2))
-        
-        cd_text_p1 = font.render(f"Tiro: {p1_shot_cd//10}/20 | Super: {p1_super_cd//100}/15", True, BLUE)
-        cd_text_p2 = font.render(f"Tiro: {p2_shot_cd//10}/20 | Super: {p2_super_cd//100}/15", True, RED)
-        SCREEN.blit(cd_text_p1, (10, 50))
-        SCREEN.blit(cd_text_p2, (WIDTH - cd_text_p2.get_width() - 10, 50))
-
-        # Mostrar controles
-        controls_text = font.render("P1: WASD + Q(super) + S(tiro) + E(escudo) | P2: Setas + Shift(super) + Down(tiro) + Ctrl(escudo)", True, BLACK)
-        SCREEN.blit(controls_text, (WIDTH // 2 - controls_text.get_width() // 2, HEIGHT - 30))
-
-        if player1.health <= 0 or player2.health <= 0:
+        held_p1 = read_buttons(keys, player1_controls)
+        held_p2 = read_buttons(keys, player2_controls)
+        # Cada fase de cada passo soma no tempo da fase no quadro
+        for _ in range(steps):
+            previous = [player.rect.topleft for player in world.players]
+            if session is not None:
+                profiler.mark("rede")
+                # Na rede cada um joga com as teclas do jogador 1
+                session.add_local_input(held_p1 | pressed_p1)
+                if world.is_over():
+                    session.hold()
+                else:
+                    session.advance()
+                if session.peer_left:
+                    running = False
+            else:
+                inputs = (held_p1 | pressed_p1, bot.decide(world) if bot else held_p2 | pressed_p2)
+                input_log.record(inputs)
+                profiler.mark("física")
+                game_sim.update_players(world, inputs)
+                profiler.mark("balas")
+                game_sim.update_bullets(world)
+            profiler.mark("efeitos")
+            emit_impacts(world, effects, session.confirmed if session is not None else None)
+            effects.update()
+            pressed_p1 = pressed_p2 = 0
+            if not running or (session is None and world.is_over()):
+                break
+
+        profiler.mark("desenho")
+        camera.follow(world.players)
+        draw_world(world, renderer, camera, timestep.alpha, previous, effects)
+        if session is not None:
+            draw_net_stats(session.stats, renderer)
+        overlay = profiler.draw(SCREEN, text_cache, (10, 130))
+        if overlay is not None:
+            renderer.dirty.append(overlay)
+
+        # Na rede o fim só vale num quadro sem previsão (um rollback pode desfazer)
+        if world.is_over() and (session is None or session.confirmed == world.frame):
             running = False
 
-        pygame.display.update()
+        profiler.mark("display")
+        renderer.present()
+        profiler.end_frame()
+
+    profiler.close()
+    if session is not None:
+        session.close()
+        print("Rede:", session.stats.summary())
+
+    print("Replay salvo em", replay.save_match(input_log))
+    # Histórico das lutas (score = vida que sobrou)
+    store = ScoreStore()
+    store.record_match("luta", [("Jogador 1", max(0, player1.health)), ("Jogador 2", max(0, player2.health))],
+                       seed=seed, level=level_name, frames=world.frame)
+
+    if closed:
+        store.close()
+        return window.QUIT
 
     # Tela de resultado
     SCREEN.fill(WHITE)
@@ -278,9 +402,11 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT or event.type == pygame.KEYDOWN:
                 waiting = False
+                closed = event.type == pygame.QUIT
 
-    pygame.quit()
-    sys.exit()
+    store.close()
+    return window.QUIT if closed else None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    window.close()
@@ -0,0 +1,173 @@
+import os
+
+import pygame
+
+# Sprites dos jogos. Cada jogo tem uma lista de sprites (nome, arquivo,
+# tamanho e cor); na primeira vez que o jogo pede os seus, as imagens da pasta
+# assets/ são carregadas, convertidas para o formato da tela e copiadas para
+# um atlas (uma superfície grande com todos os sprites lado a lado). Cada
+# sprite é uma subsuperfície do atlas, então desenhar é um blit comum.
+#
+# Se o arquivo não existir, o sprite vira um retângulo da cor da lista, com o
+# mesmo visual de antes das imagens. Imagens sem transparência (e os
+# retângulos) vão para um atlas opaco, que é tão rápido quanto um fill.
+#
+# Precisa da janela já aberta (convert usa o formato da tela).
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+ATLAS_WIDTH = 1024
+PADDING = 1  # pixel livre entre sprites (evita vazar cor ao escalar)
+
+# jogo -> nome -> (arquivo, tamanho, cor do retângulo se não houver imagem)
+SPRITES = {
+    "flappy": {
+        "passaro": ("passaro.png", (30, 30), (0, 150, 255)),
+        "cano": ("cano.png", (70, 600), (0, 255, 0)),
+        "cano_topo": ("cano_topo.png", (70, 600), (0, 255, 0)),
+    },
+    # Base branca: cada pássaro é tingido com a cor do jogador
+    "flappy2": {
+        "passaro": ("passaro_branco.png", (30, 30), (255, 255, 255)),
+        "cano": ("cano.png", (70, 600), (0, 255, 0)),
+        "cano_topo": ("cano_topo.png", (70, 600), (0, 255, 0)),
+    },
+    "luta": {
+        "jogador_azul": ("jogador_azul.png", (40, 60), (0, 0, 255)),
+        "jogador_vermelho": ("jogador_vermelho.png", (40, 60), (255, 0, 0)),
+        "bala": ("bala.png", (10, 5), (0, 0, 0)),
+        "super": ("super.png", (50, 25), (255, 0, 0)),
+        "power_up": ("power_up.png", (30, 30), (255, 255, 0)),
+        "bloco_marrom": ("bloco_marrom.png", (20, 20), (139, 69, 19)),
+        "bloco_verde": ("bloco_verde.png", (20, 20), (34, 139, 34)),
+        "bloco_cinza": ("bloco_cinza.png", (20, 20), (100, 100, 100)),
+        "bloco_cinza_escuro": ("bloco_cinza_escuro.png", (20, 20), (50, 50, 50)),
+    },
+}
+
+
+def pack_shelves(sizes, width=ATLAS_WIDTH):
+    # Empacota retângulos em prateleiras (mais altos primeiro). Devolve a
+    # posição de cada um, na ordem de entrada, e a altura total usada.
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width and x > 0:
+            y += shelf_height + PADDING
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+class SpriteSheet:
+    def __init__(self, game, specs, directory=ASSET_DIR):
+        self.game = game
+        self.sprites = {}
+        self.files = {}      # nome -> arquivo carregado (ou None para retângulo)
+        self._scaled = {}
+        self._tiled = {}
+        self._tinted = {}
+
+        images = {}
+        for name, (filename, size, color) in specs.items():
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                image = pygame.image.load(path)
+                alpha = image.get_flags() & pygame.SRCALPHA
+                image = image.convert_alpha() if alpha else image.convert()
+                if image.get_size() != size:
+                    image = pygame.transform.smoothscale(image, size)
+                images[name] = (image, bool(alpha))
+                self.files[name] = path
+            else:
+                image = pygame.Surface(size).convert()
+                image.fill(color)
+                images[name] = (image, False)
+                self.files[name] = None
+
+        # Um atlas para sprites opacos e outro para os com transparência
+        self.atlases = []
+        for alpha in (False, True):
+            names = [name for name, (_, a) in images.items() if a == alpha]
+            if not names:
+                continue
+            positions, height = pack_shelves([images[name][0].get_size() for name in names])
+            width = max(x + images[name][0].get_width() for name, (x, _) in zip(names, positions))
+            if alpha:
+                atlas = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+            else:
+                atlas = pygame.Surface((width, height)).convert()
+            for name, pos in zip(names, positions):
+                image = images[name][0]
+                atlas.blit(image, pos)
+                self.sprites[name] = atlas.subsurface(pygame.Rect(pos, image.get_size()))
+            self.atlases.append(atlas)
+
+    def __getitem__(self, name):
+        return self.sprites[name]
+
+    def __contains__(self, name):
+        return name in self.sprites
+
+    def scaled(self, name, size):
+        # Cópia do sprite num tamanho novo, feita uma vez por tamanho
+        key = (name, size)
+        surface = self._scaled.get(key)
+        if surface is None:
+            sprite = self.sprites[name]
+            if sprite.get_size() == size:
+                surface = sprite
+            else:
+                surface = pygame.transform.smoothscale(sprite, size)
+                surface = surface.convert_alpha() if sprite.get_flags() & pygame.SRCALPHA else surface.convert()
+            self._scaled[key] = surface
+        return surface
+
+    def tiled(self, name, size):
+        # Sprite repetido lado a lado até cobrir o tamanho (blocos da fase)
+        key = (name, size)
+        surface = self._tiled.get(key)
+        if surface is None:
+            sprite = self.sprites[name]
+            if sprite.get_flags() & pygame.SRCALPHA:
+                surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            else:
+                surface = pygame.Surface(size).convert()
+            w, h = sprite.get_size()
+            surface.blits([(sprite, (x, y)) for y in range(0, size[1], h) for x in range(0, size[0], w)], False)
+            self._tiled[key] = surface
+        return surface
+
+    def tinted(self, name, color, alpha=None):
+        # Sprite multiplicado por uma cor (e com transparência geral opcional)
+        key = (name, color, alpha)
+        surface = self._tinted.get(key)
+        if surface is None:
+            surface = self.sprites[name].copy()
+            surface.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            self._tinted[key] = surface
+        return surface
+
+
+_sheets = {}
+
+
+def load(game):
+    # Sprites do jogo, carregados na primeira chamada
+    sheet = _sheets.get(game)
+    if sheet is None:
+        sheet = _sheets[game] = SpriteSheet(game, SPRITES[game])
+    return sheet
+
+
+def unload(game=None):
+    # Descarta os atlas (por exemplo ao trocar o modo de vídeo)
+    if game is None:
+        _sheets.clear()
+    else:
+        _sheets.pop(game, None)
@@ -0,0 +1,360 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Benchmark de tempo por quadro dos três jogos, sem janela (driver de vídeo
+# "dummy" do SDL) e com inputs roteirizados. Cada cenário roda atualização +
+# desenho do jogo com uma carga crescente (N balas, N blocos, N tubos, N
+# pássaros) e mede p50/p95/p99 em ms e alocações por quadro. O resultado vai
+# para um JSON que pode ser comparado com uma execução anterior.
+#
+# Uso: python bench.py [--quick] [--out arquivo.json] [--compare anterior.json]
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import flappy_sim
+import game_sim
+import nav
+from camera import Camera
+from flappy_batch import BatchFlappyEnv
+from game_sim import JUMP, LEFT, RIGHT, SHOOT, SUPER_SHOOT
+from level import load_level
+from particles import Particles
+from stress_game import make_level, refill_bullets
+from timers import TimerWheel
+
+import Game
+import flappy
+import flappy2
+
+RESULTS_FILE = "bench_results.json"
+REGRESSION_THRESHOLD = 1.10  # p95 10% pior que a referência
+
+
+def use_display(module):
+    # Os três jogos compartilham a mesma janela; setup() ajusta o tamanho
+    module.setup()
+
+
+def luta_inputs(frame):
+    # Anda de um lado para o outro, pula e atira em intervalos fixos
+    p1 = RIGHT if (frame // 90) % 2 == 0 else LEFT
+    p2 = LEFT if (frame // 70) % 2 == 0 else RIGHT
+    if frame % 45 == 0:
+        p1 |= JUMP
+        p2 |= JUMP
+    if frame % 15 == 0:
+        p1 |= SHOOT
+        p2 |= SHOOT
+    if frame % 100 == 0:
+        p1 |= SUPER_SHOOT
+    return (p1, p2)
+
+
+def luta_scenario(level=None, bullets=0, bots=0):
+    # bots > 0: os dois jogadores são bots e cada quadro calcula a decisão
+    # de "bots" bots (o grafo da fase é montado antes da medição)
+    use_display(Game)
+    world = game_sim.World(level, seed=0)
+    graph = nav.graph_for(world) if bots else None
+    players_bots = [nav.Bot(graph, i % 2) for i in range(bots)]
+    camera = Camera(Game.WIDTH, Game.HEIGHT, world.width, world.height)
+    camera.center_on(world.players)
+    renderer = Game.DirtyRenderer(Game.SCREEN, Game.build_background(world, camera), Game.DIRTY_RENDERING)
+    camera.moved = False
+    rng = world.rng
+
+    def prepare():
+        for player in world.players:
+            player.health = 100
+        if bullets:
+            refill_bullets(world.bullet_pool, world.players, bullets, rng)
+
+    def update():
+        if players_bots:
+            inputs = [bot.decide(world) for bot in players_bots]
+            game_sim.step(world, inputs[:2])
+        else:
+            game_sim.step(world, luta_inputs(world.frame))
+
+    def render():
+        camera.follow(world.players)
+        Game.draw_world(world, renderer, camera)
+        renderer.present()
+
+    return prepare, update, render
+
+
+def flappy_bot(bird, pipes):
+    # Pula quando está abaixo do centro do próximo vão e caindo
+    for pipe in pipes:
+        if pipe.x + pipe.width >= bird.x:
+            return bird.velocity > 0 and bird.y + bird.height > pipe.bottom_y - 20
+    return bird.velocity > 0 and bird.y > 300
+
+
+def flappy_scenario(module, config, birds, spawn_interval=None):
+    use_display(module)
+    if spawn_interval is not None:
+        # Percurso clássico: um tubo a cada spawn_interval quadros
+        config = flappy_sim.FlappyConfig(**dict(vars(config), spawn_interval=spawn_interval, course=None))
+    xs = [50 + (i * 7) % 60 for i in range(birds)]
+    state = flappy_sim.new_game(config, xs, seed=0)
+
+    def prepare():
+        # Pássaros nunca morrem aqui, para a carga ficar constante
+        for bird in state.birds:
+            bird.alive = True
+
+    def update():
+        jumps = [flappy_bot(bird, state.pipes) for bird in state.birds]
+        flappy_sim.step(state, jumps)
+
+    def render():
+        module.draw_frame(state)
+        pygame.display.update()
+
+    return prepare, update, render
+
+
+def flappy2_scenario(birds):
+    # Partida de N pássaros da IA, como uma sessão de espectador do flappy2
+    use_display(flappy2)
+    party = flappy2.Party(humans=0, bots=birds, seed=0)
+    env = party.new_env(seed=0)
+    jumps = np.zeros(birds, dtype=bool)
+
+    def prepare():
+        env.alive[:] = True
+
+    def update():
+        env.step(party.fill_jumps(env, jumps))
+
+    def render():
+        flappy2.draw_frame(env, party)
+        pygame.display.update()
+
+    return prepare, update, render
+
+
+def batch_scenario(birds):
+    env = BatchFlappyEnv(birds, flappy_sim.VERSUS, bird_x=50, seed=0)
+
+    def prepare():
+        env.alive[:] = True
+
+    def update():
+        obs = env.observations()
+        env.step(np.logical_and(obs[:, 0] < -20, obs[:, 1] > 0))
+
+    return prepare, update, None
+
+
+def timers_scenario(n_timers):
+    # n_timers timers ativos (efeitos, spawns, expirações): os que vencem se
+    # reagendam e, a cada quadro, 1% recomeça a contagem (como um power-up
+    # pego de novo)
+    wheel = TimerWheel()
+    timers = [None] * n_timers
+
+    def rearm(i):
+        timers[i] = wheel.schedule(1 + (i * 7919 + wheel.now) % 3600, rearm, i)
+
+    for i in range(n_timers):
+        rearm(i)
+    churn = max(1, n_timers // 100)
+
+    def update():
+        start = wheel.now * churn % n_timers
+        for i in range(start, min(start + churn, n_timers)):
+            wheel.reschedule(timers[i], 1 + (i * 7919 + wheel.now) % 3600)
+        wheel.tick()
+
+    return (lambda: None), update, None
+
+
+def particles_scenario(n_particles):
+    # n_particles partículas vivas na tela da luta: as que morrem são
+    # repostas em explosões de 50 fora da medição
+    use_display(Game)
+    effects = Particles(n_particles, seed=0)
+    rng = random.Random(0)
+    colors = (Game.BLUE, Game.RED, Game.BLACK, Game.YELLOW)
+
+    def prepare():
+        while len(effects) < n_particles:
+            effects.emit(rng.randrange(Game.WIDTH), rng.randrange(Game.HEIGHT), rng.choice(colors), 50,
+                         speed=5.0, life=60)
+
+    def update():
+        effects.update()
+
+    def render():
+        Game.SCREEN.fill(Game.WHITE)
+        effects.draw(Game.SCREEN)
+        pygame.display.update()
+
+    return prepare, update, render
+
+
+def pipes_interval(n_pipes, config):
+    # Intervalo de spawn para ter uns n_pipes tubos na tela ao mesmo tempo
+    travel = config.width + config.pipe_width
+    return max(1, travel // (config.pipe_speed * n_pipes))
+
+
+def scenarios(quick):
+    sizes = {
+        "bullets": (10, 200) if quick else (10, 100, 500, 1000),
+        "blocks": (50, 400) if quick else (50, 200, 800, 2000),
+        "pipes": (3, 30) if quick else (3, 10, 30, 100),
+        "birds": (2, 100) if quick else (2, 10, 100, 250),
+        "batch": (1000,) if quick else (1000, 10000, 100000),
+        "timers": (1000, 100000) if quick else (1000, 10000, 100000),
+        "bots": (2,) if quick else (2, 8, 32),
+        "particles": (1000, 5000) if quick else (1000, 5000, 20000),
+    }
+    for n in sizes["bullets"]:
+        yield "luta_bullets", n, lambda n=n: luta_scenario(bullets=n)
+    for n in sizes["blocks"]:
+        yield "luta_blocks", n, lambda n=n: luta_scenario(level=make_level(n))
+    yield "luta_big_level", 1, lambda: luta_scenario(level=load_level("grande.txt"))
+    for n in sizes["bots"]:
+        yield "luta_bots", n, lambda n=n: luta_scenario(level=load_level("grande.txt"), bots=n)
+    for n in sizes["particles"]:
+        yield "particles", n, lambda n=n: particles_scenario(n)
+    for n in sizes["pipes"]:
+        interval = pipes_interval(n, flappy_sim.SOLO)
+        yield "flappy_pipes", n, lambda i=interval: flappy_scenario(flappy, flappy_sim.SOLO, 1, i)
+    for n in sizes["birds"]:
+        yield "flappy2_birds", n, lambda n=n: flappy2_scenario(n)
+    for n in sizes["batch"]:
+        yield "flappy_batch_birds", n, lambda n=n: batch_scenario(n)
+    for n in sizes["timers"]:
+        yield "timer_wheel", n, lambda n=n: timers_scenario(n)
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_frames(prepare, update, render, frames):
+    times = []
+    for _ in range(frames):
+        prepare()
+        start = time.perf_counter()
+        update()
+        if render is not None:
+            render()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def measure_allocations(prepare, update, render, frames):
+    # Segunda passada com tracemalloc (mais lenta, por isso separada do tempo):
+    # blocos líquidos alocados e pico de memória temporária por quadro
+    blocks = 0
+    peak = 0
+    tracemalloc.start()
+    for _ in range(frames):
+        prepare()
+        before_blocks = sys.getallocatedblocks()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        update()
+        if render is not None:
+            render()
+        _, frame_peak = tracemalloc.get_traced_memory()
+        peak += frame_peak - before
+        blocks += sys.getallocatedblocks() - before_blocks
+    tracemalloc.stop()
+    return blocks / frames, peak / frames
+
+
+def run_scenario(name, n, setup, frames, warmup):
+    prepare, update, render = setup()
+    run_frames(prepare, update, render, warmup)
+
+    gc.collect()
+    times = run_frames(prepare, update, render, frames)
+    times.sort()
+    blocks, peak = measure_allocations(prepare, update, render, max(1, frames // 5))
+    return {
+        "scenario": name,
+        "n": n,
+        "frames": frames,
+        "mean_ms": sum(times) / len(times),
+        "p50_ms": percentile(times, 50),
+        "p95_ms": percentile(times, 95),
+        "p99_ms": percentile(times, 99),
+        "max_ms": times[-1],
+        "alloc_blocks_per_frame": blocks,
+        "alloc_peak_bytes_per_frame": peak,
+    }
+
+
+def compare(results, reference_path):
+    with open(reference_path) as f:
+        reference = {(r["scenario"], r["n"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        old = reference.get((r["scenario"], r["n"]))
+        if old is None:
+            continue
+        ratio = r["p95_ms"] / max(old["p95_ms"], 1e-9)
+        flag = "REGRESSÃO" if ratio > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"  {r['scenario']:<20} N={r['n']:<7} p95 {old['p95_ms']:.3f} -> {r['p95_ms']:.3f} ms ({ratio:.2f}x) {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tempo por quadro dos jogos")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--quick", action="store_true", help="menos cenários e tamanhos")
+    parser.add_argument("--only", help="roda só cenários cujo nome contém este texto")
+    parser.add_argument("--out", default=RESULTS_FILE)
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    results = []
+    for name, n, setup in scenarios(args.quick):
+        if args.only and args.only not in name:
+            continue
+        result = run_scenario(name, n, setup, args.frames, args.warmup)
+        results.append(result)
+        print(f"{name:<20} N={n:<7} p50 {result['p50_ms']:7.3f}  p95 {result['p95_ms']:7.3f}  "
+              f"p99 {result['p99_ms']:7.3f} ms  alocações {result['alloc_blocks_per_frame']:8.1f} blocos "
+              f"{result['alloc_peak_bytes_per_frame'] / 1024:8.1f} KiB")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "frames": args.frames,
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Resultados salvos em", args.out)
+
+    if args.compare:
+        print("Comparação com", args.compare)
+        if compare(results, args.compare):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
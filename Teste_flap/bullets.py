@@ -0,0 +1,165 @@
+import pygame
+
+from spatial import sweep_time
+
+# Balas reaproveitadas: todas as balas do jogo (dos dois jogadores e de armas
+# futuras) ficam num único pool criado no começo da partida. Atirar pega uma
+# bala livre e acertar/sumir devolve a bala, sem criar dicts ou Rects a cada tiro.
+
+
+class BulletType:
+    def __init__(self, width, height, speed, damage, color, lifetime=None):
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.damage = damage
+        self.color = color
+        self.lifetime = lifetime  # em quadros; None = até sair da tela
+
+
+class Bullet:
+    __slots__ = ('rect', 'velocity', 'damage', 'color', 'owner', 'ttl')
+
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.velocity = 0
+        self.damage = 0
+        self.color = None
+        self.owner = None
+        self.ttl = -1
+
+
+class BulletPool:
+    def __init__(self, capacity=128):
+        self.bullets = []
+        self.free = []
+        self.active = []
+        # Lista para receber (quadro, x, y, velocidade, cor, acertou_jogador) de
+        # cada bala que acerta um jogador ou bloco (efeitos na tela); None = não registra
+        self.impacts = None
+        # Área varrida pela bala da vez, reaproveitada em update()
+        self._area = pygame.Rect(0, 0, 0, 0)
+        self._grow(capacity)
+
+    def _grow(self, amount):
+        start = len(self.bullets)
+        self.bullets.extend(Bullet() for _ in range(amount))
+        self.free.extend(self.bullets[start:])
+
+    def take(self):
+        # Bala livre já colocada na lista active (os campos ficam com quem chamou)
+        if not self.free:
+            self._grow(len(self.bullets))
+        b = self.free.pop()
+        self.active.append(b)
+        return b
+
+    def spawn(self, owner, kind, x, y, direction):
+        b = self.take()
+        b.rect.update(x, y, kind.width, kind.height)
+        b.velocity = kind.speed * direction
+        b.damage = kind.damage
+        b.color = kind.color
+        b.owner = owner
+        b.ttl = kind.lifetime if kind.lifetime else -1
+        return b
+
+    def clear(self):
+        self.free.extend(self.active)
+        del self.active[:]
+
+    def update(self, targets, grid, width, frame=0):
+        # Move, envelhece e testa todas as balas numa passada só. As balas
+        # que continuam são compactadas no começo da própria lista active.
+        # A colisão é contínua: vale o primeiro jogador ou bloco no caminho
+        # do quadro inteiro, então uma bala rápida não atravessa nada.
+        # frame só marca os impactos (para descartar os de um rollback).
+        active = self.active
+        free = self.free
+        impacts = self.impacts
+        area = self._area
+        keep = 0
+        for b in active:
+            rect = b.rect
+            dx = b.velocity
+            area.update(rect.x + min(dx, 0), rect.y, rect.width + abs(dx), rect.height)
+
+            # Jogador atingido primeiro (menos quem atirou)
+            hit = None
+            hit_time = None
+            for target in targets:
+                if target is not b.owner and area.colliderect(target.rect):
+                    t = sweep_time(rect, dx, 0, target.rect)
+                    if t is not None and (hit_time is None or t < hit_time):
+                        hit, hit_time = target, t
+            wall = grid.sweep(rect, dx, 0, area)
+            rect.x += dx
+
+            # Empate entre jogador e bloco: o jogador leva o tiro
+            if hit is not None and (wall is None or hit_time <= wall[0]):
+                hit.take_hit(b.damage)
+                dead = True
+                if impacts is not None:
+                    impacts.append((frame, self._front(rect, dx, hit_time), rect.centery, dx, hit.color, True))
+            else:
+                if b.ttl > 0:
+                    b.ttl -= 1
+                dead = (wall is not None or b.ttl == 0 or not 0 <= rect.x <= width)
+                if wall is not None and impacts is not None:
+                    impacts.append((frame, self._front(rect, dx, wall[0]), rect.centery, dx, wall[1]['color'],
+                                    False))
+
+            if dead:
+                b.owner = None
+                free.append(b)
+            else:
+                active[keep] = b
+                keep += 1
+        del active[keep:]
+
+    @staticmethod
+    def _front(rect, dx, t):
+        # x da ponta da bala no momento t do passo (rect já movido)
+        return (rect.right if dx > 0 else rect.left) - dx * (1 - t)
+
+    def draw(self, surface, dirty=None, view=None, sprites=None, alpha=1.0):
+        # dirty recebe as regiões desenhadas (para o DirtyRenderer); com view
+        # (retângulo da câmera) só as balas visíveis são desenhadas; sprites
+        # (cor -> superfície) troca os retângulos pelas imagens; alpha < 1
+        # desenha cada bala entre a posição do passo anterior e a atual
+        if sprites is not None or alpha != 1.0:
+            self._draw_sprites(surface, dirty, view, sprites or {}, alpha)
+            return
+        if view is None:
+            if dirty is None:
+                for b in self.active:
+                    pygame.draw.rect(surface, b.color, b.rect)
+            else:
+                for b in self.active:
+                    dirty.append(pygame.draw.rect(surface, b.color, b.rect))
+            return
+
+        ox, oy = view.x, view.y
+        for b in self.active:
+            rect = b.rect
+            if rect.colliderect(view):
+                area = pygame.draw.rect(surface, b.color, (rect.x - ox, rect.y - oy, rect.width, rect.height))
+                if dirty is not None:
+                    dirty.append(area)
+
+    def _draw_sprites(self, surface, dirty, view, sprites, alpha=1.0):
+        ox, oy = (view.x, view.y) if view is not None else (0, 0)
+        behind = 1.0 - alpha
+        for b in self.active:
+            rect = b.rect
+            if view is not None and not rect.colliderect(view):
+                continue
+            # As balas andam "velocity" por passo, só em x
+            x = rect.x - round(b.velocity * behind) - ox
+            sprite = sprites.get(b.color)
+            if sprite is None:
+                area = pygame.draw.rect(surface, b.color, (x, rect.y - oy, rect.width, rect.height))
+            else:
+                area = surface.blit(sprite, (x, rect.y - oy))
+            if dirty is not None:
+                dirty.append(area)
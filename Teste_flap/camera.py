@@ -0,0 +1,41 @@
+import pygame
+
+# Câmera que segue os jogadores numa fase maior que a tela. Ela só anda quando
+# o ponto médio dos jogadores sai de uma zona morta no centro da tela, assim
+# pequenos pulos não fazem a tela inteira ser redesenhada.
+
+DEAD_ZONE = (150, 100)  # meia largura e meia altura da zona morta
+
+
+class Camera:
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.rect = pygame.Rect(0, 0, view_width, view_height)
+        self.bounds = pygame.Rect(0, 0, world_width, world_height)
+        self.moved = True
+
+    def follow(self, targets):
+        cx = sum(t.rect.centerx for t in targets) // len(targets)
+        cy = sum(t.rect.centery for t in targets) // len(targets)
+        rect = self.rect
+        old_x, old_y = rect.x, rect.y
+
+        dx = cx - rect.centerx
+        dy = cy - rect.centery
+        if dx > DEAD_ZONE[0]:
+            rect.x += dx - DEAD_ZONE[0]
+        elif dx < -DEAD_ZONE[0]:
+            rect.x += dx + DEAD_ZONE[0]
+        if dy > DEAD_ZONE[1]:
+            rect.y += dy - DEAD_ZONE[1]
+        elif dy < -DEAD_ZONE[1]:
+            rect.y += dy + DEAD_ZONE[1]
+        rect.clamp_ip(self.bounds)
+
+        self.moved = self.moved or rect.x != old_x or rect.y != old_y
+
+    def center_on(self, targets):
+        # Posiciona direto no ponto médio (início da partida)
+        self.rect.center = (sum(t.rect.centerx for t in targets) // len(targets),
+                            sum(t.rect.centery for t in targets) // len(targets))
+        self.rect.clamp_ip(self.bounds)
+        self.moved = True
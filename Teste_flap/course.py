@@ -0,0 +1,130 @@
+import random
+import sys
+import time
+from collections import deque
+
+# Percurso do Flappy gerado a partir de uma semente. O percurso é dividido
+# em pedaços de CHUNK_LENGTH pixels de distância percorrida e cada pedaço é
+# sorteado com um RNG próprio, semeado com o texto "semente:índice" (o
+# random passa textos por SHA-512, então dois pares nunca dão o mesmo RNG): o
+# pedaço k sai igual sem gerar os anteriores, então replays, processos do
+# treino e corridas entre máquinas montam o mesmo percurso só com a semente.
+#
+# A dificuldade sobe com a distância: o vão, a velocidade e o espaço entre
+# tubos seguem rampas (Ramp) de um valor inicial até um final. A distância
+# de cada tubo é em pixels desde o começo da partida; ele aparece na borda
+# direita quando a distância percorrida + largura da tela chega nela.
+#
+# Uso: python course.py [semente]    (mostra os primeiros pedaços e o custo)
+
+CHUNK_LENGTH = 2400     # pixels de percurso por pedaço
+LOOKAHEAD_CHUNKS = 2    # pedaços prontos à frente da tela
+
+
+class Ramp:
+    # Valor que vai de start até end ao longo de length pixels de distância
+    __slots__ = ("start", "end", "length")
+
+    def __init__(self, start, end, length):
+        self.start = start
+        self.end = end
+        self.length = length
+
+    def value(self, distance):
+        if distance >= self.length:
+            return self.end
+        if distance <= 0:
+            return self.start
+        return self.start + (self.end - self.start) * distance / self.length
+
+
+class Difficulty:
+    def __init__(self, gap, speed, spacing, lead_in=670, margin=50, jitter=0.2):
+        self.gap = gap            # Ramp: altura do vão entre os tubos
+        self.speed = speed        # Ramp: pixels por quadro
+        self.spacing = spacing    # Ramp: distância entre um tubo e o próximo
+        self.lead_in = lead_in    # distância do primeiro pedaço (tempo para se ajeitar)
+        self.margin = margin      # vão nunca mais perto que isso do teto ou do chão
+        self.jitter = jitter      # fração do espaçamento sorteada para cada tubo
+
+
+# Começa um pouco mais fácil que o percurso antigo (vão 150, 3 px/quadro,
+# um tubo a cada 270 px) e fica mais difícil ao longo de uns 80 tubos
+NORMAL = Difficulty(gap=Ramp(170, 125, 20000), speed=Ramp(3.0, 4.5, 30000), spacing=Ramp(300, 220, 20000))
+
+
+def chunk_start(difficulty, index):
+    return difficulty.lead_in + index * CHUNK_LENGTH
+
+
+def chunk(config, seed, index):
+    # Tubos do pedaço index: lista de (distância, altura do tubo de cima, vão),
+    # em ordem. O espaçamento do pedaço é o da rampa no meio dele, dividido
+    # por igual, e cada tubo anda até jitter desse espaço para um lado ou outro.
+    difficulty = config.course
+    rng = random.Random(f"{seed}:{index}")
+    start = chunk_start(difficulty, index)
+    count = max(1, round(CHUNK_LENGTH / difficulty.spacing.value(start + CHUNK_LENGTH / 2)))
+    slot = CHUNK_LENGTH / count
+    shift = slot * difficulty.jitter / 2
+    pipes = []
+    for i in range(count):
+        distance = round(start + slot * i + rng.uniform(-shift, shift))
+        gap = round(difficulty.gap.value(distance))
+        height = rng.randint(difficulty.margin, config.height - gap - difficulty.margin)
+        pipes.append((distance, height, gap))
+    return pipes
+
+
+class CourseStream:
+    # Os tubos de um percurso em ordem, gerados pedaço por pedaço alguns
+    # pedaços à frente do que já apareceu na tela
+    def __init__(self, config, seed=None, first_chunk=0, lookahead=LOOKAHEAD_CHUNKS):
+        self.config = config
+        self.difficulty = config.course
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.lookahead = lookahead * CHUNK_LENGTH
+        self.ahead = deque()
+        self._chunks = self.chunks(first_chunk)
+
+    def chunks(self, first=0):
+        index = first
+        while True:
+            yield chunk(self.config, self.seed, index)
+            index += 1
+
+    def speed(self, distance):
+        return self.difficulty.speed.value(distance)
+
+    def due(self, limit):
+        # Tira da fila e devolve os tubos com distância até limit
+        ahead = self.ahead
+        while not ahead or ahead[-1][0] <= limit + self.lookahead:
+            ahead.extend(next(self._chunks))
+        if ahead[0][0] > limit:
+            return ()
+        ready = []
+        while ahead and ahead[0][0] <= limit:
+            ready.append(ahead.popleft())
+        return ready
+
+
+def main():
+    import flappy_sim
+
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    config = flappy_sim.SOLO
+    for index in range(3):
+        pipes = chunk(config, seed, index)
+        print(f"pedaço {index}: {len(pipes)} tubos,", ", ".join(f"{d}:{h}/{g}" for d, h, g in pipes))
+
+    n = 10000
+    start = time.perf_counter()
+    for index in range(n):
+        chunk(config, seed, index * 7919)
+    elapsed = time.perf_counter() - start
+    print(f"pedaço qualquer: {elapsed / n * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import pygame
+
+# Desenho por regiões sujas: o cenário fixo é desenhado uma vez num fundo em
+# cache. A cada quadro só as regiões onde algo foi desenhado (no quadro atual
+# e no anterior) são restauradas do fundo e enviadas para a tela.
+
+
+class DirtyRenderer:
+    def __init__(self, screen, background, enabled=True):
+        self.screen = screen
+        self.background = background
+        self.enabled = enabled
+        self.dirty = []       # regiões desenhadas neste quadro
+        self._previous = []   # regiões do quadro anterior
+        self._full = True
+
+    def set_background(self, background):
+        self.background = background
+        self._full = True
+
+    def begin(self):
+        # Apaga o quadro anterior usando o fundo em cache
+        screen = self.screen
+        background = self.background
+        if self._full or not self.enabled:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in self._previous:
+                screen.blit(background, rect, rect)
+
+    def present(self):
+        previous = self._previous
+        if self._full or not self.enabled:
+            pygame.display.update()
+            self._full = False
+        else:
+            # O que foi desenhado agora e o que precisa sumir do quadro anterior
+            previous.extend(self.dirty)
+            pygame.display.update(previous)
+        previous.clear()
+        self._previous, self.dirty = self.dirty, previous
@@ -0,0 +1,307 @@
+import os
+
+# Sem tela: tudo é desenhado fora da janela, com o driver de vídeo "dummy"
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+
+import numpy as np
+import pygame
+
+import Game
+import flappy2
+import game_sim
+import particles
+import replay
+import window
+from camera import Camera
+from dirty_render import DirtyRenderer
+from level import DEFAULT_LEVEL, load_level
+
+# Exporta replays (.rep) do Game.py e do flappy2.py como sequência de imagens
+# ou vídeo, sem janela e sem limite de FPS: a partida é re-simulada a partir
+# dos inputs gravados e cada quadro é desenhado com as mesmas funções do jogo.
+# O quadro N é o estado depois de N inputs: o quadro 0 é o começo da partida,
+# antes do primeiro input, então um replay de len(log) quadros inteiro vira
+# len(log) + 1 imagens.
+#
+# O laço principal (simulação + desenho) é o produtor; threads gravam os
+# quadros. Os quadros ficam num conjunto fixo de buffers (bytearray com uma
+# Surface do pygame por cima, na mesma memória): o produtor copia a tela para
+# um buffer livre (um blit), e a thread entrega esse mesmo buffer ao arquivo
+# ou ao ffmpeg e o devolve para a fila de livres. Nenhuma outra cópia é
+# feita. Com todos os buffers ocupados o produtor espera, então a memória
+# usada não cresce quando o disco ou o codificador são mais lentos.
+#
+# Uso: python export.py arquivo.rep [outro.rep ...] [--formato bmp|png|mp4]
+#                       [--saida exportados] [--de Q] [--ate Q] [--passo N]
+#                       [--threads N]
+
+FORMATS = ("bmp", "png", "mp4")
+OUTPUT_DIR = "exportados"
+BYTES_PER_PIXEL = 4   # buffers em BGRA (a ordem da memória das telas de 32 bits)
+
+# Cabeçalhos do BMP: 32 bits sem compressão, linhas de cima para baixo
+# (altura negativa), então o buffer BGRA vai para o arquivo como está
+BMP_FILE_HEADER = struct.Struct("<2sIHHI")
+BMP_INFO_HEADER = struct.Struct("<IiiHHIIiiII")
+
+
+class Frame:
+    __slots__ = ("buffer", "surface")
+
+    def __init__(self, size):
+        self.buffer = bytearray(size[0] * size[1] * BYTES_PER_PIXEL)
+        self.surface = pygame.image.frombuffer(self.buffer, size, "BGRA")
+
+
+class ImageSequence:
+    # Um arquivo por quadro (quadro_000123.bmp); pode ser usado por várias threads
+    def __init__(self, directory, size, image_format="bmp"):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = image_format
+        width, height = size
+        image_size = width * height * BYTES_PER_PIXEL
+        offset = BMP_FILE_HEADER.size + BMP_INFO_HEADER.size
+        self.bmp_header = (BMP_FILE_HEADER.pack(b"BM", offset + image_size, 0, 0, offset)
+                           + BMP_INFO_HEADER.pack(BMP_INFO_HEADER.size, width, -height, 1, 32, 0,
+                                                  image_size, 2835, 2835, 0, 0))
+
+    def write(self, index, frame):
+        path = os.path.join(self.directory, f"quadro_{index:06d}.{self.format}")
+        if self.format == "bmp":
+            with open(path, "wb") as f:
+                f.write(self.bmp_header)
+                f.write(frame.buffer)
+        else:
+            pygame.image.save(frame.surface, path)
+
+    def close(self):
+        pass
+
+
+class VideoEncoder:
+    # Manda os quadros crus para o ffmpeg pela entrada padrão. Os quadros
+    # precisam chegar na ordem, então só uma thread grava.
+    single_thread = True
+
+    def __init__(self, path, size, fps):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg não encontrado (use --formato bmp ou png)")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.process = subprocess.Popen(
+            [ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "bgra",
+             "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-",
+             "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+
+    def write(self, index, frame):
+        self.process.stdin.write(frame.buffer)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg falhou ao gravar {self.path}")
+
+
+class FramePipeline:
+    def __init__(self, size, sink, threads=1, buffers=None):
+        if getattr(sink, "single_thread", False):
+            threads = 1
+        self.sink = sink
+        self.free = queue.Queue()
+        self.pending = queue.Queue()
+        for _ in range(buffers or threads * 2 + 1):
+            self.free.put(Frame(size))
+        self.waited = 0.0   # tempo que o produtor ficou sem buffer livre
+        self.written = 0
+        self.error = None
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(threads)]
+        for thread in self.threads:
+            thread.start()
+
+    def acquire(self):
+        # Próximo buffer livre (espera uma thread devolver se todos estão em uso)
+        if self.error is not None:
+            raise self.error
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            start = time.perf_counter()
+            frame = self.free.get()
+            self.waited += time.perf_counter() - start
+            return frame
+
+    def submit(self, index, frame):
+        self.pending.put((index, frame))
+
+    def _work(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, frame = item
+            if self.error is None:
+                try:
+                    self.sink.write(index, frame)
+                    self.written += 1
+                except Exception as error:
+                    # O produtor vê o erro no próximo acquire()
+                    self.error = error
+            self.free.put(frame)
+
+    def close(self):
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+
+def luta_scene(log):
+    # Devolve (tela, update, render); update() avança um quadro do replay e
+    # devolve False quando ele acaba
+    Game.setup()
+    world = game_sim.World(load_level(log.level or DEFAULT_LEVEL), log.seed)
+    camera = Camera(Game.WIDTH, Game.HEIGHT, world.width, world.height)
+    camera.center_on(world.players)
+    renderer = DirtyRenderer(Game.SCREEN, Game.build_background(world, camera), Game.DIRTY_RENDERING)
+    camera.moved = False
+    # Partículas com a semente do replay: a mesma exportação sai sempre igual
+    effects = particles.Particles(seed=log.seed)
+    world.bullet_pool.impacts = []
+    frames = log.frames()
+
+    def update():
+        inputs = next(frames, None)
+        if inputs is None:
+            return False
+        game_sim.step(world, inputs)
+        Game.emit_impacts(world, effects)
+        effects.update()
+        return True
+
+    def render():
+        camera.follow(world.players)
+        Game.draw_world(world, renderer, camera, effects=effects)
+        renderer.present()
+
+    return Game.SCREEN, update, render
+
+
+def flappy2_scene(log):
+    # Os pássaros do replay viram fantasmas (opacos), que repetem os pulos gravados
+    flappy2.setup()
+    party = flappy2.Party(humans=0, ghost_log=log, ghost_alpha=None)
+    env = party.new_env(log.seed, replay.flappy2_config(log))
+    jumps = np.zeros(len(party), dtype=bool)
+    effects = particles.Particles(seed=log.seed)
+    was_alive = env.alive.copy()
+
+    def update():
+        if env.frame >= len(log) or env.is_over():
+            return False
+        np.copyto(was_alive, env.alive)
+        env.step(party.fill_jumps(env, jumps))
+        flappy2.emit_deaths(env, party, effects, was_alive)
+        effects.update()
+        return True
+
+    def render():
+        flappy2.draw_frame(env, party, effects=effects)
+
+    return flappy2.SCREEN, update, render
+
+
+SCENES = {replay.GAME_LUTA: luta_scene, replay.GAME_FLAPPY2: flappy2_scene}
+
+
+def export(path, output_dir=OUTPUT_DIR, image_format="bmp", first=0, last=None, step=1, threads=None):
+    # Exporta os quadros [first, last) de um replay, um a cada step (o quadro
+    # 0 é o estado inicial). Devolve um dict com os tempos do produtor, o
+    # número de quadros gravados e o de inputs simulados.
+    log = replay.InputLog.load(path)
+    if log.game not in SCENES:
+        raise ValueError(f"jogo desconhecido: {log.game}")
+    replay.check_rules(log)
+    screen, update, render = SCENES[log.game](log)
+    size = screen.get_size()
+    name = os.path.splitext(os.path.basename(path))[0]
+    if image_format == "mp4":
+        sink = VideoEncoder(os.path.join(output_dir, name + ".mp4"), size, game_sim.FPS / step)
+    else:
+        sink = ImageSequence(os.path.join(output_dir, name), size, image_format)
+    pipeline = FramePipeline(size, sink, threads or os.cpu_count() or 1)
+
+    simulate = draw = 0.0
+    start = time.perf_counter()
+    index = 0
+    try:
+        while last is None or index < last:
+            if index >= first and (index - first) % step == 0:
+                frame = pipeline.acquire()
+                mark = time.perf_counter()
+                render()
+                frame.surface.blit(screen, (0, 0))
+                draw += time.perf_counter() - mark
+                pipeline.submit(index, frame)
+            if last is not None and index + 1 >= last:
+                break
+            mark = time.perf_counter()
+            running = update()
+            simulate += time.perf_counter() - mark
+            if not running:
+                break
+            index += 1
+    finally:
+        pipeline.close()
+    return {"quadros": pipeline.written, "simulados": index, "total": time.perf_counter() - start,
+            "simulacao": simulate, "desenho": draw, "espera": pipeline.waited}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta replays como imagens ou vídeo, sem janela")
+    parser.add_argument("replays", nargs="+", help="arquivos .rep do Game.py ou do flappy2.py")
+    parser.add_argument("--formato", choices=FORMATS, default="bmp", help="mp4 precisa do ffmpeg no PATH")
+    parser.add_argument("--saida", default=OUTPUT_DIR, help="pasta dos arquivos exportados")
+    parser.add_argument("--de", type=int, default=0, help="primeiro quadro exportado")
+    parser.add_argument("--ate", type=int, help="quadro onde a exportação para")
+    parser.add_argument("--passo", type=int, default=1, help="exporta um a cada N quadros")
+    parser.add_argument("--threads", type=int, help="threads gravando (padrão: uma por núcleo)")
+    args = parser.parse_args()
+    if args.passo < 1:
+        parser.error("--passo precisa ser pelo menos 1")
+    if args.formato == "mp4" and shutil.which("ffmpeg") is None:
+        parser.error("ffmpeg não encontrado; use --formato bmp ou png")
+
+    window.init()
+    for path in args.replays:
+        try:
+            result = export(path, args.saida, args.formato, args.de, args.ate, args.passo, args.threads)
+        except (OSError, ValueError) as error:
+            print(f"{path}: {error}")
+            continue
+        total = result["total"]
+        real_time = result["simulados"] / game_sim.FPS
+        print(f"{path}: {result['quadros']} quadros em {total:.2f} s "
+              f"({result['quadros'] / max(total, 1e-9):.0f} quadros/s, "
+              f"{real_time / max(total, 1e-9):.1f}x o tempo real) | "
+              f"simulação {result['simulacao']:.2f} s, desenho {result['desenho']:.2f} s, "
+              f"esperando gravação {result['espera']:.2f} s")
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
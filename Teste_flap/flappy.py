@@ -1,14 +1,18 @@
 import pygame
-import random
-import sys
 
-# Inicializa o Pygame
-pygame.init()
+import assets
+import flappy_sim
+from hud import TextCache
+from profiler import FrameProfiler
+from scores import ScoreStore
+from timestep import FixedTimestep, lerp
+import window
+
+# As regras do jogo ficam em flappy_sim.SOLO
+CONFIG = flappy_sim.SOLO
 
 # Configurações da tela
-WIDTH, HEIGHT = 400, 600
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Flappy Bird Simples")
+WIDTH, HEIGHT = CONFIG.width, CONFIG.height
 
 # Cores
 WHITE = (255, 255, 255)
@@ -16,132 +20,116 @@ BLACK = (0, 0, 0)
 BLUE = (0, 150, 255)
 GREEN = (0, 255, 0)
 
-# Variáveis do jogo
-FPS = 60
-GRAVITY = 0.3       # gravidade reduzida para queda mais lenta
-JUMP_STRENGTH = -6 # pulo mais forte
-PIPE_WIDTH = 70
-PIPE_GAP = 150
-PIPE_SPEED = 3
-
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 36)
-
-# Classe do pássaro
-class Bird:
-    def __init__(self):
-        self.x = 50
-        self.y = HEIGHT // 2
-        self.velocity = 0
-        self.width = 30
-        self.height = 30
-
-    def jump(self):
-        self.velocity = JUMP_STRENGTH
-
-    def move(self):
-        self.velocity += GRAVITY
-        self.y += self.velocity
-
-    def draw(self):
-        pygame.draw.rect(SCREEN, BLUE, (self.x, self.y, self.width, self.height))
-
-    def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
-
-# Classe dos tubos
-class Pipe:
-    def __init__(self):
-        self.x = WIDTH
-        self.height = random.randint(50, HEIGHT - PIPE_GAP - 50)
-        self.width = PIPE_WIDTH
-        self.passed = False
-
-    def move(self):
-        self.x -= PIPE_SPEED
-
-    def draw(self):
-        # Tubo de cima
-        pygame.draw.rect(SCREEN, GREEN, (self.x, 0, self.width, self.height))
-        # Tubo de baixo
-        bottom_y = self.height + PIPE_GAP
-        bottom_height = HEIGHT - bottom_y
-        pygame.draw.rect(SCREEN, GREEN, (self.x, bottom_y, self.width, bottom_height))
-
-    def get_top_rect(self):
-        return pygame.Rect(self.x, 0, self.width, self.height)
-
-    def get_bottom_rect(self):
-        bottom_y = self.height + PIPE_GAP
-        bottom_height = HEIGHT - bottom_y
-        return pygame.Rect(self.x, bottom_y, self.width, bottom_height)
+FPS = flappy_sim.FPS
+
+# Janela e fontes só existem depois de setup() (chamado por main)
+SCREEN = None
+font = None
+text_cache = None
+
+def setup():
+    global SCREEN, font, text_cache
+    SCREEN = window.open_window((WIDTH, HEIGHT), "Flappy Bird Simples")
+    if font is None:
+        font = window.font(36)
+        text_cache = TextCache(font)
+
+def draw_bird(bird, y):
+    SCREEN.blit(assets.load("flappy")["passaro"], (bird.x, y))
+
+def draw_pipe(pipe, x):
+    sprites = assets.load("flappy")
+    # Tubo de cima (só a parte de baixo do sprite, onde fica a ponta)
+    top = sprites["cano_topo"]
+    SCREEN.blit(top, (x, 0), (0, top.get_height() - pipe.height, pipe.width, pipe.height))
+    # Tubo de baixo
+    SCREEN.blit(sprites["cano"], (x, pipe.bottom_y), (0, 0, pipe.width, HEIGHT - pipe.bottom_y))
+
+def draw_frame(state, alpha=1.0, previous_y=None):
+    # alpha: quanto do último passo já passou (1 = estado atual). Os tubos
+    # andam state.speed por passo, então a posição anterior sai do x atual.
+    SCREEN.fill(WHITE)
+    bird = state.birds[0]
+    y = bird.y if previous_y is None else lerp(previous_y, bird.y, alpha)
+    draw_bird(bird, y)
+    behind = state.speed * (1 - alpha)
+    for pipe in state.pipes:
+        draw_pipe(pipe, pipe.x + behind)
 
-def main():
-    bird = Bird()
-    pipes = []
-    score = 0
+    # Desenha score
+    score_text = text_cache.render(f"Score: {bird.score}", BLACK)
+    SCREEN.blit(score_text, (10, 10))
 
-    # Timer para criar tubos
-    SPAWNPIPE = pygame.USEREVENT
-    pygame.time.set_timer(SPAWNPIPE, 1500)
+def main():
+    # Devolve window.QUIT se a janela foi fechada
+    setup()
+    state = flappy_sim.new_game(CONFIG, (50,))
+    bird = state.birds[0]
+    # Recordes gravados em segundo plano (o jogo não espera o disco)
+    store = ScoreStore()
+
+    # F3 mostra o tempo de cada fase do quadro
+    profiler = FrameProfiler.from_env()
+    # Física em passos fixos de 1/FPS, desenho no ritmo da tela
+    timestep = FixedTimestep(FPS)
+    previous_y = bird.y
 
     running = True
+    jump = False
     while running:
-        clock.tick(FPS)
-        SCREEN.fill(WHITE)
+        steps = timestep.tick()
+        profiler.begin_frame()
 
+        profiler.mark("eventos")
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                sys.exit()
+                profiler.close()
+                store.close()
+                return window.QUIT
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    print("Pulo detectado!")  # CONFIRMAÇÃO NO TERMINAL
-                    bird.jump()
-            if event.type == SPAWNPIPE:
-                pipes.append(Pipe())
-
-        bird.move()
-        bird.draw()
-
-        # Movimenta e desenha os tubos
-        for pipe in pipes:
-            pipe.move()
-            pipe.draw()
-
-            # Verifica colisão
-            if bird.get_rect().colliderect(pipe.get_top_rect()) or bird.get_rect().colliderect(pipe.get_bottom_rect()):
-                running = False
-
-            # Atualiza score quando passa o tubo
-            if not pipe.passed and pipe.x + pipe.width < bird.x:
-                pipe.passed = True
-                score += 1
-
-        # Remove tubos que saíram da tela
-        pipes = [pipe for pipe in pipes if pipe.x + pipe.width > 0]
+                    jump = True
+
+        # Física, tubos, colisão e score ficam na simulação. O pulo vale
+        # para o primeiro passo (ou espera o próximo quadro que tiver um).
+        profiler.mark("simulação")
+        for _ in range(steps):
+            previous_y = bird.y
+            flappy_sim.step(state, (jump,))
+            jump = False
+            if not bird.alive:
+                break
+
+        profiler.mark("desenho")
+        draw_frame(state, timestep.alpha, previous_y)
+        profiler.draw(SCREEN, text_cache, (10, 50))
+
+        profiler.mark("display")
+        pygame.display.update()
+        profiler.end_frame()
 
-        # Verifica se pássaro bateu no chão ou no teto
-        if bird.y > HEIGHT - bird.height or bird.y < 0:
+        if not bird.alive:
             running = False
 
-        # Desenha score
-        score_text = font.render(f"Score: {score}", True, BLACK)
-        SCREEN.blit(score_text, (10, 10))
+    profiler.close()
 
-        pygame.display.update()
+    score = bird.score
+    store.record_match("flappy", [("Player", score)], frames=state.frame)
 
     # Tela de Game Over
     SCREEN.fill(WHITE)
     game_over_text = font.render("Game Over!", True, BLACK)
     score_text = font.render(f"Score final: {score}", True, BLACK)
+    record_text = font.render(f"Recorde: {store.best('flappy')}", True, BLACK)
     SCREEN.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 30))
     SCREEN.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2 + 10))
+    SCREEN.blit(record_text, (WIDTH//2 - record_text.get_width()//2, HEIGHT//2 + 50))
     pygame.display.update()
     pygame.time.wait(3000)
-    pygame.quit()
-    sys.exit()
+    store.close()
+    return None
 
 if __name__ == "__main__":
     main()
+    window.close()
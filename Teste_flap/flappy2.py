@@ -1,12 +1,23 @@
+import argparse
 import pygame
-import random
-import sys
 
-pygame.init()
+import numpy as np
 
-WIDTH, HEIGHT = 400, 600
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Flappy Bird Multiplayer Local")
+import assets
+import flappy_sim
+import particles
+import replay
+from flappy_batch import BatchFlappyEnv
+from hud import TextCache
+from profiler import FrameProfiler
+from scores import ScoreStore
+from timestep import FixedTimestep, lerp
+import window
+
+# As regras do jogo ficam em flappy_sim.VERSUS
+CONFIG = flappy_sim.VERSUS
+
+WIDTH, HEIGHT = CONFIG.width, CONFIG.height
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -14,181 +25,312 @@ BLUE = (0, 150, 255)
 RED = (255, 50, 50)
 GREEN = (0, 255, 0)
 
-FPS = 60
-GRAVITY = 0.3
-JUMP_STRENGTH = -7
-PIPE_WIDTH = 70
-PIPE_GAP = 150
-PIPE_SPEED = 3
-
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 36)
-
-class Bird:
-    def __init__(self, x, color):
-        self.x = x
-        self.y = HEIGHT // 2
-        self.velocity = 0
-        self.width = 30
-        self.height = 30
+FPS = flappy_sim.FPS
+
+# Modo para N pássaros: jogadores no teclado, pássaros da IA e "fantasmas"
+# que repetem os inputs de um replay gravado (corrida contra partidas antigas).
+# Todos rodam juntos no BatchFlappyEnv e são desenhados com um único blits().
+#
+# Uso: python flappy2.py [--jogadores 2] [--ia 0] [--fantasma arquivo.rep]
+#                        [--teclas space,w,up]
+
+HUMAN = "humano"
+AI = "ia"
+GHOST = "fantasma"
+
+# Tecla de pulo de cada jogador, na ordem (nomes do pygame.key.key_code)
+DEFAULT_KEYS = ("space", "w", "up", "p", "return", "m", "z", "k")
+PLAYER_COLORS = (
+    (BLUE, "Azul"), (RED, "Vermelho"), ((255, 150, 0), "Laranja"), ((150, 60, 220), "Roxo"),
+    ((0, 180, 120), "Verde"), ((240, 200, 0), "Amarelo"), ((255, 100, 200), "Rosa"), ((90, 90, 90), "Cinza"),
+)
+AI_COLORS = ((120, 120, 120), (160, 120, 80), (100, 140, 160), (150, 150, 90))
+GHOST_ALPHA = 90
+
+MAX_BIRDS = 255  # o replay guarda o número de jogadores num byte
+LEADERBOARD_SIZE = 5
+AI_MARGIN = (5, 35)  # quanto abaixo do centro do vão cada IA espera para pular
+DEATH_PARTICLES = 40  # penas de cada pássaro que morre
+
+# Janela e fontes só existem depois de setup() (chamado por main)
+SCREEN = None
+font = None
+text_cache = None
+
+
+def setup():
+    global SCREEN, font, text_cache
+    SCREEN = window.open_window((WIDTH, HEIGHT), "Flappy Bird Multiplayer Local")
+    if font is None:
+        font = window.font(36)
+        text_cache = TextCache(font)
+
+
+class Racer:
+    def __init__(self, name, color, kind, key=None, color_name=None):
+        self.name = name
         self.color = color
-        self.alive = True
-        self.score = 0
-
-    def jump(self):
-        self.velocity = JUMP_STRENGTH
-
-    def move(self):
-        self.velocity += GRAVITY
-        self.y += self.velocity
-        # Não deixa sair da tela
-        if self.y < 0:
-            self.y = 0
-            self.velocity = 0
-
-    def draw(self):
-        pygame.draw.rect(SCREEN, self.color, (self.x, self.y, self.width, self.height))
-
-    def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
-
-class Pipe:
-    def __init__(self):
-        self.x = WIDTH
-        self.height = random.randint(50, HEIGHT - PIPE_GAP - 50)
-        self.width = PIPE_WIDTH
-        self.passed = []
-
-    def move(self):
-        self.x -= PIPE_SPEED
-
-    def draw(self):
-        pygame.draw.rect(SCREEN, GREEN, (self.x, 0, self.width, self.height))
-        bottom_y = self.height + PIPE_GAP
-        bottom_height = HEIGHT - bottom_y
-        pygame.draw.rect(SCREEN, GREEN, (self.x, bottom_y, self.width, bottom_height))
-
-    def get_top_rect(self):
-        return pygame.Rect(self.x, 0, self.width, self.height)
-
-    def get_bottom_rect(self):
-        bottom_y = self.height + PIPE_GAP
-        bottom_height = HEIGHT - bottom_y
-        return pygame.Rect(self.x, bottom_y, self.width, bottom_height)
-
-def main():
-    bird1 = Bird(50, BLUE)
-    bird2 = Bird(100, RED)
-    pipes = []
-    running = True
+        self.kind = kind
+        self.key = key
+        self.label = f"{name} ({color_name})" if color_name else name
+
+
+class Party:
+    # Os pássaros de uma partida, na ordem do replay: fantasmas primeiro (para
+    # ficarem na mesma posição x da partida original), depois jogadores e IA.
+    # ghost_alpha=None desenha os fantasmas opacos (exportação de replays)
+    def __init__(self, humans=2, bots=0, ghost_log=None, keys=DEFAULT_KEYS, seed=None, ghost_alpha=GHOST_ALPHA):
+        self.racers = []
+        self.ghost_log = ghost_log
+        n_ghosts = ghost_log.n_players if ghost_log is not None else 0
+        for i in range(n_ghosts):
+            color, _ = PLAYER_COLORS[i % len(PLAYER_COLORS)]
+            self.racers.append(Racer(f"Fantasma {i + 1}", color, GHOST))
+        for i in range(humans):
+            color, color_name = PLAYER_COLORS[i % len(PLAYER_COLORS)]
+            key = pygame.key.key_code(keys[i])
+            self.racers.append(Racer(f"Player {i + 1}", color, HUMAN, key, color_name))
+        for i in range(bots):
+            self.racers.append(Racer(f"IA {i + 1}", AI_COLORS[i % len(AI_COLORS)], AI))
+        if len(self.racers) > MAX_BIRDS:
+            raise ValueError(f"no máximo {MAX_BIRDS} pássaros por partida")
+
+        n = len(self.racers)
+        self.keys = {racer.key: i for i, racer in enumerate(self.racers) if racer.kind == HUMAN}
+        self.n_ghosts = n_ghosts
+        if n_ghosts:
+            self.ghost_inputs = np.frombuffer(bytes(ghost_log.data), dtype=np.uint8)
+            self.ghost_inputs = self.ghost_inputs.reshape(-1, n_ghosts).astype(bool)
+        # Margem de cada IA (infinita para quem não é IA, que então nunca pula sozinho)
+        rng = np.random.default_rng(seed)
+        self.margins = np.full(n, np.inf)
+        bots_mask = np.array([racer.kind == AI for racer in self.racers], dtype=bool)
+        self.margins[bots_mask] = rng.uniform(*AI_MARGIN, size=int(bots_mask.sum()))
+        self.has_bots = bool(bots_mask.any())
+
+        # Sprite tingido com a cor de cada um (um por cor, compartilhado)
+        sprites = assets.load("flappy2")
+        self.surfaces = [sprites.tinted("passaro", racer.color, ghost_alpha if racer.kind == GHOST else None)
+                         for racer in self.racers]
+
+    def __len__(self):
+        return len(self.racers)
+
+    def new_env(self, seed, config=CONFIG):
+        return BatchFlappyEnv(len(self), config, flappy_sim.party_xs(len(self)), seed)
+
+    def fill_jumps(self, env, jumps):
+        # Pulos da IA e dos fantasmas neste quadro; os do teclado entram depois
+        if self.has_bots:
+            obs = env.observations()
+            np.less(obs[:, 0], -self.margins, out=jumps)
+            jumps &= obs[:, 1] > 0
+        else:
+            jumps[:] = False
+        if self.n_ghosts and env.frame < len(self.ghost_inputs):
+            jumps[:self.n_ghosts] |= self.ghost_inputs[env.frame]
+        return jumps
+
+
+def draw_pipe(pipe, x):
+    sprites = assets.load("flappy2")
+    top = sprites["cano_topo"]
+    SCREEN.blit(top, (x, 0), (0, top.get_height() - pipe.height, pipe.width, pipe.height))
+    SCREEN.blit(sprites["cano"], (x, pipe.bottom_y), (0, 0, pipe.width, HEIGHT - pipe.bottom_y))
+
+
+def leaderboard(env, size=LEADERBOARD_SIZE):
+    # Índices dos melhores scores (empates mantêm a ordem dos pássaros)
+    return np.argsort(-env.score, kind="stable")[:size]
+
+
+def emit_deaths(env, party, effects, was_alive):
+    # Penas na cor de cada pássaro que morreu no último passo
+    center = CONFIG.bird_size / 2
+    for i in np.flatnonzero(was_alive & ~env.alive).tolist():
+        effects.emit(env.x[i] + center, env.y[i] + center, party.racers[i].color, DEATH_PARTICLES,
+                     speed=4.0, life=40)
+
+
+def draw_frame(env, party, alpha=1.0, previous_y=None, effects=None):
+    # alpha: quanto do último passo já passou (1 = estado atual); previous_y
+    # é o y dos pássaros antes dele; effects: partículas por cima dos canos.
+    # Os tubos andam env.speed por passo (a velocidade sobe com a distância).
+    SCREEN.fill(WHITE)
 
-    SPAWNPIPE = pygame.USEREVENT
-    pygame.time.set_timer(SPAWNPIPE, 1500)
+    # Todos os pássaros vivos de uma vez só
+    alive = np.flatnonzero(env.alive)
+    surfaces = party.surfaces
+    y = env.y[alive]
+    if previous_y is not None:
+        y = lerp(previous_y[alive], y, alpha)
+    positions = np.column_stack((env.x[alive], y)).tolist()
+    SCREEN.blits([(surfaces[i], pos) for i, pos in zip(alive.tolist(), positions)], False)
+    behind = env.speed * (1 - alpha)
+    for pipe in env.pipes:
+        draw_pipe(pipe, pipe.x + behind)
+    if effects is not None:
+        effects.draw(SCREEN)
+
+    # Placar dos primeiros colocados e quantos ainda estão vivos
+    y = 10
+    for rank, i in enumerate(leaderboard(env).tolist(), 1):
+        racer = party.racers[i]
+        prefix = f"{rank}. " if len(party) > 2 else ""
+        score_text = text_cache.render(f"{prefix}{racer.label}: {env.score[i]}", racer.color)
+        SCREEN.blit(score_text, (10, y))
+        y += 30
+    if len(party) > 2:
+        SCREEN.blit(text_cache.render(f"Vivos: {len(alive)}/{len(party)}", BLACK), (10, y))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Flappy Bird para vários jogadores")
+    parser.add_argument("--jogadores", type=int, default=2, help="jogadores no teclado")
+    parser.add_argument("--ia", type=int, default=0, help="pássaros controlados pela IA")
+    parser.add_argument("--fantasma", help="replay do flappy2 para correr contra")
+    parser.add_argument("--teclas", default=",".join(DEFAULT_KEYS),
+                        help="tecla de pulo de cada jogador, separadas por vírgula")
+    args = parser.parse_args(argv)
+    args.teclas = args.teclas.split(",")
+    if not 0 <= args.jogadores <= len(args.teclas):
+        parser.error(f"--jogadores precisa estar entre 0 e {len(args.teclas)} (uma tecla por jogador)")
+    if args.ia < 0:
+        parser.error("--ia não pode ser negativo")
+    if args.jogadores + args.ia > MAX_BIRDS:
+        parser.error(f"no máximo {MAX_BIRDS} pássaros por partida")
+    # Os nomes das teclas são conferidos antes de abrir a janela
+    window.init()
+    keys = args.teclas[:args.jogadores]
+    for name in keys:
+        try:
+            pygame.key.key_code(name)
+        except ValueError:
+            parser.error(f"tecla desconhecida em --teclas: {name!r}")
+    if len(set(keys)) != len(keys):
+        parser.error("--teclas: cada jogador precisa de uma tecla diferente")
+    return args
+
+
+def main(argv=None):
+    # Devolve window.QUIT se a janela foi fechada
+    args = parse_args(argv)
+    ghost_log = None
+    if args.fantasma:
+        try:
+            ghost_log = replay.InputLog.load(args.fantasma)
+        except (OSError, ValueError) as error:
+            print(f"{args.fantasma}: {error}")
+            return None
+        if ghost_log.game != replay.GAME_FLAPPY2:
+            print(f"{args.fantasma} não é um replay do flappy2")
+            return None
+        if ghost_log.rules != replay.FLAPPY2_COURSE:
+            print(f"{args.fantasma} é de outro percurso (os clássicos dá para ver com export.py, não para correr contra)")
+            return None
+    setup()
+
+    # Semente do percurso e inputs de cada quadro ficam gravados para replay.
+    # Numa corrida contra fantasmas o percurso é o da partida gravada.
+    seed = ghost_log.seed if ghost_log is not None else replay.new_seed()
+    party = Party(args.jogadores, args.ia, ghost_log, args.teclas, seed)
+    if not len(party):
+        print("Nenhum pássaro na partida")
+        return None
+    env = party.new_env(seed)
+    # Recordes e histórico gravados em segundo plano (o jogo não espera o disco)
+    store = ScoreStore()
+    jumps = np.zeros(len(party), dtype=bool)
+    # Pulos do teclado guardados até o próximo passo da simulação
+    pressed = np.zeros(len(party), dtype=bool)
+    input_log = replay.InputLog(replay.GAME_FLAPPY2, seed, len(party))
+    running = True
+    # F3 mostra o tempo de cada fase do quadro
+    profiler = FrameProfiler.from_env()
+    # Física em passos fixos de 1/FPS, desenho no ritmo da tela
+    timestep = FixedTimestep(FPS)
+    previous_y = env.y.copy()
+    effects = particles.Particles()
+    was_alive = env.alive.copy()
 
     while running:
-        clock.tick(FPS)
-        SCREEN.fill(WHITE)
+        steps = timestep.tick()
+        profiler.begin_frame()
 
+        profiler.mark("eventos")
         for event in pygame.event.get():
+            profiler.handle_event(event)
             if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                sys.exit()
+                profiler.close()
+                store.close()
+                return window.QUIT
 
             if event.type == pygame.KEYDOWN:
-                if bird1.alive and event.key == pygame.K_SPACE:
-                    bird1.jump()
-                if bird2.alive and event.key == pygame.K_w:
-                    bird2.jump()
-
-            if event.type == SPAWNPIPE:
-                pipes.append(Pipe())
-
-        # Move e desenha pássaros
-        if bird1.alive:
-            bird1.move()
-            bird1.draw()
-        if bird2.alive:
-            bird2.move()
-            bird2.draw()
-
-        # Move e desenha tubos
-        for pipe in pipes:
-            pipe.move()
-            pipe.draw()
-
-            # Colisão com bird1
-            if bird1.alive and (bird1.get_rect().colliderect(pipe.get_top_rect()) or bird1.get_rect().colliderect(pipe.get_bottom_rect())):
-                bird1.alive = False
-            # Colisão com bird2
-            if bird2.alive and (bird2.get_rect().colliderect(pipe.get_top_rect()) or bird2.get_rect().colliderect(pipe.get_bottom_rect())):
-                bird2.alive = False
-
-            # Atualiza score para bird1
-            if bird1.alive and (pipe.x + pipe.width < bird1.x) and (bird1 not in pipe.passed):
-                pipe.passed.append(bird1)
-                bird1.score += 1
-
-            # Atualiza score para bird2
-            if bird2.alive and (pipe.x + pipe.width < bird2.x) and (bird2 not in pipe.passed):
-                pipe.passed.append(bird2)
-                bird2.score += 1
-
-        # Remove tubos fora da tela
-        pipes = [pipe for pipe in pipes if pipe.x + pipe.width > 0]
-
-        # Checa se pássaros bateram no chão
-        if bird1.alive and bird1.y > HEIGHT - bird1.height:
-            bird1.alive = False
-        if bird2.alive and bird2.y > HEIGHT - bird2.height:
-            bird2.alive = False
-
-        # Desenha pontuação
-        score1_text = font.render(f"Player 1 (Azul): {bird1.score}", True, BLUE)
-        score2_text = font.render(f"Player 2 (Vermelho): {bird2.score}", True, RED)
-        SCREEN.blit(score1_text, (10, 10))
-        SCREEN.blit(score2_text, (10, 40))
-
+                index = party.keys.get(event.key)
+                if index is not None:
+                    pressed[index] = True
+
+        # Física, tubos, colisões e score de todos os pássaros de uma vez
+        profiler.mark("simulação")
+        for _ in range(steps):
+            party.fill_jumps(env, jumps)
+            jumps |= pressed
+            pressed[:] = False
+            input_log.record(jumps.view(np.uint8).tobytes())
+            np.copyto(previous_y, env.y)
+            np.copyto(was_alive, env.alive)
+            env.step(jumps)
+            emit_deaths(env, party, effects, was_alive)
+            effects.update()
+            if env.is_over():
+                break
+
+        profiler.mark("desenho")
+        draw_frame(env, party, timestep.alpha, previous_y, effects)
+        profiler.draw(SCREEN, text_cache, (10, 80 + 30 * min(len(party), LEADERBOARD_SIZE)))
+
+        profiler.mark("display")
         pygame.display.update()
+        profiler.end_frame()
 
-        # Termina o jogo se os dois morreram
-        if not bird1.alive and not bird2.alive:
+        # Termina o jogo quando todos morreram
+        if env.is_over():
             running = False
 
+    profiler.close()
+    print("Replay salvo em", replay.save_match(input_log))
+    # Fantasmas já estão no histórico da partida original
+    results = [(racer.name, int(score)) for racer, score in zip(party.racers, env.score) if racer.kind != GHOST]
+    if results:
+        store.record_match("flappy2", results, seed=seed, frames=env.frame)
+
     # Tela final
     SCREEN.fill(WHITE)
     over_text = font.render("Game Over!", True, BLACK)
     SCREEN.blit(over_text, (WIDTH//2 - over_text.get_width()//2, HEIGHT//2 - 30))
 
-    # Mostra o vencedor
-    if bird1.score > bird2.score:
-        winner_text = font.render("Player 1 Venceu!", True, BLUE)
-    elif bird2.score > bird1.score:
-        winner_text = font.render("Player 2 Venceu!", True, RED)
+    # Mostra o vencedor (ou empate entre os melhores)
+    best = np.flatnonzero(env.score == env.score.max())
+    if len(best) == 1:
+        racer = party.racers[best[0]]
+        winner_text = font.render(f"{racer.name} Venceu!", True, racer.color)
     else:
         winner_text = font.render("Empate!", True, BLACK)
 
     SCREEN.blit(winner_text, (WIDTH//2 - winner_text.get_width()//2, HEIGHT//2 + 10))
+
+    # Recordes de todas as partidas
+    y = HEIGHT//2 + 60
+    for score, name, _ in store.top("flappy2", 3):
+        record_text = text_cache.render(f"{name}: {score}", BLACK)
+        SCREEN.blit(record_text, (WIDTH//2 - record_text.get_width()//2, y))
+        y += 30
     pygame.display.update()
     pygame.time.wait(4000)
-    pygame.quit()
-    sys.exit()
+    store.close()
+    return None
 
 
 if __name__ == "__main__":
     main()
-
-def load_records():
-    try:
-        with open("record.txt", "r") as f:
-            lines = f.readlines()
-            record1 = int(lines[0].strip())
-            record2 = int(lines[1].strip())
-            return record1, record2
-    except:
-        # Se não existir arquivo, inicia com 0
-        return 0, 0
-
-def save_records(record1, record2):
-    with open("record.txt", "w") as f:
-        f.write(f"{record1}\n{record2}\n")
+    window.close()
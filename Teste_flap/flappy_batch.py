@@ -0,0 +1,124 @@
+import numpy as np
+
+import flappy_sim
+
+# Ambiente do Flappy para muitos pássaros ao mesmo tempo. As posições,
+# velocidades, vida e score ficam em arrays do NumPy e cada quadro é calculado
+# de uma vez para todos, com as mesmas regras de flappy_sim.step. Os tubos são
+# compartilhados por todos os pássaros (o mesmo percurso).
+
+
+class BatchFlappyEnv:
+    def __init__(self, n_birds, config=flappy_sim.SOLO, bird_x=50, seed=None):
+        self.config = config
+        self.n_birds = n_birds
+        # bird_x pode ser um número só ou um valor por pássaro
+        self.x = np.broadcast_to(np.asarray(bird_x, dtype=np.float64), (n_birds,)).copy()
+        # Tubos além desta borda não encostam em nenhum pássaro
+        self.x_reach = float(self.x.max()) + config.bird_size
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        config = self.config
+        n = self.n_birds
+        self.y = np.full(n, config.height // 2, dtype=np.float64)
+        self.velocity = np.zeros(n, dtype=np.float64)
+        self.alive = np.ones(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        # Número de série do próximo tubo que cada pássaro ainda não passou
+        self.next_pipe = np.zeros(n, dtype=np.int64)
+        self.pipes = flappy_sim.PipeManager(config)
+        self.frame = 0
+        flappy_sim.start_course(self, seed)
+        # Áreas de trabalho reaproveitadas a cada quadro
+        self._top = np.empty(n, dtype=np.float64)
+        self._mask = np.empty(n, dtype=bool)
+        self._tmp = np.empty(n, dtype=bool)
+        return self
+
+    def is_over(self):
+        return not self.alive.any()
+
+    def step(self, jumps=None):
+        # jumps: array de bool com um valor por pássaro (ou None para ninguém pular)
+        config = self.config
+        alive = self.alive
+        velocity = self.velocity
+        y = self.y
+        top = self._top
+        mask = self._mask
+        tmp = self._tmp
+
+        self.frame += 1
+
+        if jumps is not None:
+            np.logical_and(jumps, alive, out=mask)
+            velocity[mask] = config.jump_strength
+
+        np.add(velocity, config.gravity, out=velocity, where=alive)
+        np.add(y, velocity, out=y, where=alive)
+        if not config.ceiling_kills:
+            np.less(y, 0, out=mask)
+            mask &= alive
+            y[mask] = 0
+            velocity[mask] = 0
+
+        # Mesmo truncamento que o pygame.Rect faz no y
+        np.trunc(y, out=top)
+        size = config.bird_size
+        x = self.x
+        pipes = self.pipes
+        flappy_sim.scroll(self)
+
+        # Só os tubos entre o mais atrasado dos vivos e a borda dos pássaros
+        # podem pontuar ou colidir
+        end = pipes.removed + len(pipes)
+        serial = max(pipes.removed, int(np.min(self.next_pipe, where=alive, initial=end)))
+        while True:
+            pipe = pipes.get(serial)
+            if pipe is None or pipe.x >= self.x_reach:
+                break
+
+            # Colisão: sobreposição em x e (tubo de cima ou tubo de baixo)
+            np.less(x, pipe.x + pipe.width, out=mask)
+            np.greater(x + size, pipe.x, out=tmp)
+            mask &= tmp
+            if mask.any():
+                np.less(top, pipe.height, out=tmp)
+                tmp &= top + size > 0
+                hit = tmp | ((top + size > pipe.bottom_y) & (top < config.height))
+                mask &= hit
+                alive &= ~mask
+
+            # Score: cada pássaro vivo pontua o tubo uma única vez
+            np.greater(x, pipe.x + pipe.width, out=mask)
+            mask &= alive
+            np.equal(self.next_pipe, serial, out=tmp)
+            mask &= tmp
+            self.score += mask
+            self.next_pipe += mask
+            serial += 1
+
+        pipes.cull()
+
+        # Chão (e teto no modo solo)
+        np.greater(y, config.height - size, out=mask)
+        if config.ceiling_kills:
+            mask |= y < 0
+        alive &= ~mask
+        return alive
+
+    def observations(self):
+        # (dy até o centro do próximo vão, velocidade, distância até o tubo) por pássaro
+        config = self.config
+        obs = np.zeros((self.n_birds, 3), dtype=np.float64)
+        center = np.full(self.n_birds, config.height / 2)
+        dist = np.full(self.n_birds, float(config.width))
+        for serial, pipe in enumerate(self.pipes, self.pipes.removed):
+            mask = self.next_pipe == serial
+            center[mask] = (pipe.height + pipe.bottom_y) / 2
+            dist[mask] = pipe.x + pipe.width - self.x[mask]
+        obs[:, 0] = center - self.y
+        obs[:, 1] = self.velocity
+        obs[:, 2] = dist
+        return obs
@@ -0,0 +1,241 @@
+import random
+from collections import deque
+
+import course
+
+# Simulação do Flappy sem janela e sem relógio: flappy.py e flappy2.py só
+# desenham o estado e lêem o teclado. Um quadro de simulação = um quadro a 60 FPS.
+
+FPS = 60
+
+
+class FlappyConfig:
+    def __init__(self, width=400, height=600, gravity=0.3, jump_strength=-6,
+                 pipe_width=70, pipe_gap=150, pipe_speed=3, bird_size=30,
+                 spawn_interval=90, ceiling_kills=True, course=None):
+        self.width = width
+        self.height = height
+        self.gravity = gravity
+        self.jump_strength = jump_strength
+        self.pipe_width = pipe_width
+        self.pipe_gap = pipe_gap
+        self.pipe_speed = pipe_speed
+        self.bird_size = bird_size
+        self.spawn_interval = spawn_interval  # em quadros (1500 ms a 60 FPS)
+        self.ceiling_kills = ceiling_kills
+        # Dificuldade do percurso gerado por course.py. None = percurso
+        # clássico: um tubo a cada spawn_interval quadros, com pipe_gap e
+        # pipe_speed fixos e altura sorteada na hora
+        self.course = course
+
+
+# Regras do flappy.py (um jogador, o teto mata)
+SOLO = FlappyConfig(course=course.NORMAL)
+# Regras do flappy2.py (pulo mais forte, o teto segura o pássaro)
+VERSUS = FlappyConfig(jump_strength=-7, ceiling_kills=False, course=course.NORMAL)
+# flappy2 com o percurso clássico (replays gravados antes do percurso gerado)
+CLASSIC_VERSUS = FlappyConfig(jump_strength=-7, ceiling_kills=False)
+
+
+class Bird:
+    def __init__(self, x, config):
+        self.x = x
+        self.y = config.height // 2
+        self.velocity = 0
+        self.width = config.bird_size
+        self.height = config.bird_size
+        self.alive = True
+        self.score = 0
+        self.next_pipe = 0  # número de série do próximo tubo a passar
+
+    def jump(self, config):
+        self.velocity = config.jump_strength
+
+    def move(self, config):
+        self.velocity += config.gravity
+        self.y += self.velocity
+        # Sem teto mortal, o pássaro não sai da tela
+        if self.y < 0 and not config.ceiling_kills:
+            self.y = 0
+            self.velocity = 0
+
+
+class Pipe:
+    def __init__(self, x, height, config, gap=None):
+        self.reset(x, height, config, gap)
+
+    def reset(self, x, height, config, gap=None):
+        # Limites do vão calculados uma vez, no spawn
+        self.x = x
+        self.height = height
+        self.width = config.pipe_width
+        self.bottom_y = height + (gap if gap is not None else config.pipe_gap)
+
+    def move(self, config):
+        self.x -= config.pipe_speed
+
+    def collides(self, bird, config):
+        # Mesmo resultado de Rect.colliderect (o pygame trunca o y do pássaro)
+        by = int(bird.y)
+        if not (bird.x < self.x + self.width and self.x < bird.x + bird.width):
+            return False
+        if by < self.height and by + bird.height > 0:
+            return True
+        return by + bird.height > self.bottom_y and by < config.height
+
+
+class PipeManager:
+    # Fila de tubos ordenada por x (todos andam na mesma velocidade, então a
+    # ordem de spawn é a ordem na tela). Cada tubo tem um número de série:
+    # o primeiro da fila é o de número "removed". Tubos que saem da tela
+    # voltam para uma lista livre e são reaproveitados no próximo spawn.
+    def __init__(self, config):
+        self.config = config
+        self.pipes = deque()
+        self.free = []
+        self.removed = 0
+
+    def __iter__(self):
+        return iter(self.pipes)
+
+    def __len__(self):
+        return len(self.pipes)
+
+    def spawn(self, height, x=None, gap=None):
+        # Padrão: na borda direita da tela, com o vão da config
+        config = self.config
+        if x is None:
+            x = config.width
+        if self.free:
+            pipe = self.free.pop()
+            pipe.reset(x, height, config, gap)
+        else:
+            pipe = Pipe(x, height, config, gap)
+        self.pipes.append(pipe)
+        return pipe
+
+    def get(self, serial):
+        index = serial - self.removed
+        if 0 <= index < len(self.pipes):
+            return self.pipes[index]
+        return None
+
+    def move(self, speed=None):
+        if speed is None:
+            speed = self.config.pipe_speed
+        for pipe in self.pipes:
+            pipe.x -= speed
+
+    def cull(self):
+        # Remove tubos que saíram da tela (sempre os do começo da fila)
+        pipes = self.pipes
+        while pipes and pipes[0].x + pipes[0].width <= 0:
+            self.free.append(pipes.popleft())
+            self.removed += 1
+
+
+class GameState:
+    def __init__(self, config, bird_xs, seed=None):
+        self.config = config
+        self.birds = [Bird(x, config) for x in bird_xs]
+        self.pipes = PipeManager(config)
+        self.frame = 0
+        start_course(self, seed)
+
+    def is_over(self):
+        return not any(bird.alive for bird in self.birds)
+
+
+def start_course(state, seed):
+    # Percurso de uma partida (GameState ou BatchFlappyEnv) a partir da semente
+    config = state.config
+    state.rng = random.Random(seed)
+    state.course = course.CourseStream(config, seed) if config.course is not None else None
+    state.distance = 0.0            # pixels percorridos desde o começo
+    state.speed = config.pipe_speed  # velocidade dos tubos no último quadro
+
+
+def new_game(config=SOLO, bird_xs=(50,), seed=None):
+    return GameState(config, bird_xs, seed)
+
+
+def party_xs(n_birds):
+    # Posição x de cada pássaro numa partida de vários jogadores. Depende só
+    # do índice, então o pássaro i fica sempre no mesmo lugar (os dois
+    # primeiros são os do flappy2 clássico, em 50 e 100) e um replay com N
+    # pássaros pode ser re-simulado sem guardar as posições.
+    return [50 + (50 * i) % 101 for i in range(n_birds)]
+
+
+def spawn_pipe(state):
+    config = state.config
+    height = state.rng.randint(50, config.height - config.pipe_gap - 50)
+    return state.pipes.spawn(height)
+
+
+def scroll(state):
+    # Anda com os tubos um quadro e cria os que entram na tela
+    config = state.config
+    pipes = state.pipes
+    stream = state.course
+    if stream is None:
+        if state.frame % config.spawn_interval == 0:
+            spawn_pipe(state)
+        pipes.move()
+        return
+    speed = state.speed = stream.speed(state.distance)
+    distance = state.distance = state.distance + speed
+    pipes.move(speed)
+    for pipe_distance, height, gap in stream.due(distance + config.width):
+        pipes.spawn(height, pipe_distance - distance, gap)
+
+
+def step(state, jumps=()):
+    # Avança um quadro. jumps[i] diz se o pássaro i pulou neste quadro.
+    config = state.config
+    birds = state.birds
+
+    state.frame += 1
+
+    for bird, jump in zip(birds, jumps):
+        if jump and bird.alive:
+            bird.jump(config)
+
+    for bird in birds:
+        if bird.alive:
+            bird.move(config)
+
+    pipes = state.pipes
+    scroll(state)
+    for bird in birds:
+        if not bird.alive:
+            continue
+        # Pontua os tubos que ficaram para trás do pássaro
+        serial = bird.next_pipe
+        pipe = pipes.get(serial)
+        while pipe is not None and pipe.x + pipe.width < bird.x:
+            bird.score += 1
+            serial += 1
+            pipe = pipes.get(serial)
+        bird.next_pipe = serial
+
+        # Colisão só com os tubos que cobrem o x do pássaro (um ou dois)
+        while pipe is not None and pipe.x < bird.x + bird.width:
+            if pipe.collides(bird, config):
+                bird.alive = False
+                break
+            serial += 1
+            pipe = pipes.get(serial)
+
+    pipes.cull()
+
+    # Chão (e teto no modo solo)
+    for bird in birds:
+        if not bird.alive:
+            continue
+        if bird.y > config.height - bird.height:
+            bird.alive = False
+        elif config.ceiling_kills and bird.y < 0:
+            bird.alive = False
+
+    return state
@@ -0,0 +1,457 @@
+import random
+import struct
+
+import pygame
+
+from bullets import BulletPool, BulletType
+from level import load_level
+from spatial import build_block_grid
+from timers import TimerWheel
+
+# Simulação do jogo de luta sem janela: Game.py lê o teclado, chama step() e
+# desenha o mundo. Só usa pygame.Rect, então não precisa de pygame.init().
+# Um passo = um quadro a 60 FPS; cooldowns são contados em quadros para que a
+# mesma sequência de inputs sempre dê a mesma partida.
+
+WIDTH, HEIGHT = 1000, 700
+FPS = 60
+
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+BLACK = (0, 0, 0)
+
+GRAVITY = 0.5
+JUMP_STRENGTH = -10
+PLAYER_SPEED = 5
+BULLET_SPEED = 10
+SUPER_BULLET_SPEED = 15
+SHOT_COOLDOWN = 12         # quadros (200 ms)
+SUPER_SHOT_COOLDOWN = 90   # quadros (1500 ms)
+
+NORMAL_BULLET = BulletType(10, 5, BULLET_SPEED, 10, BLACK)
+SUPER_BULLET = BulletType(50, 25, SUPER_BULLET_SPEED, 45, RED)
+
+# Botões de um jogador num quadro (um byte por jogador)
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+SHOOT = 8          # tecla de tiro apertada neste quadro
+SUPER_SHOOT = 16   # tecla de super apertada neste quadro
+
+# Power-ups: aparecem de tempos em tempos em cima de um bloco da fase, somem
+# se ninguém pegar e dão um efeito com duração a quem pegar. Spawns,
+# expirações e efeitos são timers da partida (TimerWheel), em quadros.
+SHIELD = "escudo"            # tiros não tiram vida
+SPEED = "velocidade"         # anda o dobro
+RAPID_FIRE = "tiro_rapido"   # tiro normal com um terço da espera
+POWER_UP_KINDS = (SHIELD, SPEED, RAPID_FIRE)
+POWER_UP_SIZE = 30
+POWER_UP_INTERVAL = 480   # quadros entre spawns (8 s)
+POWER_UP_LIFETIME = 600   # quadros até sumir se ninguém pegar (10 s)
+POWER_UP_DURATION = 300   # quadros de efeito (5 s)
+MAX_POWER_UPS = 2
+
+
+class Player:
+    def __init__(self, x, y, color, direction):
+        self.rect = pygame.Rect(x, y, 40, 60)
+        self.color = color
+        self.direction = direction  # para onde os tiros vão (1 = direita)
+        self.velocity_y = 0
+        self.on_ground = False
+        self.health = 100
+        self.last_shot = -SHOT_COOLDOWN
+        self.last_super_shot = -SUPER_SHOT_COOLDOWN
+        self.buffs = {}  # power-up ativo -> timer que encerra o efeito
+
+    def move(self, buttons, world):
+        # Guardar posição anterior para verificar colisões
+        old_x = self.rect.x
+        speed = PLAYER_SPEED * 2 if SPEED in self.buffs else PLAYER_SPEED
+
+        if buttons & LEFT:
+            self.rect.x -= speed
+            if self.check_collision_horizontal(world.block_grid):
+                self.rect.x = old_x
+
+        if buttons & RIGHT:
+            self.rect.x += speed
+            if self.check_collision_horizontal(world.block_grid):
+                self.rect.x = old_x
+
+        # Limitar o player dentro da tela
+        if self.rect.left < 0:
+            self.rect.left = 0
+        if self.rect.right > world.width:
+            self.rect.right = world.width
+
+        if buttons & JUMP and self.on_ground:
+            self.velocity_y = JUMP_STRENGTH
+            self.on_ground = False
+
+    def apply_gravity(self, world):
+        # Aplicar gravidade
+        self.velocity_y += GRAVITY
+
+        # Deslocamento do quadro, com o mesmo arredondamento do Rect
+        rect = self.rect
+        old_y = rect.y
+        rect.y += self.velocity_y
+        dy = rect.y - old_y
+        rect.y = old_y
+
+        # Aplicar movimento vertical, parando no primeiro bloco do caminho
+        self.move_vertical(dy, world.block_grid, world.height)
+
+        # Verificar se tocou o chão da tela
+        if self.rect.bottom >= world.height:
+            self.rect.bottom = world.height
+            self.velocity_y = 0
+            self.on_ground = True
+
+    def check_collision_horizontal(self, grid):
+        return grid.collide(self.rect) is not None
+
+    def move_vertical(self, dy, grid, height):
+        # Colisão contínua: o primeiro bloco que o jogador encontra ao andar
+        # dy, mesmo caindo mais do que a espessura de uma plataforma por quadro
+        hit = grid.sweep(self.rect, 0, dy)
+        if hit is not None:
+            block = hit[1]
+            # Se está caindo (velocidade positiva)
+            if self.velocity_y > 0:
+                # Colidir por cima - pousar na plataforma
+                self.rect.bottom = block['rect'].top
+                self.velocity_y = 0
+                self.on_ground = True
+                return
+
+            # Se está subindo (velocidade negativa)
+            elif self.velocity_y < 0:
+                # Colidir por baixo - bater a cabeça
+                self.rect.top = block['rect'].bottom
+                self.velocity_y = 0
+                return
+
+        # Se chegou aqui, não está em contato com nenhum bloco
+        self.rect.y += dy
+        if self.velocity_y >= 0 and self.rect.bottom < height:
+            self.on_ground = False
+
+    def shoot(self, pool, kind=NORMAL_BULLET):
+        pool.spawn(self, kind, self.rect.centerx, self.rect.centery, self.direction)
+
+    def super_shoot(self, pool):
+        self.shoot(pool, SUPER_BULLET)
+
+    def shot_cooldown(self):
+        return SHOT_COOLDOWN // 3 if RAPID_FIRE in self.buffs else SHOT_COOLDOWN
+
+    def shot_cooldown_left(self, frame):
+        return max(0, self.shot_cooldown() - (frame - self.last_shot))
+
+    def super_cooldown_left(self, frame):
+        return max(0, SUPER_SHOT_COOLDOWN - (frame - self.last_super_shot))
+
+    def take_hit(self, damage):
+        if SHIELD not in self.buffs:
+            self.health -= damage
+
+    def add_buff(self, timers, kind, duration):
+        # Pegar o mesmo power-up de novo recomeça a contagem
+        timer = self.buffs.get(kind)
+        if timer is not None:
+            timers.reschedule(timer, duration)
+        else:
+            self.buffs[kind] = timers.schedule(duration, self.buffs.pop, kind)
+
+    def buff_left(self, timers, kind):
+        # Quadros de efeito que faltam (0 se não está ativo)
+        timer = self.buffs.get(kind)
+        return timers.remaining(timer) if timer is not None else 0
+
+
+class PowerUp:
+    __slots__ = ('rect', 'kind', 'expire')
+
+    def __init__(self, rect, kind):
+        self.rect = rect
+        self.kind = kind
+        self.expire = None  # timer que tira o power-up da fase
+
+
+class World:
+    def __init__(self, level=None, seed=None):
+        # A fase vem de um arquivo em levels/ (a arena clássica por padrão)
+        self.level = level if level is not None else load_level()
+        self.width = width = self.level.width
+        self.height = height = self.level.height
+        self.blocks = self.level.blocks
+        # Índice espacial dos blocos, montado uma vez ao carregar a fase
+        self.block_grid = build_block_grid(self.blocks)
+        # Balas dos dois jogadores, reaproveitadas durante toda a partida
+        self.bullet_pool = BulletPool()
+        spawns = self.level.spawns or [(50, height - 100), (width - 90, height - 100)]
+        self.players = [
+            Player(spawns[0][0], spawns[0][1], BLUE, 1),
+            Player(spawns[1][0], spawns[1][1], RED, -1),
+        ]
+        self.frame = 0
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Timers da partida (spawn e expiração de power-ups e efeitos)
+        self.timers = TimerWheel(self.frame)
+        self.power_ups = []
+        self.power_ups_spawned = 0
+        self.power_up_due = False
+        self.next_power_up = self.timers.schedule(POWER_UP_INTERVAL, power_up_timer, self)
+
+    def is_over(self):
+        return any(player.health <= 0 for player in self.players)
+
+
+def step(world, inputs):
+    # Avança um quadro. inputs[i] são os botões (LEFT, RIGHT, ...) do jogador i.
+    update_players(world, inputs)
+    update_bullets(world)
+    return world
+
+
+def update_players(world, inputs):
+    # Timers, tiros, movimento, gravidade e power-ups (primeira metade de step)
+    world.frame += 1
+    frame = world.frame
+    players = world.players
+    pool = world.bullet_pool
+
+    world.timers.advance_to(frame)
+    if world.power_up_due:
+        spawn_power_up(world)
+
+    for player, buttons in zip(players, inputs):
+        if buttons & SHOOT and frame - player.last_shot > player.shot_cooldown():
+            player.shoot(pool)
+            player.last_shot = frame
+        if buttons & SUPER_SHOOT and frame - player.last_super_shot > SUPER_SHOT_COOLDOWN:
+            player.super_shoot(pool)
+            player.last_super_shot = frame
+
+    for player, buttons in zip(players, inputs):
+        player.move(buttons, world)
+
+    for player in players:
+        player.apply_gravity(world)
+
+    collect_power_ups(world)
+
+
+def update_bullets(world):
+    world.bullet_pool.update(world.players, world.block_grid, world.width, world.frame)
+
+
+def power_up_timer(world):
+    # O spawn em si fica para depois dos outros timers do quadro (uma
+    # expiração no mesmo quadro libera lugar antes, em qualquer ordem)
+    world.power_up_due = True
+    world.next_power_up = world.timers.schedule(POWER_UP_INTERVAL, power_up_timer, world)
+
+
+def spawn_power_up(world):
+    # Lugar e tipo vêm da semente e do número do spawn (não de world.rng),
+    # então um estado salvo no meio da partida continua a mesma sequência
+    world.power_up_due = False
+    if len(world.power_ups) >= MAX_POWER_UPS:
+        return
+    rng = random.Random((world.seed or 0) * 100003 + world.power_ups_spawned)
+    world.power_ups_spawned += 1
+    kind = rng.choice(POWER_UP_KINDS)
+    blocks = [block['rect'] for block in world.blocks if block['rect'].width >= POWER_UP_SIZE]
+    # Em cima de um bloco, num lugar sem outro bloco (algumas tentativas)
+    for _ in range(5):
+        if not blocks:
+            return
+        block = rng.choice(blocks)
+        rect = pygame.Rect(rng.randint(block.left, block.right - POWER_UP_SIZE), block.top - POWER_UP_SIZE,
+                           POWER_UP_SIZE, POWER_UP_SIZE)
+        if rect.top >= 0 and world.block_grid.collide(rect) is None:
+            add_power_up(world, rect, kind, POWER_UP_LIFETIME)
+            return
+
+
+def add_power_up(world, rect, kind, lifetime):
+    item = PowerUp(rect, kind)
+    item.expire = world.timers.schedule(lifetime, world.power_ups.remove, item)
+    world.power_ups.append(item)
+    return item
+
+
+def collect_power_ups(world):
+    items = world.power_ups
+    if not items:
+        return
+    for player in world.players:
+        for item in items:
+            if player.rect.colliderect(item.rect):
+                world.timers.cancel(item.expire)
+                items.remove(item)
+                player.add_buff(world.timers, item.kind, POWER_UP_DURATION)
+                break
+
+
+# Estado salvo: cabeçalho + um registro fixo por jogador, bala ativa,
+# power-up na fase e efeito ativo. Os timers não são salvos como objetos: cada
+# registro guarda o quadro em que o seu timer vence e load_state os reagenda.
+STATE_MAGIC = b"TJWS"
+STATE_VERSION = 2
+STATE_HEADER = struct.Struct("<4sBIBHBBHI")   # magic, versão, quadro, jogadores, balas, power-ups,
+                                              # efeitos, power-ups criados, próximo spawn
+PLAYER_FORMAT = "iidBiii"                 # x, y, velocidade y, no chão, vida, último tiro, último super
+BULLET_FORMAT = "iiHHhhBBBBi"             # x, y, largura, altura, velocidade, dano, cor, dono, ttl
+POWER_UP_FORMAT = "iiBI"                  # x, y, tipo, quadro em que some
+BUFF_FORMAT = "BBI"                       # jogador, tipo, quadro em que acaba
+PLAYER_FIELDS = len(PLAYER_FORMAT)
+BULLET_FIELDS = len(BULLET_FORMAT)
+POWER_UP_FIELDS = len(POWER_UP_FORMAT)
+BUFF_FIELDS = len(BUFF_FORMAT)
+HEADER_FIELDS = 9
+
+_state_layouts = {}
+
+
+def _state_layout(n_players, n_bullets, n_power_ups=0, n_buffs=0):
+    # Um Struct por combinação de contagens, montado uma vez só
+    key = (n_players, n_bullets, n_power_ups, n_buffs)
+    layout = _state_layouts.get(key)
+    if layout is None:
+        layout = struct.Struct(STATE_HEADER.format + PLAYER_FORMAT * n_players + BULLET_FORMAT * n_bullets
+                               + POWER_UP_FORMAT * n_power_ups + BUFF_FORMAT * n_buffs)
+        _state_layouts[key] = layout
+    return layout
+
+
+class WorldState:
+    # Um quadro da partida num único bloco de bytes: quadro, jogadores e balas
+    # ativas (a fase não muda durante a partida). Capturar e restaurar é um
+    # struct.pack/unpack, sem copiar objetos, então serve para rollback da
+    # rede, save states, busca da IA e dumps de erro.
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def frame(self):
+        return STATE_HEADER.unpack_from(self.data)[2]
+
+    def __eq__(self, other):
+        return isinstance(other, WorldState) and self.data == other.data
+
+    def __hash__(self):
+        return hash(self.data)
+
+    def to_bytes(self):
+        return self.data
+
+    @classmethod
+    def from_bytes(cls, raw):
+        raw = bytes(raw)
+        if len(raw) < STATE_HEADER.size:
+            raise ValueError("estado incompleto")
+        magic, version, _, n_players, n_bullets, n_power_ups, n_buffs, _, _ = STATE_HEADER.unpack_from(raw)
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            raise ValueError("estado inválido")
+        if len(raw) != _state_layout(n_players, n_bullets, n_power_ups, n_buffs).size:
+            raise ValueError("estado incompleto")
+        return cls(raw)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def save_state(world):
+    players = world.players
+    active = world.bullet_pool.active
+    items = world.power_ups
+    n_buffs = sum(len(p.buffs) for p in players)
+    values = [STATE_MAGIC, STATE_VERSION, world.frame, len(players), len(active), len(items), n_buffs,
+              world.power_ups_spawned, world.next_power_up.due]
+    for p in players:
+        rect = p.rect
+        values += (rect.x, rect.y, p.velocity_y, p.on_ground, p.health, p.last_shot, p.last_super_shot)
+    for b in active:
+        rect = b.rect
+        r, g, bl = b.color
+        values += (rect.x, rect.y, rect.width, rect.height, b.velocity, b.damage, r, g, bl,
+                   players.index(b.owner), b.ttl)
+    for item in items:
+        values += (item.rect.x, item.rect.y, POWER_UP_KINDS.index(item.kind), item.expire.due)
+    for index, p in enumerate(players):
+        for kind, timer in p.buffs.items():
+            values += (index, POWER_UP_KINDS.index(kind), timer.due)
+    return WorldState(_state_layout(len(players), len(active), len(items), n_buffs).pack(*values))
+
+
+def load_state(world, state):
+    data = state.data
+    _, _, frame, n_players, n_bullets, n_power_ups, n_buffs, spawned, next_power_up = \
+        STATE_HEADER.unpack_from(data)
+    values = _state_layout(n_players, n_bullets, n_power_ups, n_buffs).unpack(data)
+    world.frame = frame
+    # Impactos de quadros desfeitos somem (a re-simulação registra os certos)
+    impacts = world.bullet_pool.impacts
+    if impacts:
+        impacts[:] = [impact for impact in impacts if impact[0] <= frame]
+
+    # Os timers são refeitos a partir dos quadros de vencimento salvos
+    timers = world.timers
+    timers.cancel(world.next_power_up)
+    for item in world.power_ups:
+        timers.cancel(item.expire)
+    for player in world.players:
+        for timer in player.buffs.values():
+            timers.cancel(timer)
+        player.buffs.clear()
+    world.power_ups.clear()
+    timers.rewind(frame)
+    world.power_ups_spawned = spawned
+    world.power_up_due = False
+    world.next_power_up = timers.schedule(next_power_up - frame, power_up_timer, world)
+
+    i = HEADER_FIELDS
+    players = world.players
+    for player in players:
+        rect = player.rect
+        rect.x, rect.y, player.velocity_y, on_ground, player.health, player.last_shot, player.last_super_shot = \
+            values[i:i + PLAYER_FIELDS]
+        player.on_ground = bool(on_ground)
+        i += PLAYER_FIELDS
+
+    pool = world.bullet_pool
+    pool.clear()
+    for _ in range(n_bullets):
+        x, y, width, height, velocity, damage, r, g, bl, owner, ttl = values[i:i + BULLET_FIELDS]
+        b = pool.take()
+        b.rect.update(x, y, width, height)
+        b.velocity = velocity
+        b.damage = damage
+        b.color = (r, g, bl)
+        b.owner = players[owner]
+        b.ttl = ttl
+        i += BULLET_FIELDS
+
+    for _ in range(n_power_ups):
+        x, y, kind, expire = values[i:i + POWER_UP_FIELDS]
+        add_power_up(world, pygame.Rect(x, y, POWER_UP_SIZE, POWER_UP_SIZE), POWER_UP_KINDS[kind], expire - frame)
+        i += POWER_UP_FIELDS
+
+    for _ in range(n_buffs):
+        index, kind, due = values[i:i + BUFF_FIELDS]
+        players[index].add_buff(timers, POWER_UP_KINDS[kind], due - frame)
+        i += BUFF_FIELDS
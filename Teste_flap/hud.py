@@ -0,0 +1,40 @@
+from collections import OrderedDict
+
+# Cache dos textos do HUD. font.render rasteriza o texto toda vez, então os
+# textos já desenhados ficam guardados por (texto, cor, fonte). Os textos que
+# mudam (vida, cooldown, score) ficam num LRU com tamanho limitado; os textos
+# fixos são "assados" uma vez e nunca saem do cache.
+
+
+class TextCache:
+    def __init__(self, font, max_size=256):
+        self.font = font
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.baked = {}
+
+    def render(self, text, color, font=None):
+        key = (text, color, font or self.font)
+        surface = self.baked.get(key)
+        if surface is not None:
+            return surface
+
+        cache = self.cache
+        surface = cache.get(key)
+        if surface is not None:
+            cache.move_to_end(key)
+            return surface
+
+        surface = key[2].render(text, True, color)
+        cache[key] = surface
+        if len(cache) > self.max_size:
+            cache.popitem(last=False)
+        return surface
+
+    def bake(self, text, color, font=None):
+        # Texto fixo: renderizado uma vez e mantido fora do LRU
+        key = (text, color, font or self.font)
+        surface = self.baked.get(key)
+        if surface is None:
+            surface = self.baked[key] = key[2].render(text, True, color)
+        return surface
@@ -0,0 +1,134 @@
+import time
+
+START = time.perf_counter()
+
+import argparse
+import importlib
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import window
+
+PYGAME_IMPORTED = time.perf_counter()
+
+# Menu com todos os jogos num processo só. Ao abrir, só o pygame e este
+# arquivo são carregados; o módulo de cada jogo é importado quando ele é
+# escolhido e a mesma janela é reaproveitada (muda só de tamanho). Fechar a
+# janela dentro de um jogo fecha o menu também.
+#
+# Uso: python launcher.py [--jogo N] [--medir]
+#
+# --medir mostra o tempo até o primeiro quadro do menu (contado do começo
+# deste arquivo, sem a partida do Python) e compara com STARTUP_TARGET_MS.
+
+WIDTH, HEIGHT = 500, 400
+STARTUP_TARGET_MS = 800   # a maior parte é o "import pygame"
+OWN_TARGET_MS = 50        # o que vem depois: janela, fonte e menu
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRAY = (120, 120, 120)
+BLUE = (0, 150, 255)
+
+# Tecla, nome, módulo e argumentos de cada opção (None = main() sem argumentos)
+GAMES = [
+    (pygame.K_1, "Luta (2 jogadores)", "Game", []),
+    (pygame.K_2, "Luta contra o computador", "Game", ["--bot"]),
+    (pygame.K_3, "Flappy Bird", "flappy", None),
+    (pygame.K_4, "Flappy Bird 2 jogadores", "flappy2", []),
+    (pygame.K_5, "Corrida de 100 IAs", "flappy2", ["--jogadores", "0", "--ia", "100"]),
+]
+
+
+def draw_menu(screen, selected):
+    title_font = window.font(48)
+    font = window.font(32)
+    screen.fill(WHITE)
+    title = title_font.render("Teste de Jogos", True, BLACK)
+    screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 30))
+    for i, (_, name, _, _) in enumerate(GAMES):
+        color = BLUE if i == selected else BLACK
+        text = font.render(f"{i + 1}. {name}", True, color)
+        screen.blit(text, (60, 110 + 45 * i))
+    hint = window.font(24).render(f"Setas + Enter ou 1-{len(GAMES)} para jogar, Esc para sair", True, GRAY)
+    screen.blit(hint, (WIDTH // 2 - hint.get_width() // 2, HEIGHT - 40))
+    pygame.display.update()
+
+
+def run_game(index):
+    _, _, module_name, args = GAMES[index]
+    module = importlib.import_module(module_name)
+    if args is None:
+        return module.main()
+    return module.main(list(args))
+
+
+def menu(measure=False):
+    screen = window.open_window((WIDTH, HEIGHT), "Teste de Jogos")
+    selected = 0
+    draw_menu(screen, selected)
+    if measure:
+        return report_startup()
+
+    clock = pygame.time.Clock()
+    while True:
+        clock.tick(30)
+        choice = None
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return None
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_ESCAPE:
+                return None
+            if event.key == pygame.K_UP:
+                selected = (selected - 1) % len(GAMES)
+            elif event.key == pygame.K_DOWN:
+                selected = (selected + 1) % len(GAMES)
+            elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                choice = selected
+            for i, game in enumerate(GAMES):
+                if event.key == game[0]:
+                    choice = i
+        if choice is not None:
+            if run_game(choice) == window.QUIT:
+                return None
+            screen = window.open_window((WIDTH, HEIGHT), "Teste de Jogos")
+            selected = choice
+            pygame.event.clear()
+        draw_menu(screen, selected)
+
+
+def report_startup():
+    now = time.perf_counter()
+    total = (now - START) * 1000
+    own = (now - PYGAME_IMPORTED) * 1000
+    print(f"import pygame: {(PYGAME_IMPORTED - START) * 1000:.0f} ms")
+    print(f"janela + menu: {own:.0f} ms (meta {OWN_TARGET_MS} ms)")
+    print(f"primeiro quadro: {total:.0f} ms (meta {STARTUP_TARGET_MS} ms)")
+    return total <= STARTUP_TARGET_MS and own <= OWN_TARGET_MS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menu dos jogos")
+    parser.add_argument("--jogo", type=int, choices=range(1, len(GAMES) + 1), help="abre direto um jogo")
+    parser.add_argument("--medir", action="store_true", help="mede o tempo até o menu aparecer e sai")
+    args = parser.parse_args()
+
+    result = True
+    if args.jogo:
+        window.init()
+        if run_game(args.jogo - 1) != window.QUIT:
+            menu()
+    else:
+        result = menu(args.medir)
+    window.close()
+    if args.medir and not result:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+
+import pygame
+
+# Fases em arquivo texto. Cada linha é um comando:
+#
+#   tamanho 1000 700              largura e altura da fase em pixels
+#   jogador 50 600                posição inicial (uma linha por jogador)
+#   bloco 0 660 1000 40 marrom    retângulo x y largura altura cor
+#   mapa 20                       daqui em diante, um mapa de tiles de 20 px
+#
+# No mapa cada caractere é um tile: '#' marrom, '-' verde, '=' cinza,
+# '%' cinza escuro; '.' ou espaço é vazio. Tiles iguais vizinhos na mesma linha
+# viram um bloco só, então uma fase grande continua com poucos blocos.
+# Linhas começando com '#' fora do mapa são comentários.
+
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+DEFAULT_LEVEL = "arena.txt"
+
+# Tamanho usado quando o arquivo não tem a linha "tamanho" (uma tela)
+WIDTH, HEIGHT = 1000, 700
+
+# Cores para blocos do cenário
+BROWN = (139, 69, 19)
+GREEN = (34, 139, 34)
+GRAY = (100, 100, 100)
+DARK_GRAY = (50, 50, 50)
+
+COLORS = {
+    "marrom": BROWN,
+    "verde": GREEN,
+    "cinza": GRAY,
+    "cinza_escuro": DARK_GRAY,
+}
+
+TILES = {
+    "#": BROWN,
+    "-": GREEN,
+    "=": GRAY,
+    "%": DARK_GRAY,
+}
+
+
+class Level:
+    def __init__(self, name, width, height, blocks, spawns):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.blocks = blocks
+        self.spawns = spawns
+
+
+def level_path(name):
+    # Aceita um caminho ou só o nome de um arquivo da pasta levels/
+    if os.path.exists(name):
+        return name
+    return os.path.join(LEVEL_DIR, name)
+
+
+def load_level(name=DEFAULT_LEVEL):
+    with open(level_path(name), encoding="utf-8") as f:
+        return parse_level(f.read(), name)
+
+
+def parse_level(text, name="fase"):
+    width, height = WIDTH, HEIGHT
+    blocks = []
+    spawns = []
+    tile = None
+    row = 0
+
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.rstrip()
+        if tile is not None:
+            blocks.extend(_tile_row(line, row, tile))
+            row += 1
+            continue
+
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        command, args = parts[0], parts[1:]
+        try:
+            if command == "tamanho":
+                width, height = int(args[0]), int(args[1])
+            elif command == "jogador":
+                spawns.append((int(args[0]), int(args[1])))
+            elif command == "bloco":
+                x, y, w, h = (int(v) for v in args[:4])
+                blocks.append({'rect': pygame.Rect(x, y, w, h), 'color': COLORS[args[4]]})
+            elif command == "mapa":
+                tile = int(args[0])
+            else:
+                raise ValueError(f"comando desconhecido: {command}")
+        except (IndexError, KeyError, ValueError) as e:
+            raise ValueError(f"{name}:{number}: linha inválida ({e})") from None
+
+    return Level(name, width, height, blocks, spawns)
+
+
+def _tile_row(line, row, tile):
+    # Junta tiles iguais seguidos da linha num único bloco
+    blocks = []
+    start = 0
+    while start < len(line):
+        char = line[start]
+        end = start + 1
+        while end < len(line) and line[end] == char:
+            end += 1
+        color = TILES.get(char)
+        if color is not None:
+            rect = pygame.Rect(start * tile, row * tile, (end - start) * tile, tile)
+            blocks.append({'rect': rect, 'color': color})
+        start = end
+    return blocks
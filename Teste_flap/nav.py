@@ -0,0 +1,330 @@
+import heapq
+import sys
+import time
+
+import pygame
+
+import game_sim
+from game_sim import JUMP, LEFT, PLAYER_SPEED, RIGHT, SHOOT, SUPER_SHOOT
+from level import load_level
+
+# Navegação para o jogador controlado pelo computador. Uma vez por fase é
+# montado um grafo: cada nó é um trecho de chão onde o jogador fica de pé
+# (topo livre de um bloco ou o chão da fase) e cada aresta é um pulo ou uma
+# queda de um trecho para outro. As arestas saem de simulações de verdade
+# (Player.move + apply_gravity, com as constantes de game_sim), a partir de
+# alguns pontos de cada trecho, então o bot pula exatamente como um jogador.
+#
+# Rotas são calculadas por destino (Dijkstra de trás para frente a partir do
+# trecho de destino) na primeira vez que alguém pede e ficam guardadas: a
+# decisão de cada quadro é só uma consulta a uma tabela.
+#
+# Uso: python nav.py [fase]    (monta o grafo e mede o tempo de decisão)
+
+PLAYER_WIDTH, PLAYER_HEIGHT = 40, 60
+LAUNCH_SPACING = 80   # distância entre pontos de pulo simulados num trecho
+MAX_AIR_FRAMES = 240  # simulações mais longas que isso são descartadas
+MAX_WALK_FRAMES = 20  # andando para fora da borda sem cair: não é queda
+JUMP_ACTIONS = (JUMP, JUMP | LEFT, JUMP | RIGHT)
+
+SHOOT_DISTANCE = 250  # distância que o bot tenta manter do adversário
+AIM_TOLERANCE = 40    # diferença de altura em que ainda vale atirar
+DODGE_DISTANCE = 120  # bala inimiga mais perto que isso: pula
+
+
+class Ledge:
+    # Trecho de chão: rect.x do jogador entre left e right, com rect.bottom == y
+    __slots__ = ('index', 'y', 'left', 'right', 'edges')
+
+    def __init__(self, index, y, left, right):
+        self.index = index
+        self.y = y
+        self.left = left
+        self.right = right
+        self.edges = []
+
+    def clamp(self, x):
+        return min(max(x, self.left), self.right)
+
+
+class Edge:
+    __slots__ = ('target', 'buttons', 'x', 'frames')
+
+    def __init__(self, target, buttons, x, frames):
+        self.target = target    # índice do trecho onde o pulo termina
+        self.buttons = buttons  # botões segurados do começo ao fim
+        self.x = x              # rect.x de onde sair
+        self.frames = frames    # quadros no ar
+
+
+class NavGraph:
+    def __init__(self, world):
+        self.world = world
+        self.ledges = []
+        self._rows = {}     # y -> trechos nessa altura
+        self._routes = {}   # destino -> próxima aresta de cada trecho
+        self._find_ledges()
+        for ledge in self.ledges:
+            self._find_edges(ledge)
+        # Arestas que chegam em cada trecho (para as rotas de trás para frente)
+        self._incoming = [[] for _ in self.ledges]
+        for ledge in self.ledges:
+            for edge in ledge.edges:
+                self._incoming[edge.target].append((ledge, edge))
+
+    # ---- montagem ----
+
+    def _find_ledges(self):
+        # Posições de pé, testadas de PLAYER_SPEED em PLAYER_SPEED em cima de
+        # cada bloco e no chão da fase; trechos na mesma altura que se tocam
+        # viram um trecho só
+        world = self.world
+        grid = world.block_grid
+        max_x = world.width - PLAYER_WIDTH
+        tops = [(block['rect'].top, block['rect'].left - PLAYER_WIDTH + 1, block['rect'].right - 1)
+                for block in world.blocks]
+        tops.append((world.height, 0, max_x))
+
+        runs = {}
+        probe = pygame.Rect(0, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+        for y, first, last in tops:
+            if y - PLAYER_HEIGHT < 0:
+                continue
+            probe.bottom = y
+            start = None
+            for x in range(max(first, 0), min(last, max_x) + 1, PLAYER_SPEED):
+                probe.x = x
+                if grid.collide(probe) is None:
+                    if start is None:
+                        start = x
+                    end = x
+                elif start is not None:
+                    runs.setdefault(y, []).append((start, end))
+                    start = None
+            if start is not None:
+                runs.setdefault(y, []).append((start, end))
+
+        for y in sorted(runs):
+            merged = []
+            for left, right in sorted(runs[y]):
+                if merged and left <= merged[-1][1] + PLAYER_SPEED:
+                    merged[-1][1] = max(merged[-1][1], right)
+                else:
+                    merged.append([left, right])
+            row = self._rows[y] = []
+            for left, right in merged:
+                ledge = Ledge(len(self.ledges), y, left, right)
+                self.ledges.append(ledge)
+                row.append(ledge)
+
+    def _find_edges(self, ledge):
+        launches = [(x, action) for x in range(ledge.left, ledge.right + 1, LAUNCH_SPACING)
+                    for action in JUMP_ACTIONS]
+        launches += [(ledge.right, action) for action in JUMP_ACTIONS]
+        # Andar para fora das bordas (queda sem pulo)
+        launches += [(ledge.left, LEFT), (ledge.right, RIGHT)]
+
+        best = {}
+        for x, buttons in launches:
+            landed = self._simulate(ledge, x, buttons)
+            if landed is None:
+                continue
+            target, frames = landed
+            if target is ledge:
+                continue
+            # Uma aresta por (destino, botões): a mais curta
+            key = (target.index, buttons)
+            if key not in best or frames < best[key].frames:
+                best[key] = Edge(target.index, buttons, x, frames)
+        ledge.edges = list(best.values())
+
+    def _simulate(self, ledge, x, buttons):
+        # Onde o jogador para de pé saindo de x com os botões segurados
+        world = self.world
+        player = game_sim.Player(x, ledge.y - PLAYER_HEIGHT, None, 1)
+        player.on_ground = True
+        airborne = False
+        for frame in range(1, MAX_AIR_FRAMES + 1):
+            player.move(buttons, world)
+            player.apply_gravity(world)
+            if not player.on_ground:
+                airborne = True
+            elif airborne:
+                target = self.ledge_at(player.rect)
+                return (target, frame) if target is not None else None
+            elif frame > MAX_WALK_FRAMES:
+                return None
+        return None
+
+    # ---- consultas ----
+
+    def ledge_at(self, rect):
+        # Trecho onde o retângulo está de pé (ou None)
+        for ledge in self._rows.get(rect.bottom, ()):
+            if ledge.left - PLAYER_SPEED < rect.x < ledge.right + PLAYER_SPEED:
+                return ledge
+        return None
+
+    def ledge_below(self, rect):
+        # Trecho mais alto abaixo do retângulo (para quem está no ar)
+        best = None
+        for ledge in self.ledges:
+            if (ledge.y >= rect.bottom and ledge.left - PLAYER_SPEED < rect.x < ledge.right + PLAYER_SPEED
+                    and (best is None or ledge.y < best.y)):
+                best = ledge
+        return best
+
+    def route(self, target):
+        # Próxima aresta de cada trecho no caminho mais curto até target
+        # (em quadros: pulo + caminhada até o ponto de saída)
+        hops = self._routes.get(target)
+        if hops is not None:
+            return hops
+        incoming = self._incoming
+        cost = [None] * len(self.ledges)
+        hops = [None] * len(self.ledges)
+        cost[target] = 0
+        queue = [(0, target)]
+        while queue:
+            c, node = heapq.heappop(queue)
+            if c > cost[node]:
+                continue
+            for source, edge in incoming[node]:
+                walk = abs(edge.x - (source.left + source.right) // 2) / PLAYER_SPEED
+                total = c + edge.frames + walk
+                index = source.index
+                if cost[index] is None or total < cost[index]:
+                    cost[index] = total
+                    hops[index] = edge
+                    heapq.heappush(queue, (total, index))
+        self._routes[target] = hops
+        return hops
+
+    def next_edge(self, ledge, target):
+        return self.route(target.index)[ledge.index]
+
+
+_graphs = {}
+
+
+def graph_for(world):
+    # Um grafo por fase, montado na primeira vez que é pedido
+    key = world.level.name
+    graph = _graphs.get(key)
+    if graph is None or graph.world.level is not world.level:
+        graph = _graphs[key] = NavGraph(world)
+    graph.world = world
+    return graph
+
+
+class Bot:
+    # Gera os botões de um jogador a cada quadro: anda pelo grafo até o
+    # trecho do alvo (um power-up, se houver, senão o adversário), fica a
+    # SHOOT_DISTANCE dele do lado certo para atirar e pula balas que chegam
+    def __init__(self, graph, index):
+        self.graph = graph
+        self.index = index
+        self.edge = None        # pulo em andamento
+        self.enemy_ledge = None
+        self._item_ledges = {}  # power-up -> trecho embaixo dele
+
+    def decide(self, world):
+        graph = self.graph
+        me = world.players[self.index]
+        enemy = world.players[1 - self.index]
+        buttons = self._shots(world, me, enemy)
+
+        # No ar: segue o pulo até pousar
+        if not me.on_ground:
+            if self.edge is not None:
+                buttons |= self.edge.buttons & (LEFT | RIGHT)
+            return buttons
+        self.edge = None
+
+        if enemy.on_ground:
+            self.enemy_ledge = graph.ledge_at(enemy.rect) or self.enemy_ledge
+        ledge = graph.ledge_at(me.rect)
+        target, goal_x = self._target(world, me, enemy)
+        if ledge is None or target is None or target is ledge:
+            if self._incoming(world, me):
+                buttons |= JUMP
+            return buttons | self._walk(me.rect.x, goal_x if ledge is None else ledge.clamp(goal_x))
+
+        edge = graph.next_edge(ledge, target)
+        if edge is None:
+            # Sem caminho: espera no ponto do trecho mais perto do alvo
+            return buttons | self._walk(me.rect.x, ledge.clamp(goal_x))
+        speed = PLAYER_SPEED * 2 if game_sim.SPEED in me.buffs else PLAYER_SPEED
+        if abs(me.rect.x - edge.x) < speed:
+            self.edge = edge
+            return buttons | edge.buttons
+        return buttons | self._walk(me.rect.x, edge.x)
+
+    def _target(self, world, me, enemy):
+        # Trecho do alvo e x desejado nele
+        graph = self.graph
+        if world.power_ups:
+            item = min(world.power_ups, key=lambda item: abs(item.rect.x - me.rect.x) + abs(item.rect.y - me.rect.y))
+            ledge = self._item_ledges.get(item, False)
+            if ledge is False:
+                if len(self._item_ledges) > 16:
+                    self._item_ledges.clear()
+                ledge = self._item_ledges[item] = graph.ledge_below(item.rect)
+            if ledge is not None:
+                return ledge, item.rect.centerx - PLAYER_WIDTH // 2
+        # Atrás do adversário em relação à direção do tiro
+        return self.enemy_ledge, enemy.rect.x - me.direction * SHOOT_DISTANCE
+
+    def _shots(self, world, me, enemy):
+        # Atira quando o adversário está na frente e mais ou menos na mesma altura
+        dx = enemy.rect.centerx - me.rect.centerx
+        if dx * me.direction <= 0 or abs(enemy.rect.centery - me.rect.centery) > AIM_TOLERANCE:
+            return 0
+        # (a simulação só deixa sair o tiro quando a espera acabou)
+        return SHOOT | SUPER_SHOOT
+
+    def _incoming(self, world, me):
+        rect = me.rect
+        for bullet in world.bullet_pool.active:
+            if bullet.owner is me or not rect.top <= bullet.rect.centery <= rect.bottom:
+                continue
+            dx = rect.centerx - bullet.rect.centerx
+            if 0 < dx * bullet.velocity and abs(dx) < DODGE_DISTANCE:
+                return True
+        return False
+
+    @staticmethod
+    def _walk(x, goal):
+        if goal < x - PLAYER_SPEED // 2:
+            return LEFT
+        if goal > x + PLAYER_SPEED // 2:
+            return RIGHT
+        return 0
+
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "arena.txt"
+    world = game_sim.World(load_level(name))
+    start = time.perf_counter()
+    graph = graph_for(world)
+    built = time.perf_counter() - start
+    n_edges = sum(len(ledge.edges) for ledge in graph.ledges)
+    print(f"{name}: {len(graph.ledges)} trechos, {n_edges} pulos, montado em {built * 1000:.0f} ms")
+
+    # Dois bots jogando um contra o outro
+    bots = [Bot(graph, 0), Bot(graph, 1)]
+    frames = 3600
+    decide = 0.0
+    for _ in range(frames):
+        start = time.perf_counter()
+        inputs = [bot.decide(world) for bot in bots]
+        decide += time.perf_counter() - start
+        game_sim.step(world, inputs)
+        if world.is_over():
+            break
+    print(f"{world.frame} quadros, vida {[p.health for p in world.players]}, "
+          f"decisão média {decide / world.frame / len(bots) * 1e6:.1f} us por bot")
+
+
+if __name__ == "__main__":
+    main()
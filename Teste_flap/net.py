@@ -0,0 +1,626 @@
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+
+import game_sim
+import replay
+from level import DEFAULT_LEVEL, load_level
+
+# Jogo de luta pela rede (UDP). Os dois lados rodam a mesma simulação
+# determinística e trocam só os botões de cada quadro. O jogador local não
+# espera o outro: os botões remotos que ainda não chegaram são previstos
+# (repete o último conhecido) e, quando chegam diferentes, o mundo volta para
+# o quadro errado (rollback) e é re-simulado até o quadro atual.
+#
+# Cada pacote de inputs repete todos os quadros que o outro lado ainda não
+# confirmou, então uma perda não trava o jogo. O host manda de tempos em
+# tempos o estado de um quadro confirmado, comprimido como diferença (XOR +
+# zlib) em relação ao último estado que o cliente confirmou ter recebido; o
+# cliente compara com o seu e se corrige se tiver dessincronizado.
+#
+# O socket roda num loop asyncio numa thread separada; o jogo só chama
+# send() e receive(). Latência e perda podem ser simuladas no envio.
+#
+# Teste no próprio computador: python net.py --teste [--latencia 100] [--perda 0.05]
+
+PORT = 50007
+PROTOCOL = b"TJN1"
+
+INPUT_DELAY = 2         # quadros entre apertar e o botão valer (menos rollback)
+MAX_PREDICTION = 8      # quadros à frente do último input remoto antes de esperar
+MAX_INPUTS_PER_PACKET = 64
+SNAPSHOT_INTERVAL = 60  # quadros entre estados enviados pelo host
+SYNC_INTERVAL = 30      # quadros entre ajustes de ritmo entre os dois lados
+HANDSHAKE_RETRY = 0.1   # segundos
+DISCONNECT_TIMEOUT = 5.0
+
+HELLO = 0
+START = 1
+INPUT = 2
+SNAPSHOT = 3
+BYE = 4
+
+LEVEL_NAME_BYTES = 32
+
+HELLO_PACKET = struct.Struct("<B4s")        # tipo, protocolo
+START_PACKET = struct.Struct(f"<Bq{LEVEL_NAME_BYTES}s")  # tipo, semente, fase
+INPUT_PACKET = struct.Struct("<BIIIIbB")    # tipo, quadro, ack, ack do estado, primeiro quadro, vantagem, quantidade
+SNAPSHOT_PACKET = struct.Struct("<BIiI")    # tipo, quadro, quadro base (-1 = nenhum), tamanho
+BYE_PACKET = struct.Struct("<B")
+
+
+def check_level_name(level_name):
+    # O nome da fase vai no START com tamanho fixo; cortar mudaria a fase do cliente
+    if len(level_name.encode("utf-8")) > LEVEL_NAME_BYTES:
+        raise ValueError(f"nome da fase maior que {LEVEL_NAME_BYTES} bytes: {level_name}")
+
+
+def xor_delta(data, base):
+    # Bytes iguais viram zero, que o zlib comprime quase de graça
+    if len(base) < len(data):
+        base = base + bytes(len(data) - len(base))
+    return (int.from_bytes(data, "little") ^ int.from_bytes(base[:len(data)], "little")).to_bytes(len(data), "little")
+
+
+class NetStats:
+    def __init__(self):
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.rollbacks = 0
+        self.rollback_frames = 0
+        self.max_rollback = 0
+        self.last_rollback = 0
+        self.stalls = 0
+        self.desyncs = 0
+        self.malformed = 0  # pacotes descartados por estarem cortados ou corrompidos
+        # Valores do último segundo completo
+        self.sent_per_second = 0
+        self.received_per_second = 0
+        self.max_rollback_per_second = 0
+        self._window_start = time.perf_counter()
+        self._window_sent = 0
+        self._window_received = 0
+        self._window_rollback = 0
+
+    def sent(self, size):
+        self.bytes_sent += size
+        self.packets_sent += 1
+        self._window_sent += size
+
+    def received(self, size):
+        self.bytes_received += size
+        self.packets_received += 1
+        self._window_received += size
+
+    def rollback(self, depth):
+        self.rollbacks += 1
+        self.rollback_frames += depth
+        self.last_rollback = depth
+        self.max_rollback = max(self.max_rollback, depth)
+        self._window_rollback = max(self._window_rollback, depth)
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        elapsed = now - self._window_start
+        if elapsed < 1.0:
+            return False
+        self.sent_per_second = self._window_sent / elapsed
+        self.received_per_second = self._window_received / elapsed
+        self.max_rollback_per_second = self._window_rollback
+        self._window_start = now
+        self._window_sent = self._window_received = self._window_rollback = 0
+        return True
+
+    def summary(self):
+        average = self.rollback_frames / self.rollbacks if self.rollbacks else 0
+        return (f"enviados {self.bytes_sent} B em {self.packets_sent} pacotes, "
+                f"recebidos {self.bytes_received} B em {self.packets_received} pacotes, "
+                f"{self.rollbacks} rollbacks (média {average:.1f}, máx {self.max_rollback} quadros), "
+                f"{self.stalls} esperas, {self.desyncs} dessincronizações")
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, link):
+        self.link = link
+
+    def datagram_received(self, data, addr):
+        self.link._received(data, addr)
+
+
+class UdpLink:
+    # Socket UDP servido por um loop asyncio numa thread própria. latency e
+    # jitter (segundos) e loss (fração) são aplicados em cada pacote enviado.
+    def __init__(self, local_addr, remote_addr=None, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.local_addr = local_addr
+        self.remote_addr = remote_addr
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.inbox = deque()
+        self.last_received = time.perf_counter()
+        self._loop = None
+        self._transport = None
+        self._thread = None
+
+    def start(self):
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            loop = self._loop = asyncio.new_event_loop()
+            try:
+                self._transport, _ = loop.run_until_complete(
+                    loop.create_datagram_endpoint(lambda: _Protocol(self), local_addr=self.local_addr))
+            except OSError as e:
+                errors.append(e)
+                ready.set()
+                loop.close()
+                return
+            self.local_addr = self._transport.get_extra_info("sockname")
+            ready.set()
+            loop.run_forever()
+            self._transport.close()
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="rede", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def _received(self, data, addr):
+        # Roda na thread da rede; o host descobre o endereço do cliente aqui
+        if self.remote_addr is None:
+            self.remote_addr = addr
+        self.last_received = time.perf_counter()
+        self.inbox.append(data)
+
+    def send(self, data):
+        if self.remote_addr is not None:
+            self._loop.call_soon_threadsafe(self._send, data, self.remote_addr)
+
+    def _send(self, data, addr):
+        if self.loss and self.rng.random() < self.loss:
+            return
+        delay = self.latency + self.jitter * self.rng.random()
+        if delay > 0:
+            self._loop.call_later(delay, self._transport.sendto, data, addr)
+        else:
+            self._transport.sendto(data, addr)
+
+    def receive(self):
+        inbox = self.inbox
+        while inbox:
+            yield inbox.popleft()
+
+    def close(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(1.0)
+
+
+def host(link, seed, level_name, idle=None, timeout=None):
+    # Espera o HELLO do cliente e responde com a semente e a fase
+    check_level_name(level_name)
+    start = time.perf_counter()
+    packet = START_PACKET.pack(START, seed, level_name.encode("utf-8"))
+    while True:
+        for data in link.receive():
+            # Pacotes curtos ou de outro programa são ignorados
+            if len(data) >= HELLO_PACKET.size and data[0] == HELLO and HELLO_PACKET.unpack_from(data)[1] == PROTOCOL:
+                link.send(packet)
+                return True
+        if idle is not None and idle() is False:
+            return False
+        if timeout is not None and time.perf_counter() - start > timeout:
+            return False
+        time.sleep(0.01)
+
+
+def join(link, idle=None, timeout=None):
+    # Manda HELLO até o host responder; devolve (semente, fase) ou None
+    start = last_hello = time.perf_counter()
+    hello = HELLO_PACKET.pack(HELLO, PROTOCOL)
+    link.send(hello)
+    while True:
+        for data in link.receive():
+            if len(data) >= START_PACKET.size and data[0] == START:
+                _, seed, level_name = START_PACKET.unpack_from(data)
+                try:
+                    return seed, level_name.rstrip(b"\0").decode("utf-8")
+                except UnicodeDecodeError:
+                    continue
+        now = time.perf_counter()
+        if now - last_hello > HANDSHAKE_RETRY:
+            link.send(hello)
+            last_hello = now
+        if idle is not None and idle() is False:
+            return None
+        if timeout is not None and now - start > timeout:
+            return None
+        time.sleep(0.01)
+
+
+class RollbackSession:
+    # "Quadro f" é o passo que leva world.frame de f - 1 para f. states[k]
+    # guarda o mundo com world.frame == k (antes de simular o quadro k + 1).
+    def __init__(self, world, local, link, input_log=None, input_delay=INPUT_DELAY):
+        self.world = world
+        self.local = local
+        self.remote = 1 - local
+        self.link = link
+        self.input_log = input_log
+        self.delay = input_delay
+        self.inputs = ({}, {})
+        self.predicted = {}
+        self.states = {}
+        self.stats = NetStats()
+        # Primeiros quadros sem botão local (o atraso de input)
+        for f in range(1, input_delay + 1):
+            self.inputs[local][f] = 0
+        self.local_frame = input_delay   # último quadro com botão local
+        self.remote_frame = 0            # último quadro com todos os botões remotos
+        self.confirmed = 0               # último quadro sem previsão nenhuma
+        self.peer_ack = 0                # último quadro local que o outro lado já tem
+        self.peer_frame = 0
+        self.peer_advantage = 0
+        self.rollback_to = None
+        self.wait = 0
+        self.peer_left = False
+        # Estados enviados (host) ou recebidos (cliente), para a diferença
+        self.snapshots = {}
+        self.snapshot_ack = -1
+        # Cliente: estados confirmados esperando o estado do host para comparar
+        self.own_snapshots = {}
+
+    def add_local_input(self, buttons):
+        # Botões apertados agora valem daqui a "delay" quadros
+        if self.local_frame - self.world.frame > self.delay:
+            return
+        self.local_frame += 1
+        self.inputs[self.local][self.local_frame] = buttons
+
+    def remote_input(self, frame):
+        remote = self.inputs[self.remote]
+        if frame <= self.remote_frame:
+            return remote[frame]
+        return remote.get(frame, remote.get(self.remote_frame, 0))
+
+    def frame_inputs(self, frame):
+        local = self.inputs[self.local].get(frame, 0)
+        remote = self.remote_input(frame)
+        if frame > self.remote_frame and frame not in self.inputs[self.remote]:
+            self.predicted[frame] = remote
+        return (local, remote) if self.local == 0 else (remote, local)
+
+    # ---- pacotes ----
+
+    def receive(self):
+        for data in self.link.receive():
+            self.stats.received(len(data))
+            if not data:
+                continue
+            kind = data[0]
+            try:
+                if kind == INPUT:
+                    self._receive_inputs(data)
+                elif kind == SNAPSHOT:
+                    self._receive_snapshot(data)
+            except (struct.error, zlib.error):
+                # Pacote cortado ou corrompido: a rede é de fora, só descarta
+                self.stats.malformed += 1
+                continue
+            if kind == BYE:
+                self.peer_left = True
+            elif kind == HELLO and self.local == 0:
+                # O START se perdeu e o cliente ainda está esperando
+                self._send(START_PACKET.pack(START, self.world.seed or 0,
+                                             self.world.level.name.encode("utf-8")))
+        if time.perf_counter() - self.link.last_received > DISCONNECT_TIMEOUT:
+            self.peer_left = True
+
+    def _receive_inputs(self, data):
+        _, peer_frame, ack, snapshot_ack, first, advantage, count = INPUT_PACKET.unpack_from(data)
+        self.peer_frame = max(self.peer_frame, peer_frame)
+        self.peer_ack = max(self.peer_ack, ack)
+        self.peer_advantage = advantage
+        if snapshot_ack != 0xFFFFFFFF:
+            self.snapshot_ack = max(self.snapshot_ack, snapshot_ack)
+        remote = self.inputs[self.remote]
+        world_frame = self.world.frame
+        buttons = data[INPUT_PACKET.size:INPUT_PACKET.size + count]
+        for frame, value in enumerate(buttons, first):
+            if frame <= self.remote_frame or frame in remote:
+                continue
+            remote[frame] = value
+            # Quadro já simulado com um palpite errado: volta até ele
+            if frame <= world_frame and self.predicted.get(frame, value) != value:
+                if self.rollback_to is None or frame < self.rollback_to:
+                    self.rollback_to = frame
+        while self.remote_frame + 1 in remote:
+            self.remote_frame += 1
+
+    def _receive_snapshot(self, data):
+        _, frame, base, size = SNAPSHOT_PACKET.unpack_from(data)
+        if frame in self.snapshots:
+            return
+        raw = zlib.decompress(data[SNAPSHOT_PACKET.size:])
+        if base >= 0:
+            if base not in self.snapshots:
+                return
+            raw = xor_delta(raw, self.snapshots[base])
+        raw = raw[:size]
+        self.snapshots[frame] = raw
+        self.snapshot_ack = max(self.snapshot_ack, frame)
+        for old in [k for k in self.snapshots if k < self.snapshot_ack]:
+            del self.snapshots[old]
+
+    def _send(self, data):
+        self.stats.sent(len(data))
+        self.link.send(data)
+
+    def send_inputs(self):
+        first = self.peer_ack + 1
+        last = min(self.local_frame, first + MAX_INPUTS_PER_PACKET - 1)
+        local = self.inputs[self.local]
+        buttons = bytes(local[f] for f in range(first, last + 1))
+        advantage = max(-128, min(127, self.world.frame - self.peer_frame))
+        snapshot_ack = self.snapshot_ack if self.snapshot_ack >= 0 else 0xFFFFFFFF
+        self._send(INPUT_PACKET.pack(INPUT, self.world.frame, self.remote_frame, snapshot_ack,
+                                     first, advantage, len(buttons)) + buttons)
+
+    def send_snapshot(self, frame, state):
+        raw = state.to_bytes()
+        base = self.snapshot_ack if self.snapshot_ack in self.snapshots else -1
+        payload = xor_delta(raw, self.snapshots[base]) if base >= 0 else raw
+        self.snapshots[frame] = raw
+        for old in [k for k in self.snapshots if k < self.snapshot_ack]:
+            del self.snapshots[old]
+        self._send(SNAPSHOT_PACKET.pack(SNAPSHOT, frame, base, len(raw)) + zlib.compress(payload))
+
+    def bye(self):
+        for _ in range(3):
+            self._send(BYE_PACKET.pack(BYE))
+
+    # ---- simulação ----
+
+    def _simulate(self, frame):
+        self.states[self.world.frame] = game_sim.save_state(self.world)
+        game_sim.step(self.world, self.frame_inputs(frame))
+
+    def state_at(self, frame):
+        if frame == self.world.frame:
+            return game_sim.save_state(self.world)
+        return self.states.get(frame)
+
+    def sync(self):
+        # Recebe pacotes, corrige palpites errados e confirma quadros, sem avançar
+        self.receive()
+        world = self.world
+
+        if self.rollback_to is not None:
+            target = world.frame
+            start = self.rollback_to
+            self.rollback_to = None
+            game_sim.load_state(world, self.states[start - 1])
+            for frame in range(start, target + 1):
+                self.predicted.pop(frame, None)
+                self._simulate(frame)
+            self.stats.rollback(target - start + 1)
+
+        confirmed = min(self.remote_frame, world.frame)
+        if confirmed > self.confirmed:
+            for frame in range(self.confirmed + 1, confirmed + 1):
+                if self.input_log is not None:
+                    self.input_log.record((self.inputs[0][frame], self.inputs[1][frame]))
+                # Host manda o estado de tempos em tempos; o cliente guarda o
+                # seu para comparar quando o do host chegar
+                if frame % SNAPSHOT_INTERVAL == 0:
+                    if self.local == 0:
+                        self.send_snapshot(frame, self.state_at(frame))
+                    else:
+                        self.own_snapshots[frame] = self.state_at(frame).to_bytes()
+            self.confirmed = confirmed
+
+        if self.own_snapshots and self._check_snapshots():
+            return self.sync()
+
+        # Descarta o que nenhum rollback vai precisar. Os inputs desde o
+        # estado mais antigo ainda não conferido ficam, para re-simular a
+        # partir dele se o host disser que dessincronizou.
+        floor = min(self.own_snapshots, default=self.confirmed)
+        keep = min(self.remote_frame, world.frame)
+        for old in [k for k in self.states if k < keep]:
+            del self.states[old]
+        for old in [k for k in self.predicted if k <= self.confirmed]:
+            del self.predicted[old]
+        remote = self.inputs[self.remote]
+        for old in [k for k in remote if k < floor]:
+            del remote[old]
+        local = self.inputs[self.local]
+        for old in [k for k in local if k < floor and k <= self.peer_ack]:
+            del local[old]
+
+    def _check_snapshots(self):
+        # Compara os estados confirmados do cliente com os do host. Se algum
+        # for diferente, o do host vale e o mundo é re-simulado a partir dele.
+        world = self.world
+        newest = max(self.snapshots, default=-1)
+        for frame in sorted(self.own_snapshots):
+            if frame in self.snapshots:
+                own = self.own_snapshots.pop(frame)
+                raw = self.snapshots[frame]
+                if own == raw:
+                    continue
+                self.stats.desyncs += 1
+                self.own_snapshots.clear()
+                fixed = game_sim.WorldState.from_bytes(raw)
+                if frame == world.frame:
+                    game_sim.load_state(world, fixed)
+                    return False
+                self.states[frame] = fixed
+                self.rollback_to = frame + 1
+                return True
+            if frame < newest:
+                # O estado do host para este quadro se perdeu
+                del self.own_snapshots[frame]
+        return False
+
+    def advance(self):
+        # Um quadro do jogo: devolve False quando está esperando o outro lado
+        self.sync()
+        world = self.world
+        advanced = False
+        if self.wait > 0:
+            self.wait -= 1
+            self.stats.stalls += 1
+        elif world.frame + 1 - self.remote_frame > MAX_PREDICTION or world.frame + 1 > self.local_frame:
+            self.stats.stalls += 1
+        else:
+            self._simulate(world.frame + 1)
+            advanced = True
+            # Quem está adiantado segura alguns quadros para o outro alcançar
+            if world.frame % SYNC_INTERVAL == 0:
+                ahead = (world.frame - self.peer_frame) - self.peer_advantage
+                self.wait = min(4, ahead // 2) if ahead >= 2 else 0
+
+        self.send_inputs()
+        self.stats.tick()
+        return advanced
+
+    def hold(self):
+        # Fica parado no quadro atual só trocando pacotes, até ele ser
+        # confirmado (ou desfeito por um rollback)
+        self.sync()
+        self.send_inputs()
+        self.stats.tick()
+
+    def close(self):
+        self.bye()
+        self.link.close()
+
+
+# ---- teste no loopback ----
+
+class ScriptedPlayer:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.move = 0
+
+    def buttons(self, frame):
+        rng = self.rng
+        if frame % 20 == 0:
+            self.move = rng.choice((0, game_sim.LEFT, game_sim.RIGHT))
+        buttons = self.move
+        if rng.random() < 0.05:
+            buttons |= game_sim.JUMP
+        if rng.random() < 0.08:
+            buttons |= game_sim.SHOOT
+        if rng.random() < 0.01:
+            buttons |= game_sim.SUPER_SHOOT
+        return buttons
+
+
+def loopback_test(frames, latency_ms, loss, jitter_ms=0, level_name=DEFAULT_LEVEL, seed=1):
+    # Host e cliente no mesmo processo, cada um com seu socket e link simulado
+    one_way = latency_ms / 2000
+    jitter = jitter_ms / 1000
+    host_link = UdpLink(("127.0.0.1", 0), latency=one_way, jitter=jitter, loss=loss, seed=seed).start()
+    client_link = UdpLink(("127.0.0.1", 0), host_link.local_addr,
+                          latency=one_way, jitter=jitter, loss=loss, seed=seed + 1).start()
+
+    result = {}
+
+    def run_client():
+        joined = join(client_link, timeout=10)
+        result["joined"] = joined
+
+    client_thread = threading.Thread(target=run_client)
+    client_thread.start()
+    if not host(host_link, seed, level_name, timeout=10):
+        raise RuntimeError("o cliente não conectou")
+    client_thread.join()
+    if result["joined"] is None:
+        raise RuntimeError("o host não respondeu")
+    client_seed, client_level = result["joined"]
+
+    level = load_level(level_name)
+    logs = [replay.InputLog(replay.GAME_LUTA, seed, 2, level_name),
+            replay.InputLog(replay.GAME_LUTA, client_seed, 2, client_level)]
+    sessions = [
+        RollbackSession(game_sim.World(level, seed), 0, host_link, logs[0]),
+        RollbackSession(game_sim.World(load_level(client_level), client_seed), 1, client_link, logs[1]),
+    ]
+    players = [ScriptedPlayer(seed * 2), ScriptedPlayer(seed * 2 + 1)]
+
+    # Os dois a 60 quadros por segundo de relógio, como no jogo
+    period = 1 / game_sim.FPS
+    next_tick = time.perf_counter()
+    start = next_tick
+    while any(s.world.frame < frames for s in sessions):
+        for session, player in zip(sessions, players):
+            if session.local_frame < frames:
+                session.add_local_input(player.buttons(session.local_frame + 1))
+            if session.world.frame < frames:
+                session.advance()
+            else:
+                session.sync()
+                session.send_inputs()
+        next_tick += period
+        time.sleep(max(0, next_tick - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+
+    # Espera os últimos inputs chegarem para comparar os dois mundos
+    deadline = time.perf_counter() + 5
+    while any(s.confirmed < frames for s in sessions) and time.perf_counter() < deadline:
+        for session in sessions:
+            session.sync()
+            session.send_inputs()
+        time.sleep(period)
+
+    for session in sessions:
+        session.close()
+
+    states = [game_sim.save_state(s.world) for s in sessions]
+    replayed = game_sim.save_state(replay.run(logs[0]))
+    return sessions, elapsed, states[0] == states[1] == replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste da rede do jogo de luta no loopback")
+    parser.add_argument("--teste", action="store_true", help="roda host e cliente neste processo")
+    parser.add_argument("--quadros", type=int, default=600)
+    parser.add_argument("--latencia", type=float, default=100, help="RTT simulado em ms")
+    parser.add_argument("--jitter", type=float, default=0, help="variação da latência em ms")
+    parser.add_argument("--perda", type=float, default=0.0, help="fração de pacotes perdidos")
+    parser.add_argument("--fase", default=DEFAULT_LEVEL)
+    args = parser.parse_args()
+    if not args.teste:
+        print("Para jogar: python Game.py --host ou python Game.py --conectar IP")
+        print("Para testar a rede: python net.py --teste")
+        sys.exit(1)
+
+    sessions, elapsed, same = loopback_test(args.quadros, args.latencia, args.perda, args.jitter, args.fase)
+    for name, session in zip(("host", "cliente"), sessions):
+        stats = session.stats
+        print(f"{name}: {stats.summary()}")
+        print(f"  {stats.bytes_sent / elapsed:.0f} B/s enviados, {stats.bytes_received / elapsed:.0f} B/s recebidos")
+    print(f"{args.quadros} quadros em {elapsed:.1f} s, RTT {args.latencia:.0f} ms, perda {args.perda:.0%}")
+    print("Mundos iguais nos dois lados:", "sim" if same else "NÃO")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
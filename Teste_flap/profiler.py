@@ -0,0 +1,207 @@
+import json
+import os
+import time
+
+import pygame
+
+import window
+
+# Profiler por fase do quadro. O loop chama begin_frame(), mark("fase") no
+# começo de cada fase e end_frame() no fim; cada fase dura até o próximo mark.
+# Com F3 aparece um gráfico dos últimos quadros (uma cor por fase e uma linha
+# no limite de 16,6 ms). Opcionalmente cada quadro é gravado num CSV ou num
+# trace do Chrome (chrome://tracing / Perfetto), escolhido pela extensão.
+# O CSV tem uma linha por fase de cada quadro (frame,phase,ms), então fases
+# que só aparecem depois (rede, por exemplo) também entram; a fase "quadro"
+# é o total do quadro.
+#
+# Variáveis de ambiente: PROFILE=1 liga o overlay no começo,
+# PROFILE_TRACE=arquivo.csv|arquivo.json grava os tempos.
+
+TOGGLE_KEY = pygame.K_F3
+FRAME_BUDGET_MS = 1000 / 60
+
+GRAPH_WIDTH = 240
+GRAPH_HEIGHT = 100
+GRAPH_SCALE = 3  # pixels por ms (o limite de 16,6 ms fica a 50 px da base)
+LEGEND_EVERY = 30  # quadros entre atualizações da legenda
+
+PHASE_COLORS = [
+    (66, 133, 244), (219, 68, 55), (244, 180, 0), (15, 157, 88),
+    (171, 71, 188), (0, 172, 193), (255, 112, 67), (158, 157, 36),
+]
+BACKGROUND = (20, 20, 20)
+BUDGET_COLOR = (255, 255, 255)
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, trace_path=None):
+        self.enabled = enabled
+        self.phases = []          # nomes na ordem em que apareceram
+        self.last = {}            # ms de cada fase no último quadro
+        self.totals = {}          # soma desde a última legenda
+        self.frame = 0
+        self._frame_start = 0
+        self._phase = None
+        self._phase_start = 0
+        self._durations = {}
+        self._graph = None
+        self._legend = []
+        self._legend_frames = 0
+        self._trace = None
+        self._trace_kind = None
+        self._trace_first = True
+        if trace_path:
+            self.open_trace(trace_path)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("PROFILE") == "1", os.environ.get("PROFILE_TRACE"))
+
+    @property
+    def active(self):
+        return self.enabled or self._trace is not None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == TOGGLE_KEY:
+            self.toggle()
+            return True
+        return False
+
+    def begin_frame(self):
+        if not self.active:
+            return
+        self._frame_start = self._phase_start = time.perf_counter_ns()
+        self._phase = None
+        self._durations.clear()
+
+    def mark(self, phase):
+        if not self.active:
+            return
+        now = time.perf_counter_ns()
+        if self._phase is not None:
+            self._durations[self._phase] = self._durations.get(self._phase, 0) + now - self._phase_start
+        elif now > self._phase_start:
+            self._durations["outros"] = now - self._phase_start
+        self._phase = phase
+        self._phase_start = now
+
+    def end_frame(self):
+        if not self.active:
+            return
+        now = time.perf_counter_ns()
+        if self._phase is not None:
+            self._durations[self._phase] = self._durations.get(self._phase, 0) + now - self._phase_start
+            self._phase = None
+
+        self.frame += 1
+        last = self.last
+        last.clear()
+        for phase, ns in self._durations.items():
+            if phase not in self.totals:
+                self.phases.append(phase)
+                self.totals[phase] = 0.0
+            ms = ns / 1e6
+            last[phase] = ms
+            self.totals[phase] += ms
+        self._legend_frames += 1
+
+        if self._trace is not None:
+            self._write_trace(now)
+        if self.enabled:
+            self._draw_column()
+
+    # ---- gráfico ----
+
+    def _draw_column(self):
+        graph = self._graph
+        if graph is None:
+            graph = self._graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT))
+            graph.fill(BACKGROUND)
+        # Rola o gráfico um pixel e desenha só a coluna do quadro novo
+        graph.scroll(-1, 0)
+        x = GRAPH_WIDTH - 1
+        graph.fill(BACKGROUND, (x, 0, 1, GRAPH_HEIGHT))
+        y = GRAPH_HEIGHT
+        for i, phase in enumerate(self.phases):
+            h = self.last.get(phase, 0) * GRAPH_SCALE
+            if h <= 0:
+                continue
+            top = max(0, int(y - h))
+            graph.fill(PHASE_COLORS[i % len(PHASE_COLORS)], (x, top, 1, int(y) - top or 1))
+            y -= h
+            if y <= 0:
+                break
+        budget_y = GRAPH_HEIGHT - int(FRAME_BUDGET_MS * GRAPH_SCALE)
+        graph.set_at((x, budget_y), BUDGET_COLOR)
+
+    def draw(self, surface, text_cache, pos=(10, 90)):
+        # Desenha o overlay e devolve a região ocupada (para o DirtyRenderer)
+        if not self.enabled or self._graph is None:
+            return None
+        x, y = pos
+        area = surface.blit(self._graph, pos)
+
+        if self._legend_frames >= LEGEND_EVERY or not self._legend:
+            frames = max(1, self._legend_frames)
+            total = sum(self.totals.values()) / frames
+            self._legend = [(f"quadro {total:.2f} ms", BUDGET_COLOR)]
+            for i, phase in enumerate(self.phases):
+                self._legend.append((f"{phase} {self.totals[phase] / frames:.2f}",
+                                     PHASE_COLORS[i % len(PHASE_COLORS)]))
+                self.totals[phase] = 0.0
+            self._legend_frames = 0
+
+        line_y = y + GRAPH_HEIGHT + 2
+        for text, color in self._legend:
+            text_surface = text_cache.render(text, color, window.font(20))
+            area.union_ip(surface.blit(text_surface, (x, line_y)))
+            line_y += text_surface.get_height()
+        return area
+
+    # ---- trace ----
+
+    def open_trace(self, path):
+        self.close()
+        self._trace = open(path, "w", newline="")
+        self._trace_kind = "csv" if path.endswith(".csv") else "chrome"
+        self._trace_first = True
+        if self._trace_kind == "chrome":
+            self._trace.write("[\n")
+        else:
+            self._trace.write("frame,phase,ms\n")
+
+    def _write_trace(self, now):
+        f = self._trace
+        if self._trace_kind == "csv":
+            frame = self.frame
+            rows = [f"{frame},quadro,{(now - self._frame_start) / 1e6:.4f}\n"]
+            rows += [f"{frame},{phase},{ms:.4f}\n" for phase, ms in self.last.items()]
+            f.writelines(rows)
+            return
+
+        # Chrome trace: um evento "X" para o quadro e um para cada fase, em µs
+        ts = self._frame_start / 1000
+        events = [{"name": "quadro", "ph": "X", "ts": ts, "dur": (now - self._frame_start) / 1000,
+                   "pid": 1, "tid": 1, "args": {"frame": self.frame}}]
+        for phase in self.phases:
+            if phase in self.last:
+                dur = self.last[phase] * 1000
+                events.append({"name": phase, "ph": "X", "ts": ts, "dur": dur, "pid": 1, "tid": 2})
+                ts += dur
+        for event in events:
+            if not self._trace_first:
+                f.write(",\n")
+            f.write(json.dumps(event))
+            self._trace_first = False
+
+    def close(self):
+        if self._trace is None:
+            return
+        if self._trace_kind == "chrome":
+            self._trace.write("\n]\n")
+        self._trace.close()
+        self._trace = None
@@ -0,0 +1,197 @@
+import os
+import struct
+import sys
+import time
+import zlib
+
+import flappy_sim
+import game_sim
+from level import DEFAULT_LEVEL, load_level
+
+# Gravação e replay de partidas. O log guarda a semente do RNG, a fase e um
+# byte de botões por jogador por quadro (comprimido com zlib). Como as simulações são
+# determinísticas, rodar os mesmos inputs com a mesma semente reproduz a
+# partida inteira, sem janela e sem limite de FPS.
+#
+# Uso: python replay.py arquivo.rep
+
+MAGIC = b"TJRP"
+VERSION = 4
+PREFIX = struct.Struct("<4sB")  # magic, versão
+HEADERS = {
+    1: struct.Struct("<4sB8sqBI"),      # magic, versão, jogo, semente, jogadores, quadros
+    2: struct.Struct("<4sB8sqBI32s"),   # ... e o nome da fase
+    3: struct.Struct("<4sB8sqBI32s"),   # igual à 2; o flappy2 usa o percurso de course.py
+    4: struct.Struct("<4sB8sqBI32sB"),  # ... e a versão das regras do jogo
+}
+
+REPLAY_DIR = "replays"
+
+GAME_LUTA = "luta"
+GAME_FLAPPY2 = "flappy2"
+
+# Versão das regras de cada jogo, separada da versão do arquivo: sobe quando
+# a simulação muda sem mudar os inputs (o mesmo log daria outra partida)
+LUTA_OVERLAP = 1      # colisão por sobreposição
+LUTA_SWEPT = 2        # balas e quedas com colisão contínua
+LUTA_POWER_UPS = 3    # power-ups por timer (lugar e tipo sorteados pela semente e pelo número do spawn)
+FLAPPY2_CLASSIC = 1   # tubos sorteados um a um
+FLAPPY2_OLD_COURSE = 2  # percurso de course.py com a semente antiga dos pedaços (não dá mais para refazer)
+FLAPPY2_COURSE = 3    # percurso de course.py
+RULES = {GAME_LUTA: LUTA_POWER_UPS, GAME_FLAPPY2: FLAPPY2_COURSE}
+
+
+def header_rules(game, version):
+    # Arquivos de antes da versão 4 não guardam as regras. A versão 3 só foi
+    # gravada com o percurso gerado, a colisão contínua e os power-ups; numa
+    # luta da versão 2 não dá para saber, então vale a mais antiga.
+    if game == GAME_FLAPPY2:
+        return FLAPPY2_OLD_COURSE if version >= 3 else FLAPPY2_CLASSIC
+    if game == GAME_LUTA:
+        return LUTA_POWER_UPS if version >= 3 else LUTA_OVERLAP
+    return 0
+
+
+class InputLog:
+    def __init__(self, game, seed, n_players, level="", rules=None):
+        self.game = game
+        self.seed = seed
+        self.n_players = n_players
+        self.level = level
+        self.version = VERSION
+        # Regras com que a partida foi jogada (padrão: as atuais do jogo)
+        self.rules = rules if rules is not None else RULES.get(game, 0)
+        self.data = bytearray()
+
+    def __len__(self):
+        return len(self.data) // self.n_players
+
+    def record(self, inputs):
+        # inputs: um inteiro (0-255) por jogador
+        self.data.extend(inputs)
+
+    def frame(self, index):
+        start = index * self.n_players
+        return tuple(self.data[start:start + self.n_players])
+
+    def frames(self):
+        n = self.n_players
+        data = self.data
+        for start in range(0, len(data), n):
+            yield data[start:start + n]
+
+    def to_bytes(self):
+        # Com o cabeçalho da versão do próprio log: salvar de novo um replay
+        # antigo não muda as regras com que ele é re-simulado
+        version = self.version
+        fields = [MAGIC, version, self.game.encode("ascii"), self.seed, self.n_players, len(self)]
+        if version >= 2:
+            fields.append(self.level.encode("utf-8"))
+        if version >= 4:
+            fields.append(self.rules)
+        return HEADERS[version].pack(*fields) + zlib.compress(bytes(self.data), 9)
+
+    @classmethod
+    def from_bytes(cls, raw):
+        # Arquivo curto, corrompido ou de outro programa: ValueError
+        try:
+            magic, version = PREFIX.unpack_from(raw)
+            if magic != MAGIC or version not in HEADERS:
+                raise ValueError("arquivo de replay inválido")
+            header = HEADERS[version]
+            fields = header.unpack_from(raw)
+            game, seed, n_players, n_frames = fields[2:6]
+            level = fields[6].rstrip(b"\0").decode("utf-8") if version >= 2 else ""
+            game = game.rstrip(b"\0").decode("ascii")
+            data = zlib.decompress(raw[header.size:])
+        except (struct.error, zlib.error, UnicodeDecodeError) as error:
+            raise ValueError(f"arquivo de replay inválido ({error})") from error
+        if n_players < 1:
+            raise ValueError("arquivo de replay inválido (sem jogadores)")
+        rules = fields[7] if version >= 4 else header_rules(game, version)
+        log = cls(game, seed, n_players, level, rules)
+        log.version = version
+        log.data = bytearray(data)
+        if len(log) != n_frames:
+            raise ValueError("replay incompleto")
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(4), "little")
+
+
+def save_match(log, directory=REPLAY_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{log.game}-{time.strftime('%Y%m%d-%H%M%S')}-{log.seed}.rep")
+    log.save(path)
+    return path
+
+
+def flappy2_config(log):
+    # Replays de antes do percurso gerado usam o percurso clássico
+    return flappy_sim.CLASSIC_VERSUS if log.rules == FLAPPY2_CLASSIC else flappy_sim.VERSUS
+
+
+def check_rules(log):
+    # A luta só roda com as regras atuais: um replay de outras regras rodaria,
+    # mas daria outra partida. Esses são recusados em vez de mostrar um
+    # resultado que nunca aconteceu.
+    if log.game == GAME_LUTA and log.rules != RULES[GAME_LUTA]:
+        raise ValueError(f"replay da luta com as regras {log.rules}, diferentes das atuais "
+                         f"({RULES[GAME_LUTA]}): a partida sairia diferente")
+    # O flappy2 ainda roda o percurso clássico, mas não o gerado com a semente antiga
+    if log.game == GAME_FLAPPY2 and log.rules not in (FLAPPY2_CLASSIC, FLAPPY2_COURSE):
+        raise ValueError(f"replay do flappy2 com as regras {log.rules}, de um percurso que "
+                         f"não é mais gerado igual")
+
+
+def run(log):
+    # Re-simula a partida inteira e devolve o estado final
+    check_rules(log)
+    if log.game == GAME_LUTA:
+        world = game_sim.World(load_level(log.level or DEFAULT_LEVEL), log.seed)
+        for inputs in log.frames():
+            game_sim.step(world, inputs)
+        return world
+    if log.game == GAME_FLAPPY2:
+        state = flappy_sim.new_game(flappy2_config(log), flappy_sim.party_xs(log.n_players), log.seed)
+        for inputs in log.frames():
+            flappy_sim.step(state, inputs)
+        return state
+    raise ValueError(f"jogo desconhecido: {log.game}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python replay.py arquivo.rep")
+        sys.exit(1)
+
+    try:
+        log = InputLog.load(sys.argv[1])
+        start = time.perf_counter()
+        result = run(log)
+    except (OSError, ValueError) as error:
+        print(f"{sys.argv[1]}: {error}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if log.game == GAME_LUTA:
+        print("Vida final:", " x ".join(str(p.health) for p in result.players))
+    else:
+        print("Score final:", " x ".join(str(b.score) for b in result.birds))
+    real_time = len(log) / game_sim.FPS
+    print(f"{len(log)} quadros em {elapsed:.3f} s ({real_time / max(elapsed, 1e-9):.0f}x o tempo real)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import bisect
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+# Recordes e histórico de partidas. Cada partida vira uma linha JSON no fim
+# de um arquivo que só cresce (nunca é reescrito), então um crash no meio de
+# uma gravação perde no máximo a última linha, que é descartada ao abrir.
+# A gravação roda numa thread: record_match() só atualiza os placares em
+# memória e põe a linha numa fila, e a thread grava as linhas acumuladas de
+# uma vez (write + fsync).
+#
+# Os placares ficam em memória: para cada jogo, os TOP_SIZE melhores scores
+# gerais e os TOP_SIZE melhores de cada jogador, em listas ordenadas. De
+# tempos em tempos a thread grava um índice com esses placares e a posição do
+# arquivo que eles cobrem; ao abrir, só as linhas depois dessa posição são
+# lidas, mesmo com milhões de partidas no arquivo.
+#
+# Uso: python scores.py [jogo] [jogador]
+
+SCORES_FILE = "scores.jsonl"
+TOP_SIZE = 100             # scores guardados por placar
+HISTORY_SIZE = 50          # últimas partidas guardadas em memória
+BATCH_SIZE = 256           # linhas gravadas por vez, no máximo
+CHECKPOINT_EVERY = 10000   # partidas entre gravações do índice
+INDEX_VERSION = 1
+
+
+class Leaderboard:
+    # Os "size" melhores scores, do maior para o menor (empate: o mais antigo
+    # fica na frente)
+    def __init__(self, size=TOP_SIZE, entries=()):
+        self.size = size
+        self.keys = []      # (-score, time), crescente
+        self.entries = []   # (score, player, time), na mesma ordem
+        for entry in entries:
+            self.add(*entry)
+
+    def add(self, score, player, when):
+        key = (-score, when)
+        if len(self.keys) >= self.size and key >= self.keys[-1]:
+            return False
+        index = bisect.bisect_right(self.keys, key)
+        self.keys.insert(index, key)
+        self.entries.insert(index, (score, player, when))
+        if len(self.keys) > self.size:
+            self.keys.pop()
+            self.entries.pop()
+        return True
+
+    def top(self, n):
+        return self.entries[:n]
+
+
+class ScoreStore:
+    def __init__(self, path=SCORES_FILE, top_size=TOP_SIZE):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.top_size = top_size
+        self.boards = {}       # (jogo, jogador ou None) -> Leaderboard
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._load()
+        self._file = open(path, "ab")
+        self._offset = self._file.tell()
+        self._since_checkpoint = 0
+        self._thread = threading.Thread(target=self._writer, name="scores", daemon=True)
+        self._thread.start()
+
+    # ---- leitura ----
+
+    def _load(self):
+        offset = 0
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and index["offset"] <= os.path.getsize(self.path):
+                offset = index["offset"]
+                self.count = index["count"]
+                for game, player, entries in index["boards"]:
+                    self.boards[(game, player)] = Leaderboard(self.top_size, map(tuple, entries))
+                self.history.extend(index["history"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Sem índice (ou índice estragado): lê o arquivo todo
+            offset = 0
+            self.count = 0
+            self.boards.clear()
+            self.history.clear()
+
+        try:
+            f = open(self.path, "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            good = offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    match = json.loads(line)
+                except ValueError:
+                    break
+                self._index(match)
+                good += len(line)
+            # Linha cortada por um crash: o resto do arquivo é descartado
+            f.truncate(good)
+
+    def _index(self, match):
+        game = match["game"]
+        when = match["time"]
+        for player, score in match["results"]:
+            self._board(game, None).add(score, player, when)
+            self._board(game, player).add(score, player, when)
+        self.history.append(match)
+        self.count += 1
+
+    def _board(self, game, player):
+        board = self.boards.get((game, player))
+        if board is None:
+            board = self.boards[(game, player)] = Leaderboard(self.top_size)
+        return board
+
+    def top(self, game, n=10, player=None):
+        # [(score, jogador, quando), ...] do maior para o menor
+        with self._lock:
+            board = self.boards.get((game, player))
+            return board.top(n) if board is not None else []
+
+    def best(self, game, player=None):
+        entries = self.top(game, 1, player)
+        return entries[0][0] if entries else 0
+
+    def recent(self, game=None, n=10):
+        with self._lock:
+            matches = [m for m in self.history if game is None or m["game"] == game]
+        return matches[-n:]
+
+    # ---- gravação ----
+
+    def record_match(self, game, results, **extra):
+        # results: [(jogador, score), ...]; extra vai junto na linha (semente, quadros...)
+        match = {"game": game, "time": time.time(), "results": [list(r) for r in results]}
+        match.update(extra)
+        with self._lock:
+            # Na fila junto com o índice: o que está nos placares e não está
+            # na fila já foi gravado
+            self._index(match)
+            self._queue.put(match)
+        return match
+
+    def _writer(self):
+        q = self._queue
+        while True:
+            match = q.get()
+            batch = [match]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            lines = [json.dumps(m, ensure_ascii=False).encode("utf-8") + b"\n" for m in batch if m is not None]
+            if lines:
+                data = b"".join(lines)
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._offset += len(data)
+                self._since_checkpoint += len(lines)
+            if self._since_checkpoint >= CHECKPOINT_EVERY or (stop and self._since_checkpoint):
+                self._checkpoint()
+            for _ in batch:
+                q.task_done()
+            if stop:
+                return
+
+    def _checkpoint(self):
+        # Índice escrito num arquivo temporário e trocado de uma vez (os.replace)
+        with self._lock:
+            if self._queue.qsize():
+                # Partidas nos placares mas ainda não no arquivo: fica para a próxima
+                return
+            index = {
+                "version": INDEX_VERSION,
+                "offset": self._offset,
+                "count": self.count,
+                "boards": [[game, player, board.entries] for (game, player), board in self.boards.items()],
+                "history": list(self.history),
+            }
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+        self._since_checkpoint = 0
+
+    def flush(self):
+        # Espera tudo o que foi registrado chegar no disco
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+
+def main():
+    store = ScoreStore()
+    game = sys.argv[1] if len(sys.argv) > 1 else None
+    player = sys.argv[2] if len(sys.argv) > 2 else None
+    games = [game] if game else sorted({g for g, _ in store.boards})
+    print(f"{store.count} partidas em {store.path}")
+    for g in games:
+        print(f"\n{g}" + (f" - {player}" if player else ""))
+        for rank, (score, name, when) in enumerate(store.top(g, 10, player), 1):
+            print(f"{rank:3}. {name:<20} {score:6}  {time.strftime('%d/%m/%Y %H:%M', time.localtime(when))}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Grade uniforme para achar rapidamente os blocos perto de um retângulo.
+# Cada bloco é guardado em todas as células que ele cobre; uma consulta só
+# olha as células do retângulo pedido em vez da lista inteira de blocos.
+
+CELL_SIZE = 64
+
+INF = float("inf")
+
+
+def sweep_time(rect, dx, dy, other):
+    # Varredura contínua: em que fração (0 a 1) do movimento (dx, dy) o
+    # retângulo começa a sobrepor other, ou None se não chega a sobrepor.
+    # "Sobrepor" é o mesmo que colliderect (só encostar a borda não conta);
+    # se já começa sobrepondo, o tempo é 0.
+    if dx > 0:
+        x_entry = (other.left - rect.right) / dx
+        x_exit = (other.right - rect.left) / dx
+    elif dx < 0:
+        x_entry = (other.right - rect.left) / dx
+        x_exit = (other.left - rect.right) / dx
+    elif rect.left < other.right and other.left < rect.right:
+        x_entry, x_exit = -INF, INF
+    else:
+        return None
+
+    if dy > 0:
+        y_entry = (other.top - rect.bottom) / dy
+        y_exit = (other.bottom - rect.top) / dy
+    elif dy < 0:
+        y_entry = (other.bottom - rect.top) / dy
+        y_exit = (other.top - rect.bottom) / dy
+    elif rect.top < other.bottom and other.top < rect.bottom:
+        y_entry, y_exit = -INF, INF
+    else:
+        return None
+
+    entry = max(x_entry, y_entry)
+    exit_ = min(x_exit, y_exit)
+    if entry >= exit_ or entry >= 1 or exit_ <= 0:
+        return None
+    return max(entry, 0.0)
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, (rect.right - 1) // size,
+                rect.top // size, (rect.bottom - 1) // size)
+
+    def insert(self, rect, item):
+        # A ordem de inserção é guardada para desempatar como a lista original
+        entry = (self.count, rect, item)
+        self.count += 1
+        x0, x1, y0, y1 = self._cell_range(rect)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cells.setdefault((cx, cy), []).append(entry)
+
+    def query(self, rect):
+        # Todos os itens das células que o retângulo toca (sem repetição)
+        found = {}
+        x0, x1, y0, y1 = self._cell_range(rect)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for entry in cells.get((cx, cy), ()):
+                    found[entry[0]] = entry[2]
+        return [found[order] for order in sorted(found)]
+
+    def collide(self, rect):
+        # Primeiro item (na ordem de inserção) que colide com o retângulo, ou None
+        best = None
+        x0, x1, y0, y1 = self._cell_range(rect)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for entry in cells.get((cx, cy), ()):
+                    if best is not None and entry[0] >= best[0]:
+                        break
+                    if rect.colliderect(entry[1]):
+                        best = entry
+                        break
+        return best[2] if best is not None else None
+
+    def sweep(self, rect, dx, dy, area=None):
+        # Primeiro item atingido pelo retângulo andando (dx, dy):
+        # (tempo, item) ou None. Só olha as células da área varrida, então
+        # custa uma consulta por corpo, qualquer que seja a velocidade.
+        # area: a área varrida já calculada por quem chama (evita criar Rects)
+        best = None
+        if area is None:
+            area = rect.union(rect.move(dx, dy))
+        x0, x1, y0, y1 = self._cell_range(area)
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for entry in cells.get((cx, cy), ()):
+                    # Só quem está na área varrida pode ser atingido
+                    if not area.colliderect(entry[1]):
+                        continue
+                    t = sweep_time(rect, dx, dy, entry[1])
+                    # Empate no tempo: vale a ordem de inserção, como em collide
+                    if t is not None and (best is None or (t, entry[0]) < best[:2]):
+                        best = (t, entry[0], entry[2])
+        return (best[0], best[2]) if best is not None else None
+
+
+def build_block_grid(blocks, cell_size=CELL_SIZE):
+    grid = SpatialGrid(cell_size)
+    for block in blocks:
+        grid.insert(block['rect'], block)
+    return grid
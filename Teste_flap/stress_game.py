@@ -0,0 +1,107 @@
+import random
+import sys
+import time
+
+# Cenário de estresse do jogo de luta: centenas de plataformas e centenas de
+# balas ao mesmo tempo, sem janela. Compara a grade espacial com a varredura da
+# lista inteira de blocos (o que o jogo fazia antes) e mostra se cabe em 60 FPS.
+#
+# Uso: python stress_game.py [plataformas] [balas] [quadros]
+
+import pygame
+
+import game_sim
+from bullets import BulletPool
+from game_sim import HEIGHT, JUMP, RIGHT, WIDTH
+from level import BROWN, GRAY, Level
+from spatial import build_block_grid, sweep_time
+
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class LinearBlocks:
+    # Mesmo formato de consulta da grade, mas olhando todos os blocos
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def collide(self, rect):
+        for block in self.blocks:
+            if rect.colliderect(block['rect']):
+                return block
+        return None
+
+    def sweep(self, rect, dx, dy, area=None):
+        best = None
+        if area is None:
+            area = rect.union(rect.move(dx, dy))
+        for block in self.blocks:
+            if not area.colliderect(block['rect']):
+                continue
+            t = sweep_time(rect, dx, dy, block['rect'])
+            if t is not None and (best is None or t < best[0]):
+                best = (t, block)
+        return best
+
+
+def make_blocks(n_platforms, seed=0):
+    rng = random.Random(seed)
+    blocks = [{'rect': pygame.Rect(0, HEIGHT - 40, WIDTH, 40), 'color': BROWN}]
+    for _ in range(n_platforms):
+        w = rng.randint(40, 160)
+        x = rng.randint(0, WIDTH - w)
+        y = rng.randint(80, HEIGHT - 80)
+        blocks.append({'rect': pygame.Rect(x, y, w, 20), 'color': GRAY})
+    return blocks
+
+
+def make_level(n_platforms, seed=0):
+    return Level("estresse", WIDTH, HEIGHT, make_blocks(n_platforms, seed), [])
+
+
+def refill_bullets(pool, players, n_bullets, rng):
+    # Mantém sempre n_bullets balas voando, saindo de posições aleatórias
+    while len(pool.active) < n_bullets:
+        owner = players[len(pool.active) % 2]
+        kind = game_sim.NORMAL_BULLET if rng.random() < 0.8 else game_sim.SUPER_BULLET
+        pool.spawn(owner, kind, rng.randint(0, WIDTH), rng.randint(0, HEIGHT), owner.direction)
+
+
+def run(index, level, n_bullets, frames, seed=0):
+    rng = random.Random(seed)
+    world = game_sim.World(level)
+    world.block_grid = index
+    world.bullet_pool = pool = BulletPool(n_bullets)
+    players = world.players
+    for player in players:
+        player.rect.y = 0
+    inputs = (RIGHT | JUMP, RIGHT | JUMP)
+
+    times = []
+    for _ in range(frames):
+        refill_bullets(pool, players, n_bullets, rng)
+        for player in players:
+            player.health = 100
+
+        start = time.perf_counter()
+        game_sim.step(world, inputs)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return sum(times) / len(times), times[int(len(times) * 0.99) - 1]
+
+
+def main():
+    n_platforms = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_bullets = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    frames = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    level = make_level(n_platforms)
+    blocks = level.blocks
+    print(f"{len(blocks)} blocos, {n_bullets} balas, {frames} quadros")
+    for name, index in (("grade", build_block_grid(blocks)), ("lista", LinearBlocks(blocks))):
+        mean, p99 = run(index, level, n_bullets, frames)
+        status = "OK" if p99 < FRAME_BUDGET_MS else "ESTOURA"
+        print(f"{name}: média {mean:.3f} ms, p99 {p99:.3f} ms por quadro ({status} para 60 FPS)")
+
+
+if __name__ == "__main__":
+    main()
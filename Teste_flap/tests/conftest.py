@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os testes rodam sem janela e importam os módulos do jogo da pasta de cima
+# (rode com: python -m pytest -q, de dentro de Teste_flap)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+import json
+
+import bench
+
+# A comparação com uma execução anterior é o que decide o código de saída do
+# bench.py --compare, então ela é testada com números fixos (sem medir tempo)
+
+
+def result(scenario, n, p95):
+    return {"scenario": scenario, "n": n, "p95_ms": p95}
+
+
+def write_reference(path, results):
+    path.write_text(json.dumps({"results": results}))
+    return str(path)
+
+
+def test_compare_counts_only_p95_regressions_above_threshold(tmp_path, capsys):
+    reference = write_reference(tmp_path / "antes.json", [
+        result("bullets", 10, 1.0),
+        result("bullets", 100, 1.0),
+        result("pipes", 3, 2.0),
+    ])
+    worse = bench.REGRESSION_THRESHOLD + 0.05
+    results = [
+        result("bullets", 10, worse),        # regressão
+        result("bullets", 100, 1.05),        # dentro da margem
+        result("pipes", 3, 1.0),             # melhorou
+        result("particles", 1000, 50.0),     # sem referência: ignorado
+    ]
+    assert bench.compare(results, reference) == 1
+    output = capsys.readouterr().out
+    assert output.count("REGRESSÃO") == 1
+    assert "particles" not in output
+
+
+def test_compare_with_identical_results_has_no_regressions(tmp_path):
+    results = [result("timer_wheel", 1000, 0.02), result("birds", 2, 0.5)]
+    assert bench.compare(results, write_reference(tmp_path / "antes.json", results)) == 0
+
+
+def test_percentile_picks_nearest_rank():
+    values = list(range(101))
+    assert bench.percentile(values, 50) == 50
+    assert bench.percentile(values, 99) == 99
+    assert bench.percentile([3.0], 95) == 3.0
+
+
+def test_run_scenario_reports_every_field():
+    report = bench.run_scenario("timer_wheel", 100, lambda: bench.timers_scenario(100), frames=20, warmup=2)
+    assert report["scenario"] == "timer_wheel" and report["n"] == 100
+    assert 0 <= report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"] <= report["max_ms"]
+    assert report["alloc_peak_bytes_per_frame"] >= 0
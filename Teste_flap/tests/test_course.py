@@ -0,0 +1,54 @@
+import course
+import flappy_sim
+
+# Cada pedaço do percurso sai só da semente e do índice: gerado direto, pelo
+# CourseStream desde o começo ou por um CourseStream que começa no meio, tem
+# que dar os mesmos tubos
+
+CONFIG = flappy_sim.SOLO
+CHUNKS = 6
+
+
+def direct_pipes(seed, first, last):
+    return [pipe for index in range(first, last) for pipe in course.chunk(CONFIG, seed, index)]
+
+
+def stream_pipes(stream, last_pipe):
+    # Tubos do stream até a distância do último esperado (o jitter de cada
+    # tubo é menor que metade do espaço entre eles, então a ordem não muda)
+    return list(stream.due(last_pipe[0]))
+
+
+def test_stream_matches_chunks_generated_directly():
+    seed = 12345
+    direct = direct_pipes(seed, 0, CHUNKS)
+    assert stream_pipes(course.CourseStream(CONFIG, seed), direct[-1]) == direct
+
+
+def test_chunk_does_not_depend_on_the_ones_before():
+    seed = 77
+    expected = course.chunk(CONFIG, seed, 40)
+    stream = course.CourseStream(CONFIG, seed, first_chunk=40)
+    assert stream_pipes(stream, expected[-1]) == expected
+    # Gerar outros pedaços antes não muda nada
+    for index in range(40):
+        course.chunk(CONFIG, seed, index)
+    assert course.chunk(CONFIG, seed, 40) == expected
+
+
+def test_pipes_are_in_order_and_inside_the_screen():
+    pipes = direct_pipes(5, 0, CHUNKS)
+    assert stream_pipes(course.CourseStream(CONFIG, 5), pipes[-1]) == pipes
+    distances = [distance for distance, _, _ in pipes]
+    assert distances == sorted(distances)
+    margin = CONFIG.course.margin
+    for _, height, gap in pipes:
+        assert margin <= height and height + gap <= CONFIG.height - margin
+
+
+def test_different_seed_and_index_pairs_give_different_chunks():
+    # Pares que uma semente numérica (semente * N + índice) confundiria
+    assert course.chunk(CONFIG, 1, 0) != course.chunk(CONFIG, 0, 1000003)
+    assert course.chunk(CONFIG, 1, -1) != course.chunk(CONFIG, 0, 1000002)
+    seen = {tuple(course.chunk(CONFIG, seed, index)) for seed in range(4) for index in range(4)}
+    assert len(seen) == 16
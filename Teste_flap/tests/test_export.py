@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+import export
+import replay
+import window
+from level import DEFAULT_LEVEL
+from net import ScriptedPlayer
+
+# O quadro 0 da exportação é o estado inicial e o quadro N é o estado depois
+# de N inputs: um replay inteiro vira len(log) + 1 imagens
+
+
+@pytest.fixture(autouse=True)
+def screen():
+    window.init()
+    yield
+    window.close()
+
+
+def luta_log(frames):
+    log = replay.InputLog(replay.GAME_LUTA, 5, 2, DEFAULT_LEVEL)
+    players = [ScriptedPlayer(10), ScriptedPlayer(11)]
+    for frame in range(1, frames + 1):
+        log.record(tuple(player.buttons(frame) for player in players))
+    return log
+
+
+def flappy2_log(frames):
+    # Sem pulos os pássaros só caem; em poucos quadros ninguém morre ainda
+    log = replay.InputLog(replay.GAME_FLAPPY2, 5, 3)
+    for _ in range(frames):
+        log.record((0, 0, 0))
+    return log
+
+
+def exported(tmp_path, log, **options):
+    path = str(tmp_path / f"{log.game}.rep")
+    log.save(path)
+    result = export.export(path, str(tmp_path / "saida"), "bmp", threads=1, **options)
+    names = sorted(os.listdir(tmp_path / "saida" / log.game))
+    assert result["quadros"] == len(names)
+    return result, names
+
+
+@pytest.mark.parametrize("make_log", [luta_log, flappy2_log])
+def test_full_export_has_initial_state_plus_one_image_per_input(tmp_path, make_log):
+    log = make_log(12)
+    result, names = exported(tmp_path, log)
+    assert len(names) == len(log) + 1
+    assert names[0] == "quadro_000000.bmp" and names[-1] == f"quadro_{len(log):06d}.bmp"
+    assert result["simulados"] == len(log)
+
+
+def test_range_and_step_keep_frame_numbers(tmp_path):
+    log = luta_log(20)
+    result, names = exported(tmp_path, log, first=3, last=15, step=4)
+    assert names == [f"quadro_{index:06d}.bmp" for index in (3, 7, 11)]
+    # Para no último quadro pedido, sem simular os inputs seguintes
+    assert result["simulados"] == 14
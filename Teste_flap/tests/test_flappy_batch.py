@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+import pytest
+
+import flappy_sim
+from flappy_batch import BatchFlappyEnv
+
+# BatchFlappyEnv tem que seguir exatamente as regras de flappy_sim.step: os
+# mesmos pulos, com a mesma semente, dão as mesmas posições, mortes e scores
+# em todo quadro
+
+BIRDS = 12
+FRAMES = 2000
+
+CONFIGS = {
+    "solo": flappy_sim.SOLO,
+    "versus": flappy_sim.VERSUS,
+    "classico": flappy_sim.CLASSIC_VERSUS,
+}
+
+
+def next_gap_bottom(state, bird):
+    for pipe in state.pipes:
+        if pipe.x + pipe.width > bird.x:
+            return pipe.bottom_y
+    return state.config.height * 2 // 3
+
+
+def steer(state, rng, noise):
+    # Pula ao cair perto do fundo do próximo vão (cada pássaro com uma folga
+    # diferente), mais uns pulos aleatórios: uns passam tubos, outros morrem,
+    # em quadros diferentes
+    return [(bird.velocity > 0 and bird.y + bird.height > next_gap_bottom(state, bird) - 8 - i)
+            or rng.random() < rate
+            for i, (bird, rate) in enumerate(zip(state.birds, noise))]
+
+
+@pytest.mark.parametrize("name", sorted(CONFIGS))
+def test_batch_matches_scalar_simulation(name):
+    config = CONFIGS[name]
+    seed = 4
+    xs = flappy_sim.party_xs(BIRDS)
+    state = flappy_sim.new_game(config, xs, seed)
+    env = BatchFlappyEnv(BIRDS, config, xs, seed)
+    rng = random.Random(seed)
+    noise = [0.002 * i for i in range(BIRDS)]
+
+    for frame in range(FRAMES):
+        jumps = steer(state, rng, noise)
+        flappy_sim.step(state, jumps)
+        env.step(np.array(jumps))
+        birds = state.birds
+        assert env.alive.tolist() == [bird.alive for bird in birds], f"quadro {frame}"
+        assert env.score.tolist() == [bird.score for bird in birds], f"quadro {frame}"
+        assert env.y.tolist() == [bird.y for bird in birds], f"quadro {frame}"
+        assert env.velocity.tolist() == [bird.velocity for bird in birds], f"quadro {frame}"
+        if state.is_over():
+            break
+    assert env.is_over() == state.is_over()
+    # O teste só vale se passou por tubos e mortes
+    scores = [bird.score for bird in state.birds]
+    assert max(scores) > 3
+    assert not all(bird.alive for bird in state.birds)
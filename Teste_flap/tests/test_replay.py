@@ -0,0 +1,103 @@
+import random
+import zlib
+
+import pytest
+
+import flappy_sim
+import game_sim
+import replay
+from level import DEFAULT_LEVEL, load_level
+from net import ScriptedPlayer
+
+# Gravar uma partida e re-simular o log (depois de passar por bytes) tem que
+# chegar exatamente no mesmo estado final
+
+LUTA_FRAMES = 900     # passa do primeiro spawn de power-up (8 s)
+FLAPPY_FRAMES = 1500
+FLAPPY_BIRDS = 8
+
+
+def play_luta(seed):
+    world = game_sim.World(load_level(DEFAULT_LEVEL), seed)
+    log = replay.InputLog(replay.GAME_LUTA, seed, 2, DEFAULT_LEVEL)
+    players = [ScriptedPlayer(seed * 2), ScriptedPlayer(seed * 2 + 1)]
+    for frame in range(1, LUTA_FRAMES + 1):
+        inputs = tuple(player.buttons(frame) for player in players)
+        log.record(inputs)
+        game_sim.step(world, inputs)
+    return world, log
+
+
+def bird_states(state):
+    return [(bird.y, bird.velocity, bird.alive, bird.score) for bird in state.birds]
+
+
+def test_luta_replay_matches_recorded_match():
+    world, log = play_luta(seed=7)
+    loaded = replay.InputLog.from_bytes(log.to_bytes())
+    assert len(loaded) == LUTA_FRAMES
+    assert loaded.level == DEFAULT_LEVEL
+    assert game_sim.save_state(replay.run(loaded)) == game_sim.save_state(world)
+
+
+def test_flappy2_replay_matches_recorded_match():
+    seed = 11
+    rng = random.Random(seed)
+    log = replay.InputLog(replay.GAME_FLAPPY2, seed, FLAPPY_BIRDS)
+    state = flappy_sim.new_game(replay.flappy2_config(log), flappy_sim.party_xs(FLAPPY_BIRDS), seed)
+    for _ in range(FLAPPY_FRAMES):
+        jumps = tuple(int(rng.random() < 0.06) for _ in range(FLAPPY_BIRDS))
+        log.record(jumps)
+        flappy_sim.step(state, jumps)
+
+    replayed = replay.run(replay.InputLog.from_bytes(log.to_bytes()))
+    assert replayed.frame == state.frame
+    assert replayed.distance == state.distance
+    assert bird_states(replayed) == bird_states(state)
+
+
+def test_old_luta_replays_are_refused():
+    _, log = play_luta(seed=3)
+    log.rules = replay.LUTA_OVERLAP
+    with pytest.raises(ValueError):
+        replay.run(log)
+
+
+def test_truncated_replay_is_rejected():
+    _, log = play_luta(seed=5)
+    raw = log.to_bytes()
+    header = replay.HEADERS[replay.VERSION]
+    # Um quadro a mais no cabeçalho do que nos dados
+    fields = list(header.unpack_from(raw))
+    fields[5] += 1
+    with pytest.raises(ValueError):
+        replay.InputLog.from_bytes(header.pack(*fields) + raw[header.size:])
+
+
+@pytest.mark.parametrize("raw", [b"", b"TJ", b"TJRP\x04", b"XXXX\x04" + bytes(60)])
+def test_short_or_foreign_files_are_rejected(raw):
+    with pytest.raises(ValueError):
+        replay.InputLog.from_bytes(raw)
+
+
+def test_corrupt_data_is_rejected():
+    _, log = play_luta(seed=5)
+    raw = bytearray(log.to_bytes())
+    raw[-10:] = bytes(10)
+    with pytest.raises(ValueError):
+        replay.InputLog.from_bytes(bytes(raw))
+
+
+def test_old_log_keeps_its_version_when_saved_again():
+    # Um flappy2 da versão 2 (percurso clássico) salvo de novo continua clássico
+    header = replay.HEADERS[2]
+    data = bytes([1, 0, 0, 1] * 50)
+    raw = header.pack(replay.MAGIC, 2, replay.GAME_FLAPPY2.encode("ascii"), 9, 4, 50, b"") + zlib.compress(data)
+    log = replay.InputLog.from_bytes(raw)
+    assert log.rules == replay.FLAPPY2_CLASSIC
+
+    again = replay.InputLog.from_bytes(log.to_bytes())
+    assert again.version == 2
+    assert again.rules == replay.FLAPPY2_CLASSIC
+    assert replay.flappy2_config(again) is flappy_sim.CLASSIC_VERSUS
+    assert bytes(again.data) == data
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from scores import ScoreStore
+
+# O arquivo de partidas só cresce; um crash pode deixar a última linha
+# cortada, que tem que ser descartada ao abrir sem perder as anteriores.
+# O índice (gravado com os.replace) só adianta a leitura: com ou sem ele, os
+# placares têm que sair iguais.
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "scores.jsonl")
+
+
+def fill(path, scores):
+    store = ScoreStore(path)
+    for i, score in enumerate(scores):
+        store.record_match("flappy", [(f"jogador{i % 2}", score)], seed=i)
+    store.close()
+
+
+def scores_of(store):
+    return [score for score, _, _ in store.top("flappy", 100)]
+
+
+def test_torn_last_line_is_dropped_and_file_cut_back(path):
+    fill(path, [5, 9, 7])
+    size = os.path.getsize(path)
+    # Uma vez lendo depois do índice e outra lendo o arquivo todo
+    for use_index in (True, False):
+        if not use_index:
+            os.remove(os.path.splitext(path)[0] + ".idx")
+        with open(path, "ab") as f:
+            f.write(b'{"game": "flappy", "time": 1.0, "resu')
+        store = ScoreStore(path)
+        assert store.count == 3
+        assert scores_of(store) == [9, 7, 5]
+        store.close()
+        assert os.path.getsize(path) == size
+
+
+def test_new_matches_after_a_torn_line_start_on_a_clean_line(path):
+    fill(path, [1, 2])
+    with open(path, "ab") as f:
+        f.write(b'{"game": "fla')
+    store = ScoreStore(path)
+    store.record_match("flappy", [("jogador9", 30)])
+    store.close()
+
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [match["results"][0][1] for match in lines] == [1, 2, 30]
+
+
+def test_checkpoint_index_covers_the_file_and_is_replaced_atomically(path):
+    fill(path, [3, 8])
+    index_path = os.path.splitext(path)[0] + ".idx"
+    with open(index_path, encoding="utf-8") as f:
+        index = json.load(f)
+    assert index["offset"] == os.path.getsize(path)
+    assert index["count"] == 2
+    assert not os.path.exists(index_path + ".tmp")
+
+    # Linhas depois da posição do índice são lidas do arquivo
+    with open(path, "ab") as f:
+        f.write(json.dumps({"game": "flappy", "time": 2e9, "results": [["outro", 50]]}).encode() + b"\n")
+    store = ScoreStore(path)
+    assert store.count == 3
+    assert scores_of(store) == [50, 8, 3]
+    assert store.best("flappy", "outro") == 50
+    store.close()
+
+
+def test_broken_index_falls_back_to_reading_everything(path):
+    fill(path, [4, 6])
+    with open(os.path.splitext(path)[0] + ".idx", "w", encoding="utf-8") as f:
+        f.write('{"version": 1, "offset"')
+    store = ScoreStore(path)
+    assert store.count == 2
+    assert scores_of(store) == [6, 4]
+    store.close()
@@ -0,0 +1,86 @@
+import pygame
+import pytest
+
+from spatial import SpatialGrid, sweep_time
+
+# Colisão contínua: a bala tem que parar no primeiro bloco do caminho do
+# quadro inteiro, mesmo quando anda mais que a largura dele
+
+
+def grid_of(*rects):
+    grid = SpatialGrid()
+    for i, rect in enumerate(rects):
+        grid.insert(rect, f"bloco {i}")
+    return grid
+
+
+def test_fast_bullet_does_not_tunnel_through_thin_block():
+    bullet = pygame.Rect(0, 100, 10, 4)
+    wall = pygame.Rect(300, 0, 2, 400)
+    # Antes e depois do passo a bala não encosta no bloco
+    assert not bullet.colliderect(wall) and not bullet.move(600, 0).colliderect(wall)
+    assert sweep_time(bullet, 600, 0, wall) == pytest.approx(290 / 600)
+    assert grid_of(wall).sweep(bullet, 600, 0) == (pytest.approx(290 / 600), "bloco 0")
+
+
+def test_moving_left_hits_the_right_side():
+    bullet = pygame.Rect(500, 100, 10, 4)
+    wall = pygame.Rect(200, 90, 20, 40)
+    assert sweep_time(bullet, -400, 0, wall) == pytest.approx(280 / 400)
+
+
+def test_grazing_an_edge_is_not_a_hit():
+    block = pygame.Rect(100, 100, 50, 50)
+    # Passa rente por cima e por baixo: a borda encostada não conta (como colliderect)
+    above = pygame.Rect(0, 90, 10, 10)
+    below = pygame.Rect(0, 150, 10, 10)
+    assert sweep_time(above, 300, 0, block) is None
+    assert sweep_time(below, 300, 0, block) is None
+    # Um pixel para dentro já acerta
+    assert sweep_time(above.move(0, 1), 300, 0, block) == pytest.approx(90 / 300)
+    # Para no instante em que encostaria na borda: também não conta
+    assert sweep_time(pygame.Rect(0, 120, 10, 4), 90, 0, block) is None
+
+
+def test_zero_velocity_axis_needs_overlap_on_that_axis():
+    block = pygame.Rect(100, 100, 50, 50)
+    falling = pygame.Rect(110, 0, 20, 20)
+    assert sweep_time(falling, 0, 200, block) == pytest.approx(80 / 200)
+    # Fora da faixa x do bloco, cair não acerta
+    assert sweep_time(falling.move(100, 0), 0, 200, block) is None
+    # Parado e já sobrepondo: tempo 0; parado fora: nada
+    assert sweep_time(pygame.Rect(120, 120, 5, 5), 0, 0, block) == 0.0
+    assert sweep_time(pygame.Rect(0, 0, 5, 5), 0, 0, block) is None
+
+
+def test_short_move_that_does_not_reach_is_a_miss():
+    block = pygame.Rect(100, 0, 10, 50)
+    bullet = pygame.Rect(0, 10, 10, 4)
+    assert sweep_time(bullet, 89, 0, block) is None
+    assert sweep_time(bullet, 91, 0, block) == pytest.approx(90 / 91)
+
+
+def test_nearest_block_wins_regardless_of_insertion_order():
+    bullet = pygame.Rect(0, 100, 10, 4)
+    far = pygame.Rect(400, 0, 10, 300)
+    near = pygame.Rect(200, 0, 10, 300)
+    t, item = grid_of(far, near).sweep(bullet, 600, 0)
+    assert item == "bloco 1" and t == pytest.approx(190 / 600)
+
+
+def test_two_blocks_hit_at_the_same_time_use_insertion_order():
+    bullet = pygame.Rect(0, 100, 10, 20)
+    # Mesma borda esquerda, um em cima do outro, os dois na altura da bala
+    upper = pygame.Rect(300, 50, 10, 60)
+    lower = pygame.Rect(300, 110, 10, 60)
+    assert grid_of(upper, lower).sweep(bullet, 500, 0) == (pytest.approx(290 / 500), "bloco 0")
+    assert grid_of(lower, upper).sweep(bullet, 500, 0) == (pytest.approx(290 / 500), "bloco 0")
+
+
+def test_sweep_with_precomputed_area_matches_default():
+    bullet = pygame.Rect(700, 60, 10, 4)
+    blocks = [pygame.Rect(x, 0, 8, 200) for x in range(0, 700, 90)]
+    grid = grid_of(*blocks)
+    area = pygame.Rect(bullet.x - 650, bullet.y, bullet.width + 650, bullet.height)
+    assert grid.sweep(bullet, -650, 0, area) == grid.sweep(bullet, -650, 0)
+    assert grid.sweep(bullet, -650, 0)[1] == "bloco 7"
@@ -0,0 +1,63 @@
+import game_sim
+from level import DEFAULT_LEVEL, load_level
+from net import ScriptedPlayer
+
+# save_state/load_state: carregar um estado e seguir com os mesmos inputs tem
+# que dar os mesmos bytes que a partida que nunca parou (é o que a rede usa
+# no rollback)
+
+SEED = 21
+SPLIT = 500     # com balas no ar e o primeiro power-up já na fase
+FRAMES = 1000
+
+
+def scripted_inputs():
+    players = [ScriptedPlayer(SEED * 2), ScriptedPlayer(SEED * 2 + 1)]
+    return [tuple(player.buttons(frame) for player in players) for frame in range(1, FRAMES + 1)]
+
+
+def new_world():
+    return game_sim.World(load_level(DEFAULT_LEVEL), SEED)
+
+
+def play(world, inputs):
+    for frame_inputs in inputs:
+        game_sim.step(world, frame_inputs)
+    return game_sim.save_state(world)
+
+
+def test_state_survives_bytes_round_trip():
+    world = new_world()
+    play(world, scripted_inputs()[:SPLIT])
+    state = game_sim.save_state(world)
+    assert state.frame == SPLIT
+    assert game_sim.WorldState.from_bytes(state.to_bytes()) == state
+
+
+def test_loaded_state_continues_like_uninterrupted_match():
+    inputs = scripted_inputs()
+    uninterrupted = play(new_world(), inputs)
+
+    first = new_world()
+    play(first, inputs[:SPLIT])
+    saved = game_sim.WorldState.from_bytes(game_sim.save_state(first).to_bytes())
+    assert first.bullet_pool.active and first.power_ups_spawned
+
+    # Num mundo novo, que nunca jogou os primeiros quadros
+    resumed = new_world()
+    game_sim.load_state(resumed, saved)
+    assert game_sim.save_state(resumed) == saved
+    assert play(resumed, inputs[SPLIT:]) == uninterrupted
+
+
+def test_rollback_to_earlier_state_replays_the_same_frames():
+    inputs = scripted_inputs()
+    world = new_world()
+    play(world, inputs[:SPLIT])
+    saved = game_sim.save_state(world)
+    ahead = play(world, inputs[SPLIT:])
+
+    # Volta no mesmo mundo (timers, balas e power-ups de depois são desfeitos)
+    game_sim.load_state(world, saved)
+    assert game_sim.save_state(world) == saved
+    assert play(world, inputs[SPLIT:]) == ahead
@@ -0,0 +1,171 @@
+import random
+
+import pytest
+
+from timers import LEVEL_BITS, MAX_DELAY, SLOTS, TimerWheel
+
+# A roda comparada com um modelo simples: uma lista de (vencimento, ordem,
+# id) ordenada. Em cada quadro os dois têm que disparar os mesmos timers, na
+# mesma ordem.
+
+
+class ReferenceTimers:
+    def __init__(self, now=0):
+        self.now = now
+        self.pending = {}   # id -> (vencimento, ordem)
+        self.order = 0
+
+    def schedule(self, key, delay):
+        self.pending[key] = (self.now + min(max(delay, 1), MAX_DELAY), self.order)
+        self.order += 1
+
+    def cancel(self, key):
+        self.pending.pop(key, None)
+
+    def tick(self):
+        self.now += 1
+        due = sorted((order, key) for key, (frame, order) in self.pending.items() if frame == self.now)
+        for _, key in due:
+            del self.pending[key]
+        return [key for _, key in due]
+
+
+class Checked:
+    # Roda e modelo lado a lado, com os mesmos comandos
+    def __init__(self, now=0):
+        self.wheel = TimerWheel(now)
+        self.model = ReferenceTimers(now)
+        self.timers = {}
+        self.fired = []
+        self.next_key = 0
+
+    def schedule(self, delay):
+        key = self.next_key
+        self.next_key += 1
+        self.timers[key] = self.wheel.schedule(delay, self.fired.append, key)
+        self.model.schedule(key, delay)
+        return key
+
+    def cancel(self, key):
+        self.wheel.cancel(self.timers.pop(key))
+        self.model.cancel(key)
+
+    def reschedule(self, key, delay):
+        self.wheel.reschedule(self.timers[key], delay)
+        self.model.schedule(key, delay)
+
+    def tick(self):
+        self.fired.clear()
+        self.wheel.tick()
+        expected = self.model.tick()
+        assert self.fired == expected, f"quadro {self.wheel.now}"
+        for key in expected:
+            del self.timers[key]
+        assert len(self.wheel) == len(self.model.pending)
+        return expected
+
+    def run(self, frames):
+        for _ in range(frames):
+            self.tick()
+
+
+def test_delays_on_every_level_fire_on_time():
+    checked = Checked()
+    # Atrasos nas bordas de cada roda (1, 63, 64, 65, 4095, 4096, ...)
+    delays = [1, 2]
+    for level in range(1, 4):
+        edge = SLOTS ** level
+        delays += [edge - 1, edge, edge + 1, edge + SLOTS + 3]
+    for delay in delays:
+        checked.schedule(delay)
+    checked.run(max(delays) + 1)
+    assert len(checked.wheel) == 0
+
+
+def test_cascade_across_levels_from_an_unaligned_start():
+    # Começar no meio de um bloco muda quais timers descem em cada cascata
+    start = (1 << (2 * LEVEL_BITS)) - 5
+    checked = Checked(start)
+    rng = random.Random(3)
+    for _ in range(300):
+        checked.schedule(rng.randrange(1, SLOTS ** 3 // 8))
+    checked.run(SLOTS ** 3 // 8)
+    assert len(checked.wheel) == 0
+
+
+def test_random_schedule_cancel_reschedule_matches_reference():
+    rng = random.Random(7)
+    checked = Checked()
+    for _ in range(6000):
+        roll = rng.random()
+        if roll < 0.35 or not checked.timers:
+            # Muitos no mesmo quadro: a ordem de agendamento desempata
+            checked.schedule(rng.choice((rng.randrange(1, 8), rng.randrange(1, 5000))))
+        elif roll < 0.5:
+            checked.cancel(rng.choice(list(checked.timers)))
+        elif roll < 0.65:
+            checked.reschedule(rng.choice(list(checked.timers)), rng.randrange(1, 5000))
+        else:
+            checked.tick()
+    checked.run(5000)
+    assert len(checked.wheel) == 0
+
+
+def test_callback_can_cancel_a_timer_due_in_the_same_frame():
+    wheel = TimerWheel()
+    fired = []
+    second = None
+
+    def first():
+        fired.append("primeiro")
+        wheel.cancel(second)
+
+    wheel.schedule(5, first)
+    second = wheel.schedule(5, fired.append, "segundo")
+    wheel.advance_to(10)
+    assert fired == ["primeiro"]
+    assert len(wheel) == 0
+
+
+def test_delays_are_clamped():
+    wheel = TimerWheel()
+    now = wheel.schedule(0, lambda: None)
+    far = wheel.schedule(MAX_DELAY + 1000, lambda: None)
+    assert wheel.remaining(now) == 1
+    assert wheel.remaining(far) == MAX_DELAY
+
+
+def test_reschedule_of_fired_or_cancelled_timer_fails():
+    wheel = TimerWheel()
+    timer = wheel.schedule(1, lambda: None)
+    wheel.tick()
+    with pytest.raises(ValueError):
+        wheel.reschedule(timer, 3)
+    cancelled = wheel.schedule(4, lambda: None)
+    wheel.cancel(cancelled)
+    with pytest.raises(ValueError):
+        wheel.reschedule(cancelled, 3)
+
+
+def test_rewind_for_rollback():
+    # Como load_state: cancela todos, volta o quadro e agenda de novo a
+    # partir dos vencimentos salvos
+    checked = Checked(1000)
+    rng = random.Random(11)
+    for _ in range(50):
+        checked.schedule(rng.randrange(1, 9000))
+    checked.run(700)
+    saved_now = checked.wheel.now
+    saved = {key: timer.due for key, timer in checked.timers.items()}
+    checked.run(300)
+
+    with pytest.raises(ValueError):
+        checked.wheel.rewind(saved_now)
+    for key in list(checked.timers):
+        checked.cancel(key)
+    checked.wheel.rewind(saved_now)
+    checked.model.now = saved_now
+    for due in saved.values():
+        checked.schedule(due - saved_now)
+    checked.run(9000)
+    assert len(checked.wheel) == 0
@@ -0,0 +1,146 @@
+# Timers em quadros da simulação (não em tempo real), numa roda hierárquica:
+# LEVELS rodas de SLOTS posições. A roda 0 tem uma posição por quadro, a roda
+# 1 uma por bloco de SLOTS quadros, e assim por diante. Agendar, reagendar e
+# cancelar são O(1) (cada posição é um dict); quando a roda 0 dá a volta, os timers da
+# próxima posição da roda 1 descem para a roda 0, e o mesmo entre as outras.
+# Cada timer desce no máximo LEVELS - 1 vezes, então avançar um quadro custa
+# só os timers que vencem nele, com milhares de timers ativos.
+#
+# Timers que vencem no mesmo quadro rodam na ordem em que foram agendados,
+# então a mesma partida sempre dispara tudo na mesma ordem (replays e rede).
+
+LEVEL_BITS = 6
+SLOTS = 1 << LEVEL_BITS
+MASK = SLOTS - 1
+LEVELS = 4
+MAX_DELAY = SLOTS ** LEVELS - 1   # ~77 horas a 60 FPS; atrasos maiores são cortados
+MAX_BITS = LEVEL_BITS * LEVELS - 1
+
+
+class Timer:
+    __slots__ = ("due", "callback", "args", "seq", "slot")
+
+    def __init__(self, due, callback, args, seq):
+        self.due = due            # quadro em que dispara
+        self.callback = callback  # None depois de cancelado
+        self.args = args
+        self.seq = seq
+        self.slot = None          # dict da roda onde está (None = fora da roda)
+
+    @property
+    def active(self):
+        return self.slot is not None
+
+
+class TimerWheel:
+    def __init__(self, now=0):
+        self.now = now
+        self.wheels = [[{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self.count = 0
+        self._seq = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, delay, callback, *args):
+        # Chama callback(*args) daqui a delay quadros (no mínimo 1)
+        if delay < 1:
+            delay = 1
+        elif delay > MAX_DELAY:
+            delay = MAX_DELAY
+        due = self.now + delay
+        timer = Timer(due, callback, args, self._seq)
+        self._seq += 1
+        # Mesma conta de _place (aqui direto, porque agendar é o caminho quente)
+        level = (delay.bit_length() - 1) // LEVEL_BITS
+        slot = self.wheels[level][(due >> (LEVEL_BITS * level)) & MASK]
+        slot[timer] = None
+        timer.slot = slot
+        self.count += 1
+        return timer
+
+    def reschedule(self, timer, delay):
+        # Move um timer ativo para daqui a delay quadros, sem criar outro:
+        # recomeçar uma contagem custa menos que cancel() + schedule(). Conta
+        # como agendado agora na ordem dos timers do mesmo quadro.
+        if timer.slot is None:
+            raise ValueError("o timer já disparou ou foi cancelado")
+        if delay < 1:
+            delay = 1
+        elif delay > MAX_DELAY:
+            delay = MAX_DELAY
+        del timer.slot[timer]
+        due = timer.due = self.now + delay
+        timer.seq = self._seq
+        self._seq += 1
+        level = (delay.bit_length() - 1) // LEVEL_BITS
+        slot = self.wheels[level][(due >> (LEVEL_BITS * level)) & MASK]
+        slot[timer] = None
+        timer.slot = slot
+
+    def cancel(self, timer):
+        if timer.slot is not None:
+            del timer.slot[timer]
+            timer.slot = None
+            self.count -= 1
+        timer.callback = None
+
+    def remaining(self, timer):
+        # Quadros até o timer disparar (0 se já disparou ou foi cancelado)
+        return timer.due - self.now if timer.slot is not None else 0
+
+    def _place(self, timer):
+        # A roda é escolhida pela distância até o vencimento e a posição pelos
+        # bits do quadro de vencimento naquela roda
+        due = timer.due
+        # (| 1: um timer que desce no próprio quadro em que vence vai para a roda 0)
+        level = min(((due - self.now) | 1).bit_length() - 1, MAX_BITS) // LEVEL_BITS
+        slot = self.wheels[level][(due >> (LEVEL_BITS * level)) & MASK]
+        slot[timer] = None
+        timer.slot = slot
+
+    def tick(self):
+        # Avança um quadro e dispara os timers que vencem nele
+        self.now += 1
+        now = self.now
+        if not now & MASK:
+            # Começo de um bloco: desce os timers das rodas de cima, da mais
+            # alta para a mais baixa (a de cima pode encher a posição da de baixo)
+            top = 1
+            while top < LEVELS - 1 and not (now >> (LEVEL_BITS * top)) & MASK:
+                top += 1
+            for level in range(top, 0, -1):
+                slot = self.wheels[level][(now >> (LEVEL_BITS * level)) & MASK]
+                if slot:
+                    timers = list(slot)
+                    slot.clear()
+                    for timer in timers:
+                        self._place(timer)
+
+        slot = self.wheels[0][now & MASK]
+        if not slot:
+            return 0
+        fired = list(slot)
+        slot.clear()
+        if len(fired) > 1:
+            fired.sort(key=lambda timer: timer.seq)
+        for timer in fired:
+            timer.slot = None
+        self.count -= len(fired)
+        for timer in fired:
+            # Um callback anterior pode ter cancelado este
+            callback = timer.callback
+            if callback is not None:
+                timer.callback = None
+                callback(*timer.args)
+        return len(fired)
+
+    def rewind(self, now):
+        # Muda o quadro atual de uma roda vazia (ao carregar um estado salvo)
+        if self.count:
+            raise ValueError("a roda ainda tem timers ativos")
+        self.now = now
+
+    def advance_to(self, frame):
+        while self.now < frame:
+            self.tick()
@@ -0,0 +1,62 @@
+import time
+
+import pygame
+
+# Passo fixo para o laço dos jogos. A simulação sempre avança em passos de
+# 1/FPS segundo (as constantes de física são "por passo"), e a tela é
+# desenhada no ritmo que der: o tempo real de cada quadro entra num
+# acumulador e tick() diz quantos passos rodar para alcançá-lo. Sobra uma
+# fração de passo no acumulador (alpha, de 0 a 1), usada para desenhar entre
+# o estado anterior e o atual.
+#
+# Se um quadro demorar demais, no máximo MAX_STEPS passos são rodados de uma
+# vez e o resto do atraso é descartado (contado em skipped): o jogo fica
+# mais lento por um instante em vez de travar tentando alcançar o relógio.
+
+SIM_FPS = 60
+RENDER_FPS = 144   # limite de quadros desenhados por segundo (0 = sem limite)
+MAX_STEPS = 5      # passos por quadro no máximo (abaixo de 12 FPS o jogo desacelera)
+
+
+class FixedTimestep:
+    def __init__(self, fps=SIM_FPS, render_fps=RENDER_FPS, max_steps=MAX_STEPS):
+        self.dt = 1 / fps
+        self.render_fps = render_fps
+        self.max_steps = max_steps
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.skipped = 0    # passos descartados por atraso
+        self._last = None
+
+    def reset(self):
+        # Depois de uma pausa (tela de espera, menu): não tenta recuperar o tempo parado
+        self._last = None
+
+    def tick(self):
+        # Espera o próximo quadro de desenho e devolve quantos passos simular
+        self.clock.tick(self.render_fps)
+        now = time.perf_counter()
+        if self._last is None:
+            # Primeiro quadro: um passo, como o laço antigo
+            self._last = now
+            self.accumulator = 0.0
+            self.alpha = 1.0
+            return 1
+        self.accumulator += now - self._last
+        self._last = now
+
+        dt = self.dt
+        steps = int(self.accumulator / dt)
+        if steps > self.max_steps:
+            self.skipped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator %= dt
+        else:
+            self.accumulator -= steps * dt
+        self.alpha = min(self.accumulator / dt, 1.0)
+        return steps
+
+
+def lerp(previous, current, alpha):
+    return previous + (current - previous) * alpha
@@ -0,0 +1,236 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import flappy_sim
+from flappy_batch import BatchFlappyEnv
+
+# Treino de IAs para o Flappy por neuroevolução, sem janela e sem relógio.
+# Cada indivíduo é uma rede pequena (observações -> camada escondida -> pula
+# ou não). A população é dividida em pedaços e cada processo do pool joga um
+# pedaço inteiro de uma vez num BatchFlappyEnv, todos no mesmo percurso: a
+# semente do percurso muda a cada geração e é a mesma para todo mundo.
+#
+# Os pesos da população e os resultados (tubos e quadros vivos) ficam em
+# memória compartilhada: o processo principal escreve os pesos, os processos
+# leem direto dela e escrevem os resultados no mesmo lugar. Só (início, fim,
+# semente) passa pela fila do pool, nada de arrays serializados.
+#
+# Uso: python train.py [--populacao 512] [--geracoes 20] [--processos N]
+#                      [--semente 1] [--quadros 3000] [--salvar melhor.npy]
+#      python train.py --escala    (episódios/s com 1, 2, 4... processos)
+
+INPUTS = 3                       # dy até o vão, velocidade, distância até o tubo
+HIDDEN = 6
+N_PARAMS = INPUTS * HIDDEN + HIDDEN + HIDDEN + 1
+OBS_SCALE = np.array([300.0, 10.0, 400.0])
+ELITE_FRACTION = 0.1             # melhores que passam inteiros para a próxima geração
+MUTATION = 0.3                   # desvio do ruído somado nos filhos
+MAX_FRAMES = 3000                # limite de quadros por episódio (50 s de jogo)
+CHUNKS_PER_PROCESS = 4           # pedaços por processo (quem termina antes pega outro)
+SCALE_GENERATIONS = 3
+
+
+def decide(params, obs):
+    # Um pulo (True/False) por linha de params, para as observações da mesma linha
+    n = len(params)
+    i = INPUTS * HIDDEN
+    w1 = params[:, :i].reshape(n, INPUTS, HIDDEN)
+    b1 = params[:, i:i + HIDDEN]
+    w2 = params[:, i + HIDDEN:i + 2 * HIDDEN]
+    b2 = params[:, -1]
+    hidden = np.tanh(np.einsum("ni,nij->nj", obs / OBS_SCALE, w1) + b1)
+    return np.einsum("nj,nj->n", hidden, w2) + b2 > 0
+
+
+def play(params, seed, max_frames=MAX_FRAMES, config=flappy_sim.SOLO):
+    # Um episódio por linha de params, todos no percurso da semente.
+    # Devolve (tubos passados, quadros vivos) de cada um.
+    env = BatchFlappyEnv(len(params), config, seed=seed)
+    frames = np.zeros(len(params), dtype=np.int64)
+    for _ in range(max_frames):
+        env.step(decide(params, env.observations()))
+        frames += env.alive
+        if env.is_over():
+            break
+    return env.score, frames
+
+
+# Arrays da memória compartilhada dentro de cada processo do pool
+_shared = {}
+
+
+def _attach(params_name, results_name, population):
+    params = shared_memory.SharedMemory(name=params_name)
+    results = shared_memory.SharedMemory(name=results_name)
+    _shared["memory"] = (params, results)  # mantém os blocos abertos
+    _shared["params"] = np.ndarray((population, N_PARAMS), dtype=np.float64, buffer=params.buf)
+    _shared["results"] = np.ndarray((population, 2), dtype=np.int64, buffer=results.buf)
+
+
+def _evaluate(task):
+    start, end, seed, max_frames = task
+    pipes, frames = play(_shared["params"][start:end], seed, max_frames)
+    results = _shared["results"]
+    results[start:end, 0] = pipes
+    results[start:end, 1] = frames
+    return int(frames.sum())
+
+
+class Trainer:
+    def __init__(self, population, processes=None, seed=1, max_frames=MAX_FRAMES):
+        self.population = population
+        self.processes = processes or os.cpu_count() or 1
+        self.seed = seed
+        self.max_frames = max_frames
+        self.generation = 0
+        self.rng = np.random.default_rng(seed)
+
+        # Se a segunda memória ou o pool falharem, as já criadas ficariam
+        # esquecidas em /dev/shm: libera antes de repassar o erro
+        self._memories = []
+        try:
+            self._params_memory = self._create_memory(population * N_PARAMS * 8)
+            self._results_memory = self._create_memory(population * 2 * 8)
+            self.params = np.ndarray((population, N_PARAMS), dtype=np.float64, buffer=self._params_memory.buf)
+            self.results = np.ndarray((population, 2), dtype=np.int64, buffer=self._results_memory.buf)
+            self.params[:] = self.rng.normal(0, 1, size=self.params.shape)
+
+            self.pool = multiprocessing.Pool(self.processes, _attach,
+                                             (self._params_memory.name, self._results_memory.name, population))
+        except BaseException:
+            self._release_memory()
+            raise
+        size = max(1, math.ceil(population / (self.processes * CHUNKS_PER_PROCESS)))
+        self.chunks = [(start, min(start + size, population)) for start in range(0, population, size)]
+
+    def course_seed(self):
+        return self.seed * 100003 + self.generation
+
+    def evaluate(self):
+        # Joga a geração atual; devolve o total de quadros simulados
+        seed = self.course_seed()
+        tasks = [(start, end, seed, self.max_frames) for start, end in self.chunks]
+        return sum(self.pool.map(_evaluate, tasks))
+
+    def fitness(self):
+        # Tubos valem mais que tempo vivo (empate em tubos: quem durou mais)
+        return self.results[:, 0] * self.max_frames + self.results[:, 1]
+
+    def best(self):
+        return self.params[int(np.argmax(self.fitness()))].copy()
+
+    def next_generation(self):
+        # Os melhores ficam, o resto é substituído por cópias mutadas deles
+        order = np.argsort(-self.fitness(), kind="stable")
+        n_elite = max(1, int(self.population * ELITE_FRACTION))
+        elite = self.params[order[:n_elite]].copy()
+        parents = elite[self.rng.integers(0, n_elite, size=self.population - n_elite)]
+        self.params[:n_elite] = elite
+        self.params[n_elite:] = parents + self.rng.normal(0, MUTATION, size=parents.shape)
+        self.generation += 1
+
+    def _create_memory(self, size):
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        self._memories.append(memory)
+        return memory
+
+    def _release_memory(self):
+        # As views numpy seguram o buffer: sem apagá-las o close() falha
+        self.__dict__.pop("params", None)
+        self.__dict__.pop("results", None)
+        for memory in self._memories:
+            memory.close()
+            memory.unlink()
+        self._memories = []
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self._release_memory()
+
+
+def train(population, generations, processes=None, seed=1, max_frames=MAX_FRAMES, verbose=True):
+    # Devolve (pesos do melhor da última geração, episódios por segundo)
+    if population < 1:
+        raise ValueError("a população precisa ter pelo menos 1 indivíduo")
+    if generations < 1:
+        raise ValueError("o treino precisa de pelo menos 1 geração")
+    trainer = Trainer(population, processes, seed, max_frames)
+    total_time = 0.0
+    total_frames = 0
+    try:
+        for _ in range(generations):
+            start = time.perf_counter()
+            frames = trainer.evaluate()
+            elapsed = time.perf_counter() - start
+            total_time += elapsed
+            total_frames += frames
+            if verbose:
+                pipes = trainer.results[:, 0]
+                best = int(np.argmax(trainer.fitness()))
+                print(f"geração {trainer.generation:3}: melhor {pipes[best]} tubos "
+                      f"({trainer.results[best, 1]} quadros), média {pipes.mean():.1f}, "
+                      f"{elapsed * 1000:.0f} ms, {population / elapsed:.0f} episódios/s")
+            best_params = trainer.best()
+            trainer.next_generation()
+    finally:
+        trainer.close()
+
+    episodes_per_second = population * generations / total_time
+    if verbose:
+        print(f"{population * generations} episódios em {total_time:.1f} s com {trainer.processes} processos: "
+              f"{episodes_per_second:.0f} episódios/s, {total_frames / total_time:.0f} quadros/s")
+    return best_params, episodes_per_second
+
+
+def scaling(population, max_frames, seed):
+    # Mesmo treino com 1, 2, 4... processos até o número de núcleos
+    counts = []
+    n = 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    counts.append(os.cpu_count() or 1)
+
+    base = None
+    for processes in counts:
+        _, rate = train(population, SCALE_GENERATIONS, processes, seed, max_frames, verbose=False)
+        base = base or rate
+        print(f"{processes:3} processos: {rate:8.0f} episódios/s ({rate / base:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treino de IAs para o Flappy (neuroevolução)")
+    parser.add_argument("--populacao", type=int, default=512)
+    parser.add_argument("--geracoes", type=int, default=20)
+    parser.add_argument("--processos", type=int, help="padrão: um por núcleo")
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--quadros", type=int, default=MAX_FRAMES, help="limite de quadros por episódio")
+    parser.add_argument("--salvar", help="arquivo .npy para os pesos do melhor indivíduo")
+    parser.add_argument("--escala", action="store_true", help="mede episódios/s com 1, 2, 4... processos")
+    args = parser.parse_args()
+    if args.populacao < 1:
+        parser.error("--populacao precisa ser pelo menos 1")
+    if args.geracoes < 1:
+        parser.error("--geracoes precisa ser pelo menos 1")
+    if args.processos is not None and args.processos < 1:
+        parser.error("--processos precisa ser pelo menos 1")
+
+    if args.escala:
+        scaling(args.populacao, args.quadros, args.semente)
+        return
+
+    best, _ = train(args.populacao, args.geracoes, args.processos, args.semente, args.quadros)
+    if args.salvar:
+        np.save(args.salvar, best)
+        print("Pesos salvos em", args.salvar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import pygame
+
+# Janela e fontes compartilhadas pelos jogos. Nada é criado ao importar: a
+# primeira chamada liga só o vídeo e as fontes do pygame (sem áudio nem
+# joystick, que o pygame.init() ligaria) e a janela é reaproveitada quando
+# outro jogo é aberto no mesmo processo (só muda de tamanho e título).
+
+QUIT = "sair"  # o que main() de cada jogo devolve quando a janela é fechada
+
+_fonts = {}
+
+
+def init():
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+def open_window(size, caption):
+    init()
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != tuple(size):
+        screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(caption)
+    return screen
+
+
+def font(size=36):
+    # Uma fonte por tamanho, criada na primeira vez que é pedida
+    f = _fonts.get(size)
+    if f is None:
+        init()
+        f = _fonts[size] = pygame.font.SysFont(None, size)
+    return f
+
+
+def close():
+    _fonts.clear()
+    pygame.quit()